@@ -1,26 +1,33 @@
 from __future__ import annotations
 
-from functools import lru_cache
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, cast
+from typing import Annotated, Any, cast
 
 import pandas as pd
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Response
+from pydantic import BaseModel, Field
 
 from amazon_sales_analysis import __version__
-from amazon_sales_analysis.analytics import add_derived_metrics, summarize_kpis
+from amazon_sales_analysis.aggregation import read_only_frame
+from amazon_sales_analysis.analytics import add_derived_metrics
 from amazon_sales_analysis.anomaly_detection import detect_discount_spikes
 from amazon_sales_analysis.config import PROCESSED_DATA_DIR, TABLES_DIR
 from amazon_sales_analysis.modeling import rank_discount_opportunities
+from amazon_sales_analysis.processed_store import (
+    PROCESSED_STORE_DIRNAME,
+    dataset_version,
+    load_processed_dataset,
+)
+from amazon_sales_analysis.report_graph import LazyExecutiveReport
+from amazon_sales_analysis.scenario_simulator import LeakageBase
 
-DATASET_PATH = PROCESSED_DATA_DIR / "amazon_sales_clean.csv"
-ALERTS_PATH = TABLES_DIR / "discount_spike_alerts.csv"
+from .refresh import BackgroundWarmup, DatasetRefresher, DatasetVersion, VersionCache
 
-app = FastAPI(
-    title="Amazon Sales Analytics API",
-    version=__version__,
-    description="Executive metrics and operational alerts for sales performance.",
-)
+DATASET_PATH = PROCESSED_DATA_DIR / PROCESSED_STORE_DIRNAME
+ALERTS_PATH = TABLES_DIR / "discount_spike_alerts.csv"
+DATA_VERSION_HEADER = "X-Data-Version"
 
 
 def _existing_path(path: Path) -> Path:
@@ -32,62 +39,196 @@ def _existing_path(path: Path) -> Path:
     return path
 
 
-@lru_cache(maxsize=4)
-def _read_processed_data(dataset_path: str, modified_at_ns: int) -> pd.DataFrame:
-    del modified_at_ns
-    frame = pd.read_csv(dataset_path, parse_dates=["order_date"])
-    return add_derived_metrics(frame)
+@VersionCache
+def _read_processed_data(dataset_path: str, dataset_version: str) -> pd.DataFrame:
+    del dataset_version
+    frame = load_processed_dataset(Path(dataset_path))
+    # Requests share one cached frame per dataset version; in-place writes to it raise.
+    return read_only_frame(add_derived_metrics(frame))
 
 
-def _load_processed_data() -> pd.DataFrame:
+def _dataset_version() -> tuple[str, str]:
     dataset_path = _existing_path(DATASET_PATH)
-    stat = dataset_path.stat()
-    return _read_processed_data(str(dataset_path), stat.st_mtime_ns).copy()
+    # Publishing writes a version manifest, so this reads one small file instead of listing parts.
+    return str(dataset_path), dataset_version(dataset_path)
 
 
-@app.get("/health")
-def health() -> dict[str, str]:
-    return {"status": "ok"}
+def _served_version(response: Response) -> DatasetVersion:
+    # Requests get the last fully built version while a changed dataset is rebuilt.
+    version = refresher.version()
+    response.headers[DATA_VERSION_HEADER] = version[1]
+    return version
 
 
-@app.get("/metrics/summary")
-def metrics_summary() -> dict[str, float]:
-    frame = _load_processed_data()
-    kpis = summarize_kpis(frame)
-    gross_revenue = float(frame["gross_revenue"].sum()) if "gross_revenue" in frame else 0.0
-    total_revenue = float(frame["total_revenue"].sum())
+ServedVersion = Annotated[DatasetVersion, Depends(_served_version)]
+
+
+def _load_processed_data(version: DatasetVersion) -> pd.DataFrame:
+    # A shallow copy shares the cached columns; pandas 3 copy-on-write duplicates a column only
+    # when a handler writes to it, and columns a request adds stay out of the cache.
+    return _read_processed_data(*version).copy(deep=False)
+
+
+@VersionCache
+def _read_report(dataset_path: str, dataset_version: str) -> LazyExecutiveReport:
+    # Sections are computed on first read and then shared by every request for this version.
+    return LazyExecutiveReport(_read_processed_data(dataset_path, dataset_version))
+
+
+@VersionCache
+def _read_leakage_base(dataset_path: str, dataset_version: str) -> LeakageBase:
+    return LeakageBase.from_frame(_read_processed_data(dataset_path, dataset_version))
+
+
+@VersionCache
+def _metrics_summary_payload(dataset_path: str, dataset_version: str) -> dict[str, float]:
+    report = _read_report(dataset_path, dataset_version)
+    totals = report.section("kpi_totals")
+    kpis = dict(zip(report.kpi_summary["metric"], report.kpi_summary["value"], strict=False))
+    gross_revenue = float(totals["gross_revenue"])
+    total_revenue = float(totals["total_revenue"])
 
     return {
         "total_revenue": total_revenue,
         "gross_revenue": gross_revenue,
         "discount_leakage": gross_revenue - total_revenue,
-        "north_star_nrr": kpis["net_revenue_retained"],
-        "total_orders": kpis["total_orders"],
-        "avg_ticket": kpis["avg_ticket"],
+        "north_star_nrr": float(kpis["net_revenue_retained"]),
+        "total_orders": float(kpis["total_orders"]),
+        "avg_ticket": float(kpis["avg_order_value"]),
     }
 
 
+@VersionCache
+def _opportunities_payload(dataset_path: str, dataset_version: str) -> list[dict[str, Any]]:
+    opportunities = rank_discount_opportunities(_read_processed_data(dataset_path, dataset_version))
+    return cast(list[dict[str, Any]], opportunities.to_dict(orient="records"))
+
+
+# Responses are computed once per dataset version and then served from memory; only the served
+# version (plus one being rebuilt) is kept.
+DATASET_CACHES: tuple[VersionCache[Any], ...] = (
+    _read_processed_data,
+    _read_report,
+    _read_leakage_base,
+    _metrics_summary_payload,
+    _opportunities_payload,
+)
+
+
+def _warm_dataset(dataset_path: str, dataset_version: str) -> None:
+    # Every payload is built before the refresher swaps the version in, so the first request
+    # after a refresh is a cache hit.
+    _metrics_summary_payload(dataset_path, dataset_version)
+    _opportunities_payload(dataset_path, dataset_version)
+    _read_leakage_base(dataset_path, dataset_version)
+
+
+def _retire_dataset_versions(version: DatasetVersion) -> None:
+    for cache in DATASET_CACHES:
+        cache.retain(version)
+
+
+refresher = DatasetRefresher(
+    lambda: _dataset_version(), _warm_dataset, retire=_retire_dataset_versions
+)
+
+
+def clear_dataset_caches() -> None:
+    warmup.reset()
+    refresher.reset()
+    for cache in DATASET_CACHES:
+        cache.cache_clear()
+
+
+def _preload_dataset() -> None:
+    refresher.version()
+
+
+# A failed warm-up (e.g. no processed store yet at boot) is retried by the readiness probe.
+WARMUP_RETRY_SECONDS = 5.0
+warmup = BackgroundWarmup(_preload_dataset, retry_interval=WARMUP_RETRY_SECONDS)
+
+
+def data_state() -> str:
+    if warmup.running:
+        return "warming"
+    if refresher.current is not None:
+        return "warm"
+    return "failed" if warmup.error else "cold"
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # The dataset and dashboard payloads are built off the request path; /health/ready
+    # reports 503 until they are.
+    warmup.start()
+    yield
+
+
+app = FastAPI(
+    title="Amazon Sales Analytics API",
+    version=__version__,
+    description="Executive metrics and operational alerts for sales performance.",
+    lifespan=lifespan,
+)
+
+
+RecoveryRate = Annotated[float, Field(ge=0.0, le=1.0)]
+
+
+class ScenarioRequest(BaseModel):
+    recovery_rates: dict[str, RecoveryRate] = Field(default_factory=dict)
+    default_rate: RecoveryRate = 0.0
+
+
+@app.get("/health")
+def health() -> dict[str, str]:
+    return {"status": "ok", "data": data_state()}
+
+
+@app.get("/health/ready")
+def readiness() -> dict[str, str]:
+    state = data_state()
+    if state in ("cold", "failed"):
+        warmup.retry()
+    current = refresher.current
+    if state != "warm" or current is None:
+        raise HTTPException(status_code=503, detail=f"Data not ready: {state}")
+    return {"status": "ready", "data_version": current[1]}
+
+
+@app.get("/metrics/summary")
+def metrics_summary(version: ServedVersion) -> dict[str, float]:
+    return _metrics_summary_payload(*version)
+
+
 @app.get("/api/v1/revenue_metrics")
-def revenue_metrics_v1() -> dict[str, float]:
-    return metrics_summary()
+def revenue_metrics_v1(version: ServedVersion) -> dict[str, float]:
+    return metrics_summary(version)
 
 
 @app.get("/metrics/opportunities")
-def category_opportunities() -> list[dict[str, Any]]:
-    frame = _load_processed_data()
-    opportunities = rank_discount_opportunities(frame)
-    return cast(list[dict[str, Any]], opportunities.to_dict(orient="records"))
+def category_opportunities(version: ServedVersion) -> list[dict[str, Any]]:
+    return _opportunities_payload(*version)
 
 
 @app.get("/alerts/discount-spikes")
-def discount_spikes() -> list[dict[str, Any]]:
+def discount_spikes(response: Response) -> list[dict[str, Any]]:
     if ALERTS_PATH.exists():
         alerts = pd.read_csv(ALERTS_PATH, parse_dates=["order_date"])
     else:
-        frame = _load_processed_data()
+        frame = _load_processed_data(_served_version(response))
         alerts = detect_discount_spikes(frame)
 
     if alerts.empty:
         return []
-    alerts["order_date"] = pd.to_datetime(alerts["order_date"]).dt.date.astype(str)
+    alerts = alerts.assign(order_date=pd.to_datetime(alerts["order_date"]).dt.date.astype(str))
     return cast(list[dict[str, Any]], alerts.to_dict(orient="records"))
+
+
+@app.post("/scenarios/simulate")
+def simulate_scenario(request: ScenarioRequest, version: ServedVersion) -> dict[str, Any]:
+    base = _read_leakage_base(*version)
+    simulation = base.simulate(request.recovery_rates, default_rate=request.default_rate)
+    simulation["unknown_categories"] = sorted(set(request.recovery_rates) - set(base.categories))
+    return simulation
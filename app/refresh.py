@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+DatasetVersion = tuple[str, str]
+
+
+T = TypeVar("T")
+
+
+# Generic[T] rather than PEP 695 syntax so the module still imports on Python 3.11.
+class VersionCache(Generic[T]):  # noqa: UP046
+    """Memoizes ``func(dataset_path, dataset_version)`` and drops versions no longer served.
+
+    Unlike ``lru_cache``, superseded versions are released as soon as :meth:`retain` is called
+    with the version now being served, and results computed late for a retired version (by a
+    request still in flight) are returned without being stored.
+    """
+
+    def __init__(self, func: Callable[[str, str], T]) -> None:
+        functools.update_wrapper(self, func)
+        self._func = func
+        self._lock = threading.Lock()
+        self._entries: dict[DatasetVersion, T] = {}
+        self._retired: set[DatasetVersion] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, dataset_path: str, dataset_version: str) -> T:
+        key = (dataset_path, dataset_version)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = self._func(dataset_path, dataset_version)
+        with self._lock:
+            if key in self._retired:
+                return value
+            return self._entries.setdefault(key, value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def retain(self, version: DatasetVersion) -> None:
+        with self._lock:
+            stale = [key for key in self._entries if key != version]
+            self._retired.update(stale)
+            self._retired.discard(version)
+            for key in stale:
+                del self._entries[key]
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._retired.clear()
+            self.hits = self.misses = 0
+
+
+class DatasetRefresher:
+    """Single-flight rebuilds of per-version caches with stale-while-revalidate.
+
+    ``observe`` returns the ``(path, fingerprint)`` currently on disk, ``warm`` builds the
+    caches for a version and ``retire`` (optional) releases everything but the version just
+    swapped in. With nothing servable for the path yet, one request builds inline
+    while the others wait for it. Once a version is served, a new fingerprint starts exactly
+    one background rebuild; requests keep the previous version until it is warm, and the swap
+    happens under the lock.
+    """
+
+    def __init__(
+        self,
+        observe: Callable[[], DatasetVersion],
+        warm: Callable[[str, str], object],
+        retire: Callable[[DatasetVersion], object] | None = None,
+    ) -> None:
+        self._observe = observe
+        self._warm = warm
+        self._retire = retire
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._current: DatasetVersion | None = None
+        self._refresh: threading.Thread | None = None
+
+    @property
+    def current(self) -> DatasetVersion | None:
+        return self._current
+
+    def version(self) -> DatasetVersion:
+        observed = self._observe()
+        with self._lock:
+            current = self._current
+            if current == observed:
+                return observed
+            if current is not None and current[0] == observed[0]:
+                if self._refresh is None:
+                    self._refresh = threading.Thread(
+                        target=self._rebuild, args=(observed,), name="dataset-refresh", daemon=True
+                    )
+                    self._refresh.start()
+                return current
+
+        with self._build_lock:
+            with self._lock:
+                if self._current == observed:
+                    return observed
+            self._warm(*observed)
+            with self._lock:
+                self._current = observed
+            self._released(observed)
+        return observed
+
+    def join(self, timeout: float | None = None) -> None:
+        refresh = self._refresh
+        if refresh is not None:
+            refresh.join(timeout)
+
+    def reset(self) -> None:
+        self.join()
+        with self._lock:
+            self._current = None
+
+    def _released(self, version: DatasetVersion) -> None:
+        if self._retire is not None:
+            self._retire(version)
+
+    def _rebuild(self, version: DatasetVersion) -> None:
+        try:
+            with self._build_lock:
+                self._warm(*version)
+        except Exception:
+            # The previous version keeps being served; the next request retries.
+            logger.exception("Dataset refresh failed for version %s", version[1])
+        else:
+            with self._lock:
+                swapped = self._current is not None and self._current[0] == version[0]
+                if swapped:
+                    self._current = version
+            if swapped:
+                self._released(version)
+        finally:
+            with self._lock:
+                self._refresh = None
+
+
+class BackgroundWarmup:
+    """Runs a warm-up task in a daemon thread and records whether it is running or failed.
+
+    After a failure, :meth:`retry` starts the task again once ``retry_interval`` seconds have
+    passed, so callers polling it (e.g. a readiness probe) back off instead of hammering.
+    """
+
+    def __init__(self, task: Callable[[], object], *, retry_interval: float = 0.0) -> None:
+        self._task = task
+        self._thread: threading.Thread | None = None
+        self._failed_at: float | None = None
+        self.retry_interval = retry_interval
+        self.error: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="dataset-warmup", daemon=True)
+        self._thread.start()
+
+    def retry(self) -> None:
+        if self.running:
+            return
+        failed_at = self._failed_at
+        if failed_at is not None and time.monotonic() - failed_at < self.retry_interval:
+            return
+        self.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def reset(self) -> None:
+        self.join()
+        self.error = None
+        self._failed_at = None
+
+    def _run(self) -> None:
+        try:
+            self._task()
+        except Exception as exc:
+            logger.exception("Dataset warm-up failed")
+            self.error = str(exc)
+            self._failed_at = time.monotonic()
+        else:
+            self._failed_at = None
@@ -5,20 +5,22 @@ import plotly.express as px
 import streamlit as st
 
 from amazon_sales_analysis.config import PROCESSED_DATA_DIR
-from amazon_sales_analysis.data_preprocessing import read_sales_dataset
 from amazon_sales_analysis.insights import generate_executive_insights
+from amazon_sales_analysis.processed_store import PROCESSED_STORE_DIRNAME, load_processed_dataset
 from amazon_sales_analysis.quality import summarize_quality_gates
 from amazon_sales_analysis.sales_analysis import build_executive_report, prepare_sales_frame
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
-DATASET_PATH = PROCESSED_DATA_DIR / "amazon_sales_clean.csv"
+DATASET_PATH = PROCESSED_DATA_DIR / PROCESSED_STORE_DIRNAME
 
 st.set_page_config(page_title="Amazon Commercial Performance Monitor", layout="wide")
 
 
 @st.cache_data(ttl=3600)
 def load_dataset() -> pd.DataFrame:
-    frame = read_sales_dataset(DATASET_PATH)
+    if not DATASET_PATH.exists():
+        raise FileNotFoundError(f"Arquivo de vendas nao encontrado: {DATASET_PATH}")
+    frame = load_processed_dataset(DATASET_PATH)
     return prepare_sales_frame(frame)
 
 
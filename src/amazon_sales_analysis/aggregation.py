@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import weakref
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .sketches import HyperLogLogCounter, grouped_distinct_estimate, hll_precision, top_k_indices
+
+SUPPORTED_AGGREGATIONS = ("sum", "count", "mean", "nunique")
+
+# Cube measure -> the row-level (column, aggregation) it pre-computes.
+CUBE_MEASURES = {
+    "revenue": ("total_revenue", "sum"),
+    "revenue_count": ("total_revenue", "count"),
+    "gross_revenue": ("gross_revenue", "sum"),
+    "discount_value": ("discount_value", "sum"),
+    "units": ("quantity_sold", "sum"),
+    "orders": ("order_id", "nunique"),
+    "rating_sum": ("rating", "sum"),
+    "rating_count": ("rating", "count"),
+    "discount_percent_sum": ("discount_percent", "sum"),
+    "discount_percent_count": ("discount_percent", "count"),
+}
+SALES_CUBE_COLUMNS = frozenset({"product_category", "revenue", "revenue_count", "orders"})
+
+
+def is_sales_cube(df: pd.DataFrame) -> bool:
+    return SALES_CUBE_COLUMNS.issubset(df.columns) and "order_id" not in df.columns
+
+
+@dataclass(frozen=True)
+class Grouping:
+    codes: np.ndarray
+    size: int
+    keys: pd.DataFrame
+
+
+class SalesAggregator:
+    """Grouped sums, counts and distinct counts served from factorized integer codes.
+
+    Key columns are factorized once per grouping and every metric is a ``np.bincount`` over
+    those codes, so several reports over the same frame share one factorization instead of
+    re-hashing the keys in a fresh ``groupby`` each time. Rows with a missing key are dropped
+    unless ``dropna=False``, which keeps missing keys as their own (last) group, and groups
+    come out sorted by key, matching ``DataFrame.groupby(..., as_index=False, dropna=...)``.
+
+    With ``distinct_error`` set, distinct counts come from HyperLogLog sketches with that
+    relative standard error instead of exact hashing.
+    """
+
+    def __init__(self, df: pd.DataFrame, *, distinct_error: float | None = None) -> None:
+        if distinct_error is not None:
+            hll_precision(distinct_error)
+        self.distinct_error = distinct_error
+        self._frame: pd.DataFrame | None = df
+        self._frame_ref = weakref.ref(df)
+        self._groupings: dict[tuple[tuple[str, ...], bool], Grouping] = {}
+        self._values: dict[str, np.ndarray] = {}
+        self._results: dict[tuple[object, ...], np.ndarray | float] = {}
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        frame = self._frame if self._frame is not None else self._frame_ref()
+        if frame is None:
+            raise RuntimeError("O DataFrame de origem do agregador nao existe mais.")
+        return frame
+
+    def grouping(self, keys: Sequence[str], *, dropna: bool = True) -> Grouping:
+        key_tuple = tuple(keys)
+        cached = self._groupings.get((key_tuple, dropna))
+        if cached is not None:
+            return cached
+
+        frame = self.frame
+        combined = np.zeros(len(frame), dtype=np.int64)
+        valid = np.ones(len(frame), dtype=bool)
+        uniques: list[pd.Index] = []
+        for key in key_tuple:
+            codes, key_uniques = pd.factorize(frame[key], sort=True, use_na_sentinel=dropna)
+            valid &= codes >= 0
+            combined = combined * max(len(key_uniques), 1) + codes
+            uniques.append(key_uniques)
+
+        group_codes, group_values = pd.factorize(combined[valid], sort=True)
+        codes = np.full(len(frame), -1, dtype=np.int64)
+        codes[valid] = group_codes
+
+        key_columns: dict[str, object] = {}
+        remainder = np.asarray(group_values, dtype=np.int64)
+        for key, key_uniques in reversed(list(zip(key_tuple, uniques, strict=True))):
+            width = max(len(key_uniques), 1)
+            key_columns[key] = key_uniques.take(remainder % width)
+            remainder = remainder // width
+        keys_frame = pd.DataFrame({key: key_columns[key] for key in key_tuple})
+
+        grouping = Grouping(codes=codes, size=len(group_values), keys=keys_frame)
+        self._groupings[(key_tuple, dropna)] = grouping
+        return grouping
+
+    def _column(self, column: str) -> np.ndarray:
+        if column not in self._values:
+            self._values[column] = self.frame[column].to_numpy(dtype=float, na_value=np.nan)
+        return self._values[column]
+
+    def _is_integer(self, column: str) -> bool:
+        dtype = self.frame[column].dtype
+        return bool(pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype))
+
+    def has_column(self, column: str) -> bool:
+        return column in self.frame.columns
+
+    def total(self, column: str) -> float:
+        cache_key = ("total", column)
+        if cache_key not in self._results:
+            self._results[cache_key] = float(np.nansum(self._column(column)))
+        return float(self._results[cache_key])
+
+    def count_total(self, column: str) -> float:
+        return float(self.frame[column].count())
+
+    def distinct_total(self, column: str) -> float:
+        cache_key = ("distinct_total", column)
+        if cache_key not in self._results:
+            if self.distinct_error is None:
+                self._results[cache_key] = float(self.frame[column].nunique())
+            else:
+                counter = HyperLogLogCounter.from_values(
+                    self.frame[column], relative_error=self.distinct_error
+                )
+                self._results[cache_key] = float(round(counter.estimate()))
+        return float(self._results[cache_key])
+
+    def reduce(
+        self, keys: Sequence[str], column: str, how: str, *, dropna: bool = True
+    ) -> np.ndarray:
+        if how not in SUPPORTED_AGGREGATIONS:
+            raise ValueError(f"Agregacao nao suportada: {how}")
+        cache_key = (tuple(keys), column, how) if dropna else (tuple(keys), column, how, False)
+        cached = self._results.get(cache_key)
+        if isinstance(cached, np.ndarray):
+            return cached
+
+        grouping = self.grouping(keys, dropna=dropna)
+        if how == "nunique":
+            result = self._nunique(grouping, column)
+        elif how == "mean":
+            sums = self.reduce(keys, column, "sum", dropna=dropna).astype(float)
+            counts = self.reduce(keys, column, "count", dropna=dropna)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                result = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        else:
+            values = self._column(column)
+            present = ~np.isnan(values)
+            mask = (grouping.codes >= 0) & present
+            weights = values[mask] if how == "sum" else None
+            result = np.bincount(grouping.codes[mask], weights=weights, minlength=grouping.size)
+            if how == "count" or self._is_integer(column):
+                result = result.astype(np.int64)
+        self._results[cache_key] = result
+        return result
+
+    def reduce_groups(
+        self, keys: Sequence[str], column: str, how: str, groups: np.ndarray
+    ) -> np.ndarray:
+        cached = self._results.get((tuple(keys), column, how))
+        if isinstance(cached, np.ndarray) or how != "nunique":
+            values = self.reduce(keys, column, how)
+        else:
+            # Distinct counts are the costly reduction, so only the selected groups are hashed.
+            values = self._nunique(self.grouping(keys), column, groups)
+        selected: np.ndarray = values[groups]
+        return selected
+
+    def top_groups(self, keys: Sequence[str], column: str, n: int) -> np.ndarray:
+        return top_k_indices(self.reduce(keys, column, "sum").astype(float), n)
+
+    def _nunique(
+        self, grouping: Grouping, column: str, groups: np.ndarray | None = None
+    ) -> np.ndarray:
+        codes = grouping.codes
+        if groups is not None:
+            selected = np.zeros(grouping.size, dtype=bool)
+            selected[groups] = True
+            codes = np.where((codes >= 0) & selected[np.maximum(codes, 0)], codes, -1)
+        if self.distinct_error is not None:
+            estimate = grouped_distinct_estimate(
+                codes,
+                self.frame[column],
+                grouping.size,
+                relative_error=self.distinct_error,
+            )
+            counts: np.ndarray = np.rint(estimate).astype(np.int64)
+            return counts
+        value_codes, value_uniques = pd.factorize(self.frame[column])
+        width = max(len(value_uniques), 1)
+        mask = (codes >= 0) & (value_codes >= 0)
+        pairs = pd.unique(codes[mask] * width + value_codes[mask])
+        return np.bincount(pairs // width, minlength=grouping.size).astype(np.int64)
+
+    def aggregate(
+        self, keys: Sequence[str], *, dropna: bool = True, **named: tuple[str, str]
+    ) -> pd.DataFrame:
+        result = self.grouping(keys, dropna=dropna).keys.copy()
+        for name, (column, how) in named.items():
+            result[name] = self.reduce(keys, column, how, dropna=dropna)
+        return result
+
+    def aggregate_groups(
+        self, keys: Sequence[str], groups: np.ndarray, **named: tuple[str, str]
+    ) -> pd.DataFrame:
+        result = self.grouping(keys).keys.iloc[groups].copy()
+        for name, (column, how) in named.items():
+            result[name] = self.reduce_groups(keys, column, how, groups)
+        return result
+
+
+class CubeAggregator(SalesAggregator):
+    """Serves the same requests as :class:`SalesAggregator` from a pre-aggregated sales cube.
+
+    Row-level ``(column, how)`` requests are rewritten to sums of the matching cube measure.
+    Distinct order counts are summed across cells, which is exact while every order falls in a
+    single cell of the cube grain.
+    """
+
+    _LOOKUP = {spec: measure for measure, spec in CUBE_MEASURES.items()}
+
+    def measure(self, column: str, how: str) -> str:
+        measure = self._LOOKUP.get((column, how))
+        if measure is None or measure not in self.frame.columns:
+            raise ValueError(f"Metrica indisponivel no cubo: {column} ({how})")
+        return measure
+
+    def has_column(self, column: str) -> bool:
+        return any(
+            source == column and measure in self.frame.columns
+            for measure, (source, _) in CUBE_MEASURES.items()
+        )
+
+    def grouping(self, keys: Sequence[str], *, dropna: bool = True) -> Grouping:
+        missing = [key for key in keys if key not in self.frame.columns]
+        if missing:
+            raise ValueError(f"Dimensao indisponivel no cubo: {', '.join(missing)}")
+        return super().grouping(keys, dropna=dropna)
+
+    def total(self, column: str) -> float:
+        return super().total(self.measure(column, "sum"))
+
+    def count_total(self, column: str) -> float:
+        return super().total(self.measure(column, "count"))
+
+    def distinct_total(self, column: str) -> float:
+        return super().total(self.measure(column, "nunique"))
+
+    def reduce(
+        self, keys: Sequence[str], column: str, how: str, *, dropna: bool = True
+    ) -> np.ndarray:
+        if how == "mean":
+            return super().reduce(keys, column, how, dropna=dropna)
+        return super().reduce(keys, self.measure(column, how), "sum", dropna=dropna)
+
+    def reduce_groups(
+        self, keys: Sequence[str], column: str, how: str, groups: np.ndarray
+    ) -> np.ndarray:
+        selected: np.ndarray = self.reduce(keys, column, how)[groups]
+        return selected
+
+
+def read_only_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Rebuild ``frame`` over read-only views of its numpy columns, without copying data.
+
+    Writes to the frame itself then raise instead of silently invalidating reductions cached
+    for it, while views derived from it (shallow copies, selections) copy on write as pandas 3
+    always does; extension-array columns rely on copy-on-write alone.
+    """
+    columns: dict[str, Any] = {}
+    for name, series in frame.items():
+        values = series.array
+        if isinstance(series.dtype, np.dtype):
+            values = series.to_numpy().view()
+            values.flags.writeable = False
+        columns[str(name)] = values
+    frozen = pd.DataFrame(columns, index=frame.index, copy=False)
+    frozen.attrs.update(frame.attrs)
+    return frozen
+
+
+_AGGREGATORS: dict[int, SalesAggregator] = {}
+
+
+def cached_aggregator(df: pd.DataFrame) -> SalesAggregator:
+    key = id(df)
+    cached = _AGGREGATORS.get(key)
+    if cached is not None and cached._frame_ref() is df:
+        return cached
+    aggregator = CubeAggregator(df) if is_sales_cube(df) else SalesAggregator(df)
+    # Cached aggregators only reference their frame weakly so the cache never keeps it alive.
+    aggregator._frame = None
+    _AGGREGATORS[key] = aggregator
+    weakref.finalize(df, _AGGREGATORS.pop, key, None)
+    return aggregator
@@ -1,74 +1,646 @@
 from __future__ import annotations
 
+import json
+import math
+from collections import deque
+from collections.abc import Mapping, Sequence
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
-from .config import TABLES_DIR
+from .aggregation import SalesAggregator, is_sales_cube
+from .config import PROCESSED_DATA_DIR, TABLES_DIR
+from .sales_analysis import is_prepared_sales_frame, sales_aggregator
 
+DAILY_DISCOUNT_AGGREGATIONS = {
+    "discount_percent_sum": ("discount_percent", "sum"),
+    "discount_percent_count": ("discount_percent", "count"),
+    "gross_revenue": ("gross_revenue", "sum"),
+}
+SPIKE_ALERT_COLUMNS = [
+    "order_date",
+    "product_category",
+    "avg_discount_percent",
+    "baseline_mean",
+    "baseline_std",
+    "z_score",
+    "gross_revenue",
+    "estimated_leakage_usd",
+    "severity",
+]
+SEVERITY_LEVELS = ("medium", "high", "critical")
+BASELINE_METHODS = ("all_time", "rolling", "ewm")
+HIGH_SEVERITY_Z = 3.5
+CRITICAL_SEVERITY_Z = 5.0
+SPIKE_DETECTOR_STATE_PATH = PROCESSED_DATA_DIR / "discount_spike_detector.json"
+SPIKE_DIMENSIONS: dict[str, list[str]] = {
+    "category": ["product_category"],
+    "category_region": ["product_category", "customer_region"],
+    "category_payment": ["product_category", "payment_method"],
+    "product": ["product_category", "product_id"],
+}
+SLICE_COLUMNS = ["product_category", "customer_region", "payment_method", "product_id"]
+SLICE_ALERT_COLUMNS = [
+    "dimension",
+    "slice",
+    "order_date",
+    *SLICE_COLUMNS,
+    *SPIKE_ALERT_COLUMNS[2:],
+]
 
-def detect_discount_spikes(
-    df: pd.DataFrame,
-    *,
-    z_threshold: float = 2.5,
-    min_observations: int = 5,
+
+def aggregate_daily_discounts(
+    df: pd.DataFrame, dimensions: Sequence[str] = ("product_category",), *, dropna: bool = True
 ) -> pd.DataFrame:
-    frame = df.copy()
-    frame["order_date"] = pd.to_datetime(frame["order_date"], errors="coerce")
-    frame = frame.dropna(subset=["order_date"])
-
-    if "gross_revenue" not in frame.columns:
-        frame["gross_revenue"] = frame["price"] * frame["quantity_sold"]
-
-    daily = (
-        frame.groupby(["product_category", "order_date"], as_index=False)
-        .agg(
-            avg_discount_percent=("discount_percent", "mean"),
-            gross_revenue=("gross_revenue", "sum"),
-        )
-        .sort_values(["product_category", "order_date"])
+    keys = [*dimensions, "order_date"]
+    if is_prepared_sales_frame(df) or is_sales_cube(df):
+        # Prepared frames and cubes carry parsed dates and gross revenue.
+        return sales_aggregator(df).aggregate(keys, dropna=dropna, **DAILY_DISCOUNT_AGGREGATIONS)
+
+    gross_revenue = (
+        df["gross_revenue"] if "gross_revenue" in df.columns else df["price"] * df["quantity_sold"]
     )
+    frame = pd.DataFrame(
+        {
+            **{dimension: df[dimension] for dimension in dimensions},
+            "order_date": pd.to_datetime(df["order_date"], errors="coerce"),
+            "discount_percent": df["discount_percent"],
+            "gross_revenue": gross_revenue,
+        }
+    ).dropna(subset=["order_date"])
+
+    return frame.groupby(keys, as_index=False, dropna=dropna).agg(**DAILY_DISCOUNT_AGGREGATIONS)
+
+
+@dataclass(frozen=True)
+class SpikeBaseline:
+    """How the per-category baseline of daily average discounts is built.
+
+    ``all_time`` is the mean/std of every day of the category. ``rolling`` uses the previous
+    ``window`` days and ``ewm`` an exponentially weighted mean/std of the previous days with the
+    given ``halflife`` (in days), so old promotions stop inflating the baseline.
+    """
+
+    method: str = "all_time"
+    window: int = 28
+    halflife: float = 7.0
+
+    def __post_init__(self) -> None:
+        if self.method not in BASELINE_METHODS:
+            raise ValueError(f"Metodo de baseline nao suportado: {self.method}")
+        if self.window < 2:
+            raise ValueError("A janela do baseline deve ser maior ou igual a 2.")
+        if self.halflife <= 0:
+            raise ValueError("A meia-vida do baseline deve ser maior que zero.")
+
+    @property
+    def alpha(self) -> float:
+        return float(1.0 - 0.5 ** (1.0 / self.halflife))
+
+
+def _trailing_baseline(daily: pd.DataFrame, baseline: SpikeBaseline) -> tuple[pd.Series, pd.Series]:
+    # Each day is compared with the category's earlier days only.
+    categories = daily["product_category"]
+    prior = daily["avg_discount_percent"].groupby(categories, observed=True).shift()
+    by_category = prior.groupby(categories, observed=True)
+    if baseline.method == "rolling":
+        window = by_category.rolling(baseline.window, min_periods=1)
+        mean, std = window.mean(), window.std()
+    else:
+        weighted = by_category.ewm(alpha=baseline.alpha, adjust=False, ignore_na=True)
+        mean, std = weighted.mean(), np.sqrt(weighted.var(bias=True))
+    return mean.droplevel(0), std.droplevel(0)
+
+
+def classify_spike_severities(z_scores: np.ndarray) -> np.ndarray:
+    severities: np.ndarray = np.select(
+        [z_scores > CRITICAL_SEVERITY_Z, z_scores > HIGH_SEVERITY_Z],
+        ["critical", "high"],
+        default="medium",
+    ).astype(object)
+    return severities
+
+
+def compute_daily_z_scores(
+    aggregated: pd.DataFrame, *, baseline: SpikeBaseline | None = None
+) -> pd.DataFrame:
+    baseline = baseline or SpikeBaseline()
+    daily = pd.DataFrame(
+        {
+            "product_category": aggregated["product_category"],
+            "order_date": aggregated["order_date"],
+            "avg_discount_percent": aggregated["discount_percent_sum"]
+            / aggregated["discount_percent_count"].where(aggregated["discount_percent_count"] > 0),
+            "gross_revenue": aggregated["gross_revenue"],
+        }
+    ).sort_values(["product_category", "order_date"])
 
     grouped = daily.groupby("product_category")
-    daily["baseline_mean"] = grouped["avg_discount_percent"].transform("mean")
-    daily["baseline_std"] = grouped["avg_discount_percent"].transform("std").fillna(0.0)
-    daily["obs_count"] = grouped["avg_discount_percent"].transform("count")
+    if baseline.method == "all_time":
+        daily["baseline_mean"] = grouped["avg_discount_percent"].transform("mean")
+        daily["baseline_std"] = grouped["avg_discount_percent"].transform("std").fillna(0.0)
+        daily["obs_count"] = grouped["avg_discount_percent"].transform("count")
+    else:
+        mean, std = _trailing_baseline(daily, baseline)
+        daily["baseline_mean"] = mean
+        daily["baseline_std"] = std.fillna(0.0)
+        daily["obs_count"] = grouped.cumcount() + 1
 
     safe_std = daily["baseline_std"].replace(0, pd.NA)
     daily["z_score"] = ((daily["avg_discount_percent"] - daily["baseline_mean"]) / safe_std).fillna(
         0.0
     )
-    daily["discount_gap_pct"] = (daily["avg_discount_percent"] - daily["baseline_mean"]).clip(
-        lower=0
+    daily["discount_gap_pct"] = (
+        (daily["avg_discount_percent"] - daily["baseline_mean"]).clip(lower=0).fillna(0.0)
     )
     daily["estimated_leakage_usd"] = daily["gross_revenue"] * (daily["discount_gap_pct"] / 100.0)
+    return daily
+
 
+def score_daily_discounts(
+    aggregated: pd.DataFrame,
+    *,
+    z_threshold: float = 2.5,
+    min_observations: int = 5,
+    baseline: SpikeBaseline | None = None,
+) -> pd.DataFrame:
+    daily = compute_daily_z_scores(aggregated, baseline=baseline)
     alerts = daily[
         (daily["obs_count"] >= min_observations) & (daily["z_score"] >= z_threshold)
     ].copy()
-    alerts["severity"] = pd.cut(
-        alerts["z_score"],
-        bins=[z_threshold, 3.5, 5.0, float("inf")],
-        labels=["medium", "high", "critical"],
-        include_lowest=True,
-    ).astype(str)
-
-    export_columns = [
-        "order_date",
-        "product_category",
-        "avg_discount_percent",
-        "baseline_mean",
-        "baseline_std",
-        "z_score",
-        "gross_revenue",
-        "estimated_leakage_usd",
-        "severity",
-    ]
-    return alerts[export_columns].sort_values(
+    alerts["severity"] = classify_spike_severities(alerts["z_score"].to_numpy(dtype=float))
+
+    return alerts[SPIKE_ALERT_COLUMNS].sort_values(
         ["severity", "estimated_leakage_usd"], ascending=[False, False]
     )
 
 
+def sweep_daily_thresholds(
+    daily: pd.DataFrame,
+    *,
+    z_thresholds: Sequence[float],
+    min_observations: Sequence[int],
+) -> pd.DataFrame:
+    """Alert counts, leakage and severity mix for every threshold pair from one set of z-scores.
+
+    ``daily`` comes from :func:`compute_daily_z_scores`. Scores are sorted once; each grid point
+    is then a binary search plus a lookup in suffix sums of the estimated leakage.
+    """
+    order = np.argsort(daily["z_score"].to_numpy(dtype=float), kind="stable")
+    z_sorted = daily["z_score"].to_numpy(dtype=float)[order]
+    obs_sorted = daily["obs_count"].to_numpy(dtype=float)[order]
+    leakage_sorted = daily["estimated_leakage_usd"].fillna(0.0).to_numpy(dtype=float)[order]
+    thresholds = np.asarray(sorted(z_thresholds), dtype=float)
+
+    rows = []
+    for minimum in sorted(min_observations):
+        eligible = obs_sorted >= minimum
+        scores = z_sorted[eligible]
+        leakage_suffix = np.concatenate([np.cumsum(leakage_sorted[eligible][::-1])[::-1], [0.0]])
+        starts = np.searchsorted(scores, thresholds, side="left")
+        alerts = len(scores) - starts
+        above_high = len(scores) - np.searchsorted(scores, HIGH_SEVERITY_Z, side="right")
+        above_critical = len(scores) - np.searchsorted(scores, CRITICAL_SEVERITY_Z, side="right")
+        critical = np.minimum(alerts, above_critical)
+        high = np.minimum(alerts, above_high) - critical
+        rows.append(
+            pd.DataFrame(
+                {
+                    "z_threshold": thresholds,
+                    "min_observations": minimum,
+                    "alerts_count": alerts,
+                    "estimated_leakage_usd": leakage_suffix[starts],
+                    "medium": alerts - high - critical,
+                    "high": high,
+                    "critical": critical,
+                }
+            )
+        )
+    return pd.concat(rows, ignore_index=True)
+
+
+def sweep_discount_spike_thresholds(
+    df: pd.DataFrame,
+    *,
+    z_thresholds: Sequence[float],
+    min_observations: Sequence[int],
+    baseline: SpikeBaseline | None = None,
+) -> pd.DataFrame:
+    return sweep_daily_thresholds(
+        compute_daily_z_scores(aggregate_daily_discounts(df), baseline=baseline),
+        z_thresholds=z_thresholds,
+        min_observations=min_observations,
+    )
+
+
+def detect_discount_spikes(
+    df: pd.DataFrame,
+    *,
+    z_threshold: float = 2.5,
+    min_observations: int = 5,
+    baseline: SpikeBaseline | None = None,
+) -> pd.DataFrame:
+    return score_daily_discounts(
+        aggregate_daily_discounts(df),
+        z_threshold=z_threshold,
+        min_observations=min_observations,
+        baseline=baseline,
+    )
+
+
+def _score_slices(
+    daily: pd.DataFrame, keys: list[str], *, z_threshold: float, min_observations: int
+) -> pd.DataFrame:
+    grouping = SalesAggregator(daily).grouping(keys)
+    codes = grouping.codes
+    counts = daily["discount_percent_count"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average = daily["discount_percent_sum"].to_numpy(dtype=float) / counts
+    observed = (codes >= 0) & (counts > 0)
+    days = np.bincount(codes[observed], minlength=grouping.size)
+
+    # Sparse slices are pruned before any baseline work.
+    keep = observed & (days[np.maximum(codes, 0)] >= min_observations)
+    codes, average = codes[keep], average[keep]
+    rows = np.flatnonzero(keep)
+    n = days.astype(float)
+    mean = np.bincount(codes, weights=average, minlength=grouping.size) / np.maximum(n, 1)
+    deviation = average - mean[codes]
+    m2 = np.bincount(codes, weights=deviation**2, minlength=grouping.size)
+    std = np.sqrt(m2 / np.maximum(n - 1, 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_score = np.where((n[codes] > 1) & (std[codes] > 0), deviation / std[codes], 0.0)
+
+    hits = z_score >= z_threshold
+    hit_rows, hit_codes = rows[hits], codes[hits]
+    alerts = daily.iloc[hit_rows][[*keys, "order_date"]].reset_index(drop=True)
+    gross_revenue = daily["gross_revenue"].to_numpy(dtype=float)[hit_rows]
+    alerts["avg_discount_percent"] = average[hits]
+    alerts["baseline_mean"] = mean[hit_codes]
+    alerts["baseline_std"] = std[hit_codes]
+    alerts["z_score"] = z_score[hits]
+    alerts["gross_revenue"] = gross_revenue
+    alerts["estimated_leakage_usd"] = gross_revenue * np.clip(deviation[hits], 0, None) / 100.0
+    alerts["severity"] = classify_spike_severities(z_score[hits])
+    return alerts
+
+
+def detect_multidimensional_spikes(
+    df: pd.DataFrame,
+    *,
+    dimensions: Mapping[str, Sequence[str]] | None = None,
+    z_threshold: float = 2.5,
+    min_observations: int = 5,
+) -> pd.DataFrame:
+    """Discount spikes per slice for several dimension combinations in one pass.
+
+    Orders are aggregated once to the finest daily grain the dimensions need, keeping missing
+    keys; each combination is rolled up from that table and baselined with grouped ``bincount``
+    reductions. Slices with fewer than ``min_observations`` days are pruned before scoring.
+    """
+    dimensions = SPIKE_DIMENSIONS if dimensions is None else dimensions
+    unknown = sorted({key for keys in dimensions.values() for key in keys} - set(SLICE_COLUMNS))
+    if unknown:
+        raise ValueError(f"Dimensao de alerta nao suportada: {', '.join(unknown)}")
+    cell_keys = [key for key in SLICE_COLUMNS if any(key in keys for keys in dimensions.values())]
+    # Cells keep missing keys so each combination only drops rows missing one of its own keys.
+    cells = aggregate_daily_discounts(df, cell_keys, dropna=False)
+    rollup = SalesAggregator(cells)
+
+    slices = []
+    for name, keys in dimensions.items():
+        daily = rollup.aggregate(
+            [*keys, "order_date"],
+            dropna=True,
+            **{column: (column, "sum") for column in DAILY_DISCOUNT_AGGREGATIONS},
+        )
+        alerts = _score_slices(
+            daily, list(keys), z_threshold=z_threshold, min_observations=min_observations
+        )
+        alerts.insert(0, "dimension", name)
+        label = alerts[keys[0]].astype(str)
+        for key in keys[1:]:
+            label = label + " / " + alerts[key].astype(str)
+        alerts.insert(1, "slice", label)
+        slices.append(alerts)
+
+    return (
+        pd.concat(slices, ignore_index=True)
+        .reindex(columns=SLICE_ALERT_COLUMNS)
+        .sort_values(["severity", "estimated_leakage_usd"], ascending=[False, False])
+        .reset_index(drop=True)
+    )
+
+
+def classify_spike_severity(z_score: float) -> str:
+    if z_score > CRITICAL_SEVERITY_Z:
+        return "critical"
+    if z_score > HIGH_SEVERITY_Z:
+        return "high"
+    return "medium"
+
+
+@dataclass
+class RunningBaseline:
+    """Running mean/variance of closed daily discounts plus the still-open day.
+
+    By default this is Welford over every closed day. With ``window`` the oldest day leaves
+    the Welford sums once the window is full; with ``alpha`` ``m2`` holds the exponentially
+    weighted variance of ``ewm(adjust=False)``. ``count`` is always the number of closed days.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    window: int | None = None
+    alpha: float | None = None
+    recent: deque[float] = field(default_factory=deque)
+    open_date: pd.Timestamp | None = None
+    open_discount_sum: float = 0.0
+    open_discount_count: float = 0.0
+    open_gross_revenue: float = 0.0
+    open_severity: int = -1
+
+    @classmethod
+    def for_spec(cls, baseline: SpikeBaseline) -> RunningBaseline:
+        return cls(
+            window=baseline.window if baseline.method == "rolling" else None,
+            alpha=baseline.alpha if baseline.method == "ewm" else None,
+        )
+
+    @property
+    def std(self) -> float:
+        if self.alpha is not None:
+            return math.sqrt(max(self.m2, 0.0))
+        n = len(self.recent) if self.window is not None else self.count
+        return math.sqrt(max(self.m2, 0.0) / (n - 1)) if n > 1 else 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if self.alpha is not None:
+            delta = value - self.mean if self.count > 1 else 0.0
+            self.mean = self.mean + self.alpha * delta if self.count > 1 else value
+            self.m2 = (1.0 - self.alpha) * (self.m2 + self.alpha * delta * delta)
+            return
+        if self.window is not None:
+            self.recent.append(value)
+        n = len(self.recent) if self.window is not None else self.count
+        delta = value - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (value - self.mean)
+        if self.window is not None and len(self.recent) > self.window:
+            # Reverse Welford step for the day leaving the window.
+            oldest = self.recent.popleft()
+            previous_mean = self.mean
+            self.mean += (previous_mean - oldest) / len(self.recent)
+            self.m2 -= (oldest - previous_mean) * (oldest - self.mean)
+
+    def close_day(self) -> None:
+        if self.open_discount_count > 0:
+            self.add(self.open_discount_sum / self.open_discount_count)
+        self.open_date = None
+        self.open_discount_sum = self.open_discount_count = self.open_gross_revenue = 0.0
+        self.open_severity = -1
+
+    def observe(
+        self,
+        order_date: pd.Timestamp,
+        discount_sum: float,
+        discount_count: float,
+        gross_revenue: float,
+    ) -> None:
+        if self.open_date != order_date:
+            self.close_day()
+            self.open_date = order_date
+        self.open_discount_sum += discount_sum
+        self.open_discount_count += discount_count
+        self.open_gross_revenue += gross_revenue
+
+
+class StreamingSpikeDetector:
+    """Online discount spike detector with constant-size state per ``product_category``.
+
+    Each day is scored against the Welford baseline of the category's earlier days as soon as
+    its orders arrive, and folded into the baseline once a later day shows up. Alerts carry the
+    columns of :func:`detect_discount_spikes`; a day is re-emitted only when its severity
+    escalates. Rows for days older than the open day update the baseline without being scored.
+    ``baseline`` selects an all-time, rolling-window or exponentially weighted baseline; each
+    update is O(1) per day either way.
+    """
+
+    def __init__(
+        self,
+        *,
+        z_threshold: float = 2.5,
+        min_observations: int = 5,
+        baseline: SpikeBaseline | None = None,
+        baselines: dict[str, RunningBaseline] | None = None,
+        last_order_date: pd.Timestamp | None = None,
+        batches: int = 0,
+    ) -> None:
+        self.z_threshold = z_threshold
+        self.min_observations = min_observations
+        self.baseline = baseline or SpikeBaseline()
+        self.baselines = baselines if baselines is not None else {}
+        self.last_order_date = last_order_date
+        self.batches = batches
+
+    @property
+    def resume_date(self) -> pd.Timestamp | None:
+        """Earliest still-open day; re-reading from here lets :meth:`rescan` rebuild open days."""
+        open_dates = [
+            baseline.open_date
+            for baseline in self.baselines.values()
+            if baseline.open_date is not None
+        ]
+        return min(open_dates, default=None)
+
+    def update(self, batch: pd.DataFrame) -> pd.DataFrame:
+        if batch.empty:
+            return pd.DataFrame(columns=SPIKE_ALERT_COLUMNS)
+        daily = (
+            batch if "discount_percent_sum" in batch.columns else aggregate_daily_discounts(batch)
+        )
+        self.batches += 1
+        alerts: list[dict[str, object]] = []
+        touched: set[str] = set()
+        daily = daily.sort_values("order_date", kind="stable")
+        rows = zip(
+            daily["product_category"].astype(str),
+            pd.to_datetime(daily["order_date"]),
+            daily["discount_percent_sum"].to_numpy(dtype=float),
+            daily["discount_percent_count"].to_numpy(dtype=float),
+            daily["gross_revenue"].to_numpy(dtype=float),
+            strict=True,
+        )
+        for category, order_date, discount_sum, discount_count, gross_revenue in rows:
+            baseline = self.baselines.get(category)
+            if baseline is None:
+                baseline = self.baselines[category] = RunningBaseline.for_spec(self.baseline)
+            if baseline.open_date is not None and order_date < baseline.open_date:
+                if discount_count > 0:
+                    baseline.add(discount_sum / discount_count)
+                continue
+            if baseline.open_date is not None and order_date > baseline.open_date:
+                # Final score of the previous day before it joins the baseline.
+                alerts.extend(self._score(category, baseline))
+            baseline.observe(order_date, discount_sum, discount_count, gross_revenue)
+            touched.add(category)
+            if self.last_order_date is None or order_date > self.last_order_date:
+                self.last_order_date = order_date
+
+        for category in sorted(touched):
+            alerts.extend(self._score(category, self.baselines[category]))
+        return pd.DataFrame(alerts, columns=SPIKE_ALERT_COLUMNS)
+
+    def rescan(self, batch: pd.DataFrame) -> pd.DataFrame:
+        """Score a batch that re-reads every open day in full, e.g. from :attr:`resume_date`.
+
+        Open days are rebuilt from the batch instead of being added to, and rows of days a
+        category has already closed are skipped. Alerts already emitted are not repeated.
+        """
+        if batch.empty:
+            return pd.DataFrame(columns=SPIKE_ALERT_COLUMNS)
+        daily = (
+            batch if "discount_percent_sum" in batch.columns else aggregate_daily_discounts(batch)
+        )
+        open_dates = {
+            category: baseline.open_date
+            for category, baseline in self.baselines.items()
+            if baseline.open_date is not None
+        }
+        keep = [
+            category not in open_dates or order_date >= open_dates[category]
+            for category, order_date in zip(
+                daily["product_category"].astype(str),
+                pd.to_datetime(daily["order_date"]),
+                strict=True,
+            )
+        ]
+        fresh = daily[keep]
+        for baseline in self.baselines.values():
+            baseline.open_discount_sum = baseline.open_discount_count = 0.0
+            baseline.open_gross_revenue = 0.0
+        return self.update(fresh)
+
+    def flush(self) -> pd.DataFrame:
+        """Score and close every open day, e.g. at the end of a stream."""
+        alerts: list[dict[str, object]] = []
+        for category, baseline in sorted(self.baselines.items()):
+            if baseline.open_date is not None:
+                alerts.extend(self._score(category, baseline))
+                baseline.close_day()
+        return pd.DataFrame(alerts, columns=SPIKE_ALERT_COLUMNS)
+
+    def _score(self, category: str, baseline: RunningBaseline) -> list[dict[str, object]]:
+        # The open day counts as an observation, matching ``obs_count`` in the batch scorer.
+        if baseline.count + 1 < self.min_observations or baseline.open_discount_count <= 0:
+            return []
+        std = baseline.std
+        if std == 0:
+            return []
+        avg_discount = baseline.open_discount_sum / baseline.open_discount_count
+        z_score = (avg_discount - baseline.mean) / std
+        if z_score < self.z_threshold:
+            return []
+        severity = classify_spike_severity(z_score)
+        level = SEVERITY_LEVELS.index(severity)
+        if level <= baseline.open_severity:
+            return []
+        baseline.open_severity = level
+        gap = max(avg_discount - baseline.mean, 0.0)
+        return [
+            {
+                "order_date": baseline.open_date,
+                "product_category": category,
+                "avg_discount_percent": avg_discount,
+                "baseline_mean": baseline.mean,
+                "baseline_std": std,
+                "z_score": z_score,
+                "gross_revenue": baseline.open_gross_revenue,
+                "estimated_leakage_usd": baseline.open_gross_revenue * gap / 100.0,
+                "severity": severity,
+            }
+        ]
+
+
+def save_spike_detector(detector: StreamingSpikeDetector, path: Path | None = None) -> Path:
+    target = path or SPIKE_DETECTOR_STATE_PATH
+    target.parent.mkdir(parents=True, exist_ok=True)
+    baselines = {
+        category: {
+            **asdict(baseline),
+            "open_date": baseline.open_date.isoformat() if baseline.open_date is not None else None,
+            "recent": list(baseline.recent),
+        }
+        for category, baseline in detector.baselines.items()
+    }
+    payload = {
+        "z_threshold": detector.z_threshold,
+        "min_observations": detector.min_observations,
+        "baseline": asdict(detector.baseline),
+        "last_order_date": (
+            detector.last_order_date.isoformat() if detector.last_order_date is not None else None
+        ),
+        "batches": detector.batches,
+        "baselines": baselines,
+    }
+    partial = target.with_name(f"{target.name}.partial")
+    partial.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    partial.replace(target)
+    return target
+
+
+def load_spike_detector(
+    path: Path | None = None,
+    *,
+    z_threshold: float | None = None,
+    min_observations: int | None = None,
+    baseline: SpikeBaseline | None = None,
+) -> StreamingSpikeDetector:
+    """Restore a checkpointed detector; explicit thresholds override the persisted ones.
+
+    The baseline method cannot change once state exists, since the running sums depend on it.
+    """
+    source = path or SPIKE_DETECTOR_STATE_PATH
+    if not source.exists():
+        return StreamingSpikeDetector(
+            z_threshold=2.5 if z_threshold is None else z_threshold,
+            min_observations=5 if min_observations is None else min_observations,
+            baseline=baseline,
+        )
+
+    payload = json.loads(source.read_text(encoding="utf-8"))
+    persisted = SpikeBaseline(**payload.get("baseline", {}))
+    if baseline is not None and baseline != persisted:
+        raise ValueError(
+            f"O estado salvo usa outro baseline ({persisted.method}); remova {source} para trocar."
+        )
+    baselines = {
+        category: RunningBaseline(
+            **{
+                **values,
+                "open_date": pd.Timestamp(values["open_date"]) if values["open_date"] else None,
+                "recent": deque(values.get("recent", [])),
+            }
+        )
+        for category, values in payload.get("baselines", {}).items()
+    }
+    last_order_date = payload.get("last_order_date")
+    return StreamingSpikeDetector(
+        z_threshold=float(payload["z_threshold"] if z_threshold is None else z_threshold),
+        min_observations=int(
+            payload["min_observations"] if min_observations is None else min_observations
+        ),
+        baseline=persisted,
+        baselines=baselines,
+        last_order_date=pd.Timestamp(last_order_date) if last_order_date else None,
+        batches=int(payload.get("batches", 0)),
+    )
+
+
 def export_discount_spike_alerts(alerts: pd.DataFrame, output_path: Path | None = None) -> Path:
     target = output_path or (TABLES_DIR / "discount_spike_alerts.csv")
     target.parent.mkdir(parents=True, exist_ok=True)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
+from dataclasses import asdict
 from datetime import UTC, datetime
 from pathlib import Path
 
@@ -9,10 +10,36 @@ import pandas as pd
 
 from amazon_sales_analysis import __version__
 from amazon_sales_analysis.anomaly_detection import (
+    BASELINE_METHODS,
+    SPIKE_ALERT_COLUMNS,
+    SpikeBaseline,
     detect_discount_spikes,
     export_discount_spike_alerts,
+    load_spike_detector,
+    save_spike_detector,
+    sweep_discount_spike_thresholds,
 )
-from amazon_sales_analysis.config import METRICS_DIR, PROCESSED_DATA_DIR
+from amazon_sales_analysis.config import METRICS_DIR, TABLES_DIR
+from amazon_sales_analysis.processed_store import (
+    PROCESSED_STORE_PATH,
+    append_processed_partition,
+    load_processed_dataset,
+)
+
+ALERT_INPUT_COLUMNS = [
+    "order_date",
+    "product_category",
+    "discount_percent",
+    "gross_revenue",
+    "price",
+    "quantity_sold",
+]
+ALERT_STATE_FILENAME = "alerts_state.json"
+ALERT_HISTORY_PATH = TABLES_DIR / "discount_spike_alert_history"
+ALERTS_OUTPUT_PATH = TABLES_DIR / "discount_spike_alerts.csv"
+SWEEP_OUTPUT_PATH = TABLES_DIR / "alert_threshold_sweep.csv"
+DEFAULT_SWEEP_Z_THRESHOLDS = [1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 5.0]
+DEFAULT_SWEEP_MIN_OBSERVATIONS = [3, 5, 7, 10]
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -22,8 +49,8 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--input",
         type=Path,
-        default=PROCESSED_DATA_DIR / "amazon_sales_clean.csv",
-        help="Path to the processed CSV input.",
+        default=PROCESSED_STORE_PATH,
+        help="Path to the processed Parquet store (or a processed CSV export).",
     )
     parser.add_argument(
         "--z-threshold",
@@ -37,17 +64,148 @@ def build_parser() -> argparse.ArgumentParser:
         default=5,
         help="Minimum number of observations per category to compute a baseline.",
     )
+    parser.add_argument(
+        "--baseline",
+        choices=BASELINE_METHODS,
+        default=None,
+        help=(
+            "Per-category baseline: all days, a rolling window or an exponentially weighted one "
+            "(default: all_time, or the baseline persisted by earlier --incremental runs)."
+        ),
+    )
+    parser.add_argument(
+        "--baseline-window",
+        type=int,
+        default=None,
+        help="Number of previous days in the rolling baseline (default: 28).",
+    )
+    parser.add_argument(
+        "--baseline-halflife",
+        type=float,
+        default=None,
+        help="Half-life in days of the exponentially weighted baseline (default: 7).",
+    )
     parser.add_argument(
         "--summary-output",
         type=Path,
         default=METRICS_DIR / "alerts_summary.json",
         help="Path to the JSON operational summary.",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only score days since the last run, using the baseline state persisted next to the "
+            "summary, and append new alerts to the alert history."
+        ),
+    )
+    parser.add_argument(
+        "--history-output",
+        type=Path,
+        default=ALERT_HISTORY_PATH,
+        help="Partitioned Parquet alert history appended to by --incremental runs.",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Tabulate alert counts, leakage and severity mix for a grid of thresholds instead.",
+    )
+    parser.add_argument(
+        "--sweep-z-thresholds",
+        type=float,
+        nargs="+",
+        default=DEFAULT_SWEEP_Z_THRESHOLDS,
+        help="Z-score thresholds evaluated by --sweep.",
+    )
+    parser.add_argument(
+        "--sweep-min-observations",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SWEEP_MIN_OBSERVATIONS,
+        help="Minimum observation counts evaluated by --sweep.",
+    )
+    parser.add_argument(
+        "--sweep-output",
+        type=Path,
+        default=SWEEP_OUTPUT_PATH,
+        help="CSV path for the --sweep table.",
+    )
     return parser
 
 
+def score_new_days(
+    *,
+    input_path: Path,
+    z_threshold: float,
+    min_observations: int,
+    state_path: Path,
+    history_path: Path,
+    baseline: SpikeBaseline | None = None,
+) -> tuple[pd.DataFrame, SpikeBaseline, dict[str, object]]:
+    try:
+        detector = load_spike_detector(
+            state_path,
+            z_threshold=z_threshold,
+            min_observations=min_observations,
+            baseline=baseline,
+        )
+    except ValueError as exc:
+        raise SystemExit(f"Incompatible alert state: {exc}") from exc
+    resume_date = detector.resume_date
+    # Open days are re-read in full; everything older is already in the persisted baseline.
+    frame = load_processed_dataset(input_path, columns=ALERT_INPUT_COLUMNS, since=resume_date)
+    part = f"batch-{detector.batches}"
+    alerts = detector.rescan(frame)
+    append_processed_partition(alerts, history_path, part=part)
+    save_spike_detector(detector, state_path)
+    last_scored = detector.last_order_date
+    return (
+        alerts,
+        detector.baseline,
+        {
+            "mode": "incremental",
+            "rows_scored": int(len(frame)),
+            "resumed_from": resume_date.date().isoformat() if resume_date is not None else None,
+            "last_scored_date": last_scored.date().isoformat() if last_scored is not None else None,
+            "state_path": str(state_path),
+            "alerts_history": str(history_path),
+        },
+    )
+
+
+def merge_with_exported_alerts(alerts: pd.DataFrame, alerts_output: Path) -> pd.DataFrame:
+    # Incremental runs only score new days, so earlier alerts are kept from the cumulative CSV;
+    # a re-scored day replaces its previous alert.
+    try:
+        existing = pd.read_csv(alerts_output, parse_dates=["order_date"])
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return alerts
+    if existing.empty:
+        return alerts
+    if alerts.empty:
+        return existing
+    combined = pd.concat(
+        [existing, alerts.assign(order_date=pd.to_datetime(alerts["order_date"]))],
+        ignore_index=True,
+    )
+    return (
+        combined.drop_duplicates(["product_category", "order_date"], keep="last")
+        .reindex(columns=SPIKE_ALERT_COLUMNS)
+        .sort_values(["severity", "estimated_leakage_usd"], ascending=[False, False])
+        .reset_index(drop=True)
+    )
+
+
 def run(
-    *, input_path: Path, z_threshold: float, min_observations: int, summary_output: Path
+    *,
+    input_path: Path,
+    z_threshold: float,
+    min_observations: int,
+    summary_output: Path,
+    incremental: bool = False,
+    history_output: Path = ALERT_HISTORY_PATH,
+    baseline: SpikeBaseline | None = None,
+    alerts_output: Path = ALERTS_OUTPUT_PATH,
 ) -> None:
     if not input_path.exists():
         raise SystemExit(f"Input file not found: {input_path}")
@@ -56,13 +214,26 @@ def run(
     if min_observations < 2:
         raise SystemExit("--min-observations must be greater than or equal to 2.")
 
-    frame = pd.read_csv(input_path, parse_dates=["order_date"])
-    alerts = detect_discount_spikes(
-        frame,
-        z_threshold=z_threshold,
-        min_observations=min_observations,
-    )
-    alerts_csv_path = export_discount_spike_alerts(alerts)
+    run_details: dict[str, object] = {"mode": "full"}
+    if incremental:
+        alerts, baseline, run_details = score_new_days(
+            input_path=input_path,
+            z_threshold=z_threshold,
+            min_observations=min_observations,
+            state_path=summary_output.parent / ALERT_STATE_FILENAME,
+            history_path=history_output,
+            baseline=baseline,
+        )
+    else:
+        frame = load_processed_dataset(input_path, columns=ALERT_INPUT_COLUMNS)
+        alerts = detect_discount_spikes(
+            frame,
+            z_threshold=z_threshold,
+            min_observations=min_observations,
+            baseline=baseline,
+        )
+    exported = merge_with_exported_alerts(alerts, alerts_output) if incremental else alerts
+    alerts_csv_path = export_discount_spike_alerts(exported, alerts_output)
 
     severity_counts = (
         alerts["severity"].value_counts().sort_index().to_dict() if not alerts.empty else {}
@@ -78,8 +249,11 @@ def run(
         "parameters": {
             "z_threshold": float(z_threshold),
             "min_observations": int(min_observations),
+            "baseline": asdict(baseline or SpikeBaseline()),
         },
+        **run_details,
         "alerts_count": int(len(alerts)),
+        "alerts_exported": int(len(exported)),
         "severity_counts": {str(key): int(value) for key, value in severity_counts.items()},
     }
     summary_output.parent.mkdir(parents=True, exist_ok=True)
@@ -88,14 +262,71 @@ def run(
     print("Operational alerts generated successfully.")
     print(f"- Alerts CSV:   {alerts_csv_path}")
     print(f"- Summary JSON: {summary_output}")
-    print(f"- Alerts count: {len(alerts)}")
+    print(f"- Alerts count: {len(alerts)} ({len(exported)} in the alerts CSV)")
+
+
+def run_sweep(
+    *,
+    input_path: Path,
+    z_thresholds: list[float],
+    min_observations: list[int],
+    output_path: Path,
+    baseline: SpikeBaseline | None = None,
+) -> pd.DataFrame:
+    if not input_path.exists():
+        raise SystemExit(f"Input file not found: {input_path}")
+    if min(z_thresholds) <= 0:
+        raise SystemExit("--sweep-z-thresholds must be greater than 0.")
+    if min(min_observations) < 2:
+        raise SystemExit("--sweep-min-observations must be greater than or equal to 2.")
+
+    frame = load_processed_dataset(input_path, columns=ALERT_INPUT_COLUMNS)
+    sweep = sweep_discount_spike_thresholds(
+        frame, z_thresholds=z_thresholds, min_observations=min_observations, baseline=baseline
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    sweep.to_csv(output_path, index=False)
+
+    print("Alert threshold sweep generated successfully.")
+    print(f"- Sweep CSV: {output_path}")
+    print(sweep.to_string(index=False))
+    return sweep
+
+
+def baseline_from_args(args: argparse.Namespace) -> SpikeBaseline | None:
+    if args.baseline is None and args.baseline_window is None and args.baseline_halflife is None:
+        # Without baseline flags, incremental runs keep the baseline persisted with their state.
+        return None
+    if args.baseline_window is not None and args.baseline_window < 2:
+        raise SystemExit("--baseline-window must be greater than or equal to 2.")
+    if args.baseline_halflife is not None and args.baseline_halflife <= 0:
+        raise SystemExit("--baseline-halflife must be greater than 0.")
+    defaults = SpikeBaseline()
+    return SpikeBaseline(
+        method=args.baseline or defaults.method,
+        window=defaults.window if args.baseline_window is None else args.baseline_window,
+        halflife=defaults.halflife if args.baseline_halflife is None else args.baseline_halflife,
+    )
 
 
 def main() -> None:
     args = build_parser().parse_args()
+    baseline = baseline_from_args(args)
+    if args.sweep:
+        run_sweep(
+            input_path=args.input,
+            z_thresholds=args.sweep_z_thresholds,
+            min_observations=args.sweep_min_observations,
+            output_path=args.sweep_output,
+            baseline=baseline,
+        )
+        return
     run(
         input_path=args.input,
         z_threshold=args.z_threshold,
         min_observations=args.min_observations,
         summary_output=args.summary_output,
+        incremental=args.incremental,
+        history_output=args.history_output,
+        baseline=baseline,
     )
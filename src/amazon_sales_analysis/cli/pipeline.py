@@ -1,27 +1,58 @@
 from __future__ import annotations
 
+import argparse
 import logging
+import shutil
+from collections.abc import Sequence
+
+import pandas as pd
 
 from amazon_sales_analysis import __version__
 from amazon_sales_analysis.anomaly_detection import (
     detect_discount_spikes,
     export_discount_spike_alerts,
 )
-from amazon_sales_analysis.config import TABLES_DIR
+from amazon_sales_analysis.config import PROCESSED_DATA_DIR, TABLES_DIR
 from amazon_sales_analysis.contracts import enforce_raw_contract, export_contract_snapshot
+from amazon_sales_analysis.cube import write_sales_cube
 from amazon_sales_analysis.data_ingestion import download_amazon_sales_dataset
 from amazon_sales_analysis.data_preprocessing import (
+    DEFAULT_CHUNK_SIZE,
+    PROCESSED_FILENAME,
     clean_sales_data,
+    estimate_chunk_size,
+    iter_sales_dataset_chunks,
     load_raw_sales_data,
+    raw_sales_data_path,
     save_processed_data,
+    stream_clean_sales_data,
     validate_raw_sales_data,
 )
 from amazon_sales_analysis.decision_engine import build_actionable_recommendations
+from amazon_sales_analysis.incremental import (
+    build_incremental_state,
+    load_incremental_state,
+    save_incremental_state,
+)
 from amazon_sales_analysis.insights import generate_executive_insights
 from amazon_sales_analysis.logging_config import configure_logging
 from amazon_sales_analysis.metrics import collect_product_metrics, save_product_metrics
+from amazon_sales_analysis.parallel_report import (
+    SHARD_STRATEGIES,
+    build_parallel_executive_report,
+)
+from amazon_sales_analysis.processed_store import (
+    PROCESSED_STORE_PATH,
+    append_processed_partition,
+    load_processed_dataset,
+    publish_processed_store,
+    staging_store_path,
+    write_processed_store,
+    write_store_version,
+)
 from amazon_sales_analysis.quality import enforce_clean_quality_gates
 from amazon_sales_analysis.sales_analysis import build_executive_report, prepare_sales_frame
+from amazon_sales_analysis.sketches import HLL_MIN_RELATIVE_ERROR
 from amazon_sales_analysis.table_organization import build_executive_tables
 from amazon_sales_analysis.visualization import build_storytelling_visuals
 
@@ -29,7 +60,176 @@ CONTRACT_VERSION = "2.0.0"
 PIPELINE_VERSION = __version__
 
 
-def main() -> None:
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run the end-to-end sales pipeline and export the executive artifacts."
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help=(
+            "Read and clean the raw dataset in bounded-memory chunks. Only cleaning is streamed; "
+            "the report stages still load the full processed dataset into memory."
+        ),
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help=f"Rows per chunk in streaming mode (default: {DEFAULT_CHUNK_SIZE}).",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=float,
+        default=None,
+        help=(
+            "Memory budget for streaming ingestion and cleaning; derives the chunk size. "
+            "Implies --streaming. Later stages load the full processed dataset."
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Only clean and fold orders newer than the persisted watermark. The raw CSV is still "
+            "read in full to find them; --export-csv is not supported in this mode."
+        ),
+    )
+    parser.add_argument(
+        "--export-csv",
+        action="store_true",
+        help="Also export the processed dataset as CSV next to the Parquet store.",
+    )
+    parser.add_argument(
+        "--approx-distinct-error",
+        type=float,
+        default=None,
+        help="Count distinct orders with HyperLogLog at this relative error (e.g. 0.01).",
+    )
+    parser.add_argument(
+        "--report-workers",
+        type=int,
+        default=None,
+        help="Build the executive report from sharded partials in this many worker processes.",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=SHARD_STRATEGIES,
+        default="order",
+        help="Shard the report input by order_id hash or by month (default: order).",
+    )
+    parser.add_argument(
+        "--shard-rows",
+        type=int,
+        default=None,
+        help="Target rows per report shard (default: one shard per worker or per month).",
+    )
+    return parser
+
+
+def _resolve_chunk_size(args: argparse.Namespace) -> int:
+    if args.chunk_size is not None:
+        if args.chunk_size <= 0:
+            raise SystemExit("--chunk-size must be greater than 0.")
+        return int(args.chunk_size)
+    if args.memory_budget_mb is not None:
+        if args.memory_budget_mb <= 0:
+            raise SystemExit("--memory-budget-mb must be greater than 0.")
+        return estimate_chunk_size(raw_sales_data_path(), args.memory_budget_mb)
+    return DEFAULT_CHUNK_SIZE
+
+
+def _resolve_distinct_error(args: argparse.Namespace) -> float | None:
+    if args.approx_distinct_error is None:
+        return None
+    if not 0 < args.approx_distinct_error < 1:
+        raise SystemExit("--approx-distinct-error must be between 0.0 and 1.0 (exclusive).")
+    if args.approx_distinct_error < HLL_MIN_RELATIVE_ERROR:
+        raise SystemExit(
+            f"--approx-distinct-error must be at least {HLL_MIN_RELATIVE_ERROR:.5f} "
+            "(the largest HyperLogLog sketch)."
+        )
+    return float(args.approx_distinct_error)
+
+
+def _resolve_report_workers(args: argparse.Namespace) -> int | None:
+    if args.report_workers is not None and args.report_workers <= 0:
+        raise SystemExit("--report-workers must be greater than 0.")
+    if args.shard_rows is not None and args.shard_rows <= 0:
+        raise SystemExit("--shard-rows must be greater than 0.")
+    return None if args.report_workers is None else int(args.report_workers)
+
+
+def _validate_raw_chunk(chunk: pd.DataFrame) -> None:
+    enforce_raw_contract(chunk)
+    validate_raw_sales_data(chunk)
+
+
+def run_incremental(logger: logging.Logger, *, chunk_size: int) -> None:
+    baseline = load_incremental_state()
+    logger.info(
+        "[incremental] Watermark: order_date=%s order_id=%s",
+        baseline.watermark_date,
+        baseline.watermark_order_id,
+    )
+    # Without a watermark nothing in the store is accounted for, so it is rebuilt from scratch.
+    store_target = (
+        staging_store_path(PROCESSED_STORE_PATH) if baseline.is_empty else PROCESSED_STORE_PATH
+    )
+    if baseline.is_empty:
+        shutil.rmtree(store_target, ignore_errors=True)
+
+    logger.info("[incremental] Cleaning and folding orders newer than the watermark")
+    # The raw export is replaced wholesale on download rather than appended to, so a saved byte
+    # offset could skip or repeat orders; every run scans the CSV and filters on the watermark.
+    state = baseline
+    for index, chunk in enumerate(iter_sales_dataset_chunks(raw_sales_data_path(), chunk_size)):
+        enforce_raw_contract(chunk)
+        fresh = baseline.select_new_rows(chunk)
+        if fresh.empty:
+            continue
+        validate_raw_sales_data(fresh)
+        cleaned = clean_sales_data(fresh)
+        if not cleaned.empty:
+            enforce_clean_quality_gates(cleaned)
+            append_processed_partition(
+                cleaned, store_target, part=f"{baseline.partition_prefix}-{index}"
+            )
+        state = state.fold(cleaned, raw_row_count=len(fresh))
+
+    if baseline.is_empty:
+        publish_processed_store(store_target, PROCESSED_STORE_PATH)
+    else:
+        write_store_version(PROCESSED_STORE_PATH)
+    new_rows = state.clean_row_count - baseline.clean_row_count
+    if new_rows == 0 and not baseline.is_empty:
+        logger.info("No orders newer than the watermark; outputs are already current")
+        return
+
+    logger.info("[incremental] Persisting state (%s new clean rows)", new_rows)
+    state_path = save_incremental_state(state)
+    logger.info("Incremental state saved to: %s", state_path)
+    cube_path = write_sales_cube(state.tables["cube"])
+    logger.info("Sales cube saved to: %s", cube_path)
+
+    TABLES_DIR.mkdir(parents=True, exist_ok=True)
+    state.kpi_summary().to_csv(TABLES_DIR / "kpi_summary.csv", index=False)
+    state.category_performance().to_csv(TABLES_DIR / "category_performance.csv", index=False)
+    state.growth_trends().rename(columns={"month_start": "month_end"}).to_csv(
+        TABLES_DIR / "monthly_trend.csv", index=False
+    )
+    alerts_path = export_discount_spike_alerts(state.discount_spikes())
+    logger.info("Discount spike alerts saved to: %s", alerts_path)
+    logger.info("[incremental] Refresh completed successfully")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    distinct_error = _resolve_distinct_error(args)
+    report_workers = _resolve_report_workers(args)
+    if args.incremental and args.export_csv:
+        raise SystemExit("--export-csv cannot be combined with --incremental.")
+    streaming = bool(args.streaming or args.memory_budget_mb is not None)
     configure_logging()
     logger = logging.getLogger("pipeline")
 
@@ -37,27 +237,73 @@ def main() -> None:
         logger.info("[1/7] Ensuring source dataset availability")
         download_amazon_sales_dataset()
 
-        logger.info("[2/7] Loading and validating raw data")
-        raw_df = load_raw_sales_data()
-        enforce_raw_contract(raw_df)
-        validate_raw_sales_data(raw_df)
-        contract_path = export_contract_snapshot(contract_version=CONTRACT_VERSION)
-        logger.info("Data contract snapshot saved to: %s", contract_path)
+        if args.incremental:
+            run_incremental(logger, chunk_size=_resolve_chunk_size(args))
+            return
 
-        logger.info("[3/7] Cleaning and quality-checking the dataset")
-        clean_df = clean_sales_data(raw_df)
-        enforce_clean_quality_gates(clean_df)
-        output_path = save_processed_data(clean_df)
-        logger.info("Processed dataset saved to: %s", output_path)
+        raw_df: pd.DataFrame | None = None
+        raw_row_count: int | None = None
+        if streaming:
+            chunk_size = _resolve_chunk_size(args)
+            logger.info("[2/7] Streaming raw data in chunks of %s rows", chunk_size)
+            logger.info("[3/7] Cleaning and quality-checking each chunk")
+            result = stream_clean_sales_data(
+                raw_sales_data_path(),
+                chunksize=chunk_size,
+                csv_output_path=(
+                    (PROCESSED_DATA_DIR / PROCESSED_FILENAME) if args.export_csv else None
+                ),
+                validate_raw_chunk=_validate_raw_chunk,
+                validate_clean_chunk=enforce_clean_quality_gates,
+            )
+            contract_path = export_contract_snapshot(contract_version=CONTRACT_VERSION)
+            logger.info("Data contract snapshot saved to: %s", contract_path)
+            logger.info(
+                "Processed dataset saved to: %s (%s chunks)", result.output_path, result.chunk_count
+            )
+            raw_row_count = result.raw_row_count
+            clean_df = load_processed_dataset(result.output_path)
+            enforce_clean_quality_gates(clean_df)
+        else:
+            logger.info("[2/7] Loading and validating raw data")
+            raw_df = load_raw_sales_data()
+            enforce_raw_contract(raw_df)
+            validate_raw_sales_data(raw_df)
+            contract_path = export_contract_snapshot(contract_version=CONTRACT_VERSION)
+            logger.info("Data contract snapshot saved to: %s", contract_path)
 
-        logger.info("[4/7] Building the commercial performance model")
+            logger.info("[3/7] Cleaning and quality-checking the dataset")
+            clean_df = clean_sales_data(raw_df)
+            enforce_clean_quality_gates(clean_df)
+            output_path = write_processed_store(clean_df)
+            logger.info("Processed dataset saved to: %s", output_path)
+            if args.export_csv:
+                csv_path = save_processed_data(clean_df)
+                logger.info("Processed CSV export saved to: %s", csv_path)
         featured_df = prepare_sales_frame(clean_df)
-        insights = generate_executive_insights(featured_df)
-        report = build_executive_report(featured_df, insights)
+        state = build_incremental_state(featured_df, raw_row_count=raw_row_count)
+        state_path = save_incremental_state(state)
+        logger.info("Incremental watermark saved to: %s", state_path)
+        cube_path = write_sales_cube(state.tables["cube"])
+        logger.info("Sales cube saved to: %s", cube_path)
+
+        logger.info("[4/7] Building the commercial performance model")
+        insights = generate_executive_insights(featured_df, distinct_error=distinct_error)
+        if report_workers is None:
+            report = build_executive_report(featured_df, insights, distinct_error=distinct_error)
+        else:
+            report = build_parallel_executive_report(
+                featured_df,
+                insights,
+                workers=report_workers,
+                shard_by=args.shard_by,
+                shard_rows=args.shard_rows,
+                distinct_error=distinct_error,
+            )
 
         logger.info("[5/7] Exporting executive storytelling outputs")
         build_storytelling_visuals(featured_df)
-        tables = build_executive_tables(featured_df)
+        tables = build_executive_tables(featured_df, report=report)
         recommendations = build_actionable_recommendations(featured_df)
         anomalies = detect_discount_spikes(featured_df)
 
@@ -77,6 +323,7 @@ def main() -> None:
             featured_df,
             contract_version=CONTRACT_VERSION,
             pipeline_version=PIPELINE_VERSION,
+            raw_row_count=raw_row_count,
         )
         metrics_path = save_product_metrics(metrics_payload)
         logger.info("Product metrics saved to: %s", metrics_path)
@@ -9,11 +9,35 @@ from typing import Any, cast
 import pandas as pd
 
 from amazon_sales_analysis import __version__
-from amazon_sales_analysis.config import PROCESSED_DATA_DIR, TABLES_DIR
-from amazon_sales_analysis.scenario_simulator import simulate_leakage_recovery
+from amazon_sales_analysis.config import TABLES_DIR
+from amazon_sales_analysis.cube import SALES_CUBE_PATH, load_sales_cube
+from amazon_sales_analysis.processed_store import PROCESSED_STORE_PATH, load_processed_dataset
+from amazon_sales_analysis.scenario_simulator import (
+    UNCERTAINTY_PERCENTILES,
+    RateDistribution,
+    aggregate_category_leakage,
+    optimize_recovery_allocation,
+    simulate_leakage_recovery,
+    simulate_recovery_uncertainty,
+    simulate_scenario_grid,
+)
 
+SCENARIO_INPUT_COLUMNS = [
+    "order_date",
+    "product_category",
+    "price",
+    "quantity_sold",
+    "total_revenue",
+    "gross_revenue",
+    "discount_value",
+]
+OPTIMIZATION_GRAINS = {
+    "category": ["product_category"],
+    "category_region": ["product_category", "customer_region"],
+}
 
-def parse_category_rates(raw_value: str) -> dict[str, float]:
+
+def parse_category_rates(raw_value: str, option: str = "--category-rates") -> dict[str, float]:
     rates: dict[str, float] = {}
     if not raw_value.strip():
         return rates
@@ -23,15 +47,62 @@ def parse_category_rates(raw_value: str) -> dict[str, float]:
         if not item:
             continue
         if "=" not in item:
-            raise ValueError("Invalid format for --category-rates. Use 'Beauty=0.08,Fashion=0.12'.")
+            raise ValueError(f"Invalid format for {option}. Use 'Beauty=0.08,Fashion=0.12'.")
         category, value = item.split("=", 1)
         category_name = category.strip()
         if not category_name:
-            raise ValueError("Empty category name in --category-rates.")
+            raise ValueError(f"Empty category name in {option}.")
         rates[category_name] = float(value.strip())
     return rates
 
 
+def parse_category_distributions(raw_value: str) -> dict[str, RateDistribution]:
+    distributions: dict[str, RateDistribution] = {}
+    for part in raw_value.split(","):
+        item = part.strip()
+        if not item:
+            continue
+        if "=" not in item:
+            raise ValueError(
+                "Invalid format for --rate-distributions. "
+                "Use 'Beauty=beta:2:18,Fashion=triangular:0.02:0.05:0.1'."
+            )
+        category, spec = item.split("=", 1)
+        category_name = category.strip()
+        if not category_name:
+            raise ValueError("Empty category name in --rate-distributions.")
+        try:
+            distributions[category_name] = RateDistribution.parse(spec)
+        except ValueError as exc:
+            raise ValueError(f"Invalid distribution for {category_name}: {exc}") from exc
+    return distributions
+
+
+def load_scenarios(path: Path) -> pd.DataFrame:
+    """Read a scenario x category rate matrix from CSV or JSON.
+
+    CSV files have a ``scenario`` column plus one column per category; JSON files map each
+    scenario name to ``{category: rate}``. Missing or blank rates fall back to the global rate.
+    """
+    if not path.exists():
+        raise SystemExit(f"Scenarios file not found: {path}")
+    if path.suffix.lower() == ".json":
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(payload, dict) or not all(isinstance(v, dict) for v in payload.values()):
+            raise SystemExit("Scenarios JSON must map each scenario name to {category: rate}.")
+        scenarios = pd.DataFrame.from_dict(payload, orient="index").reindex(list(payload))
+    else:
+        table = pd.read_csv(path)
+        if "scenario" not in table.columns:
+            raise SystemExit("Scenarios CSV must have a 'scenario' column.")
+        scenarios = table.set_index("scenario")
+    if scenarios.empty:
+        raise SystemExit(f"No scenarios found in {path}.")
+    if scenarios.index.has_duplicates:
+        raise SystemExit("Scenario names must be unique.")
+    return scenarios
+
+
 def build_recovery_rates(
     categories: list[str],
     global_rate: float,
@@ -49,8 +120,13 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--input",
         type=Path,
-        default=PROCESSED_DATA_DIR / "amazon_sales_clean.csv",
-        help="Path to the processed input CSV.",
+        default=PROCESSED_STORE_PATH,
+        help="Path to the processed Parquet store (or a processed CSV export).",
+    )
+    parser.add_argument(
+        "--cube",
+        action="store_true",
+        help=f"Answer from the pre-aggregated sales cube (default input: {SALES_CUBE_PATH}).",
     )
     parser.add_argument(
         "--output-dir",
@@ -70,16 +146,295 @@ def build_parser() -> argparse.ArgumentParser:
         default="",
         help="Overrides per category in the format 'Beauty=0.08,Fashion=0.12'.",
     )
+    # Each mode writes its own artifacts, so only one of them may be requested per run.
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--scenarios-file",
+        type=Path,
+        default=None,
+        help=(
+            "CSV/JSON matrix of scenario x category recovery rates; every scenario is evaluated "
+            "in one pass and --recovery-rate fills the categories a scenario leaves out."
+        ),
+    )
+    mode.add_argument(
+        "--monte-carlo",
+        action="store_true",
+        help="Sample recovery rates and report P5/P50/P95 uplift and NRR per category.",
+    )
+    parser.add_argument(
+        "--rate-distributions",
+        type=str,
+        default="",
+        help="Per-category rate distributions, e.g. 'Beauty=beta:2:18,Books=triangular:0:0.05:0.1'.",
+    )
+    parser.add_argument(
+        "--default-distribution",
+        type=str,
+        default=None,
+        help="Distribution for categories without one; otherwise they keep --recovery-rate.",
+    )
+    parser.add_argument("--draws", type=int, default=100_000, help="Monte Carlo draws.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible draws.")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Processes sharing the Monte Carlo draws."
+    )
+    mode.add_argument(
+        "--optimize-budget",
+        type=float,
+        default=None,
+        help="Choose recovery rates that maximize uplift within this total effort budget.",
+    )
+    parser.add_argument(
+        "--optimize-by",
+        choices=sorted(OPTIMIZATION_GRAINS),
+        default="category",
+        help="Grain of the cells the optimizer allocates effort to.",
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=0.3,
+        help="Recovery rate cap for categories without --category-caps.",
+    )
+    parser.add_argument(
+        "--category-caps",
+        type=str,
+        default="",
+        help="Recovery rate caps per category in the format 'Beauty=0.2,Fashion=0.1'.",
+    )
+    parser.add_argument(
+        "--category-effort",
+        type=str,
+        default="",
+        help="Effort per 1.0 of recovery rate per category (default 1.0), e.g. 'Beauty=2'.",
+    )
     return parser
 
 
-def run(*, input_path: Path, output_dir: Path, recovery_rate: float, category_rates: str) -> None:
+def run_optimization(
+    frame: pd.DataFrame,
+    *,
+    input_path: Path,
+    output_dir: Path,
+    budget: float,
+    optimize_by: str,
+    max_rate: float,
+    category_caps: str,
+    category_effort: str,
+) -> pd.DataFrame:
+    if budget < 0:
+        raise SystemExit("--optimize-budget must be greater than or equal to 0.")
+    if max_rate < 0 or max_rate > 1:
+        raise SystemExit("--max-rate must be between 0.0 and 1.0.")
+    dimensions = OPTIMIZATION_GRAINS[optimize_by]
+    missing = [column for column in dimensions if column not in frame.columns]
+    if missing:
+        raise SystemExit(f"Input is missing columns for --optimize-by: {', '.join(missing)}")
+
+    optimization = optimize_recovery_allocation(
+        aggregate_category_leakage(frame, dimensions),
+        budget=budget,
+        max_rate=max_rate,
+        category_caps=parse_category_rates(category_caps, "--category-caps"),
+        category_effort=parse_category_rates(category_effort, "--category-effort"),
+    )
+    allocation = cast(pd.DataFrame, optimization.pop("allocation"))
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    allocation_path = output_dir / "scenario_optimization.csv"
+    summary_path = output_dir / "scenario_optimization_summary.json"
+    allocation.to_csv(allocation_path, index=False)
+
+    summary = {
+        "pipeline_version": __version__,
+        "generated_at_utc": datetime.now(UTC).isoformat(),
+        "input_dataset": str(input_path),
+        "output_allocation_csv": str(allocation_path),
+        "optimize_by": optimize_by,
+        "max_rate": float(max_rate),
+        **{key: float(cast(float, value)) for key, value in optimization.items()},
+        "funded_cells": int((allocation["recovery_rate"] > 0).sum()),
+    }
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    print("Recovery optimization generated successfully.")
+    print(f"- Allocation: {allocation_path}")
+    print(f"- Summary:    {summary_path}")
+    print(f"- Uplift:     {summary['total_uplift']:.2f}")
+    return allocation
+
+
+def run_monte_carlo(
+    frame: pd.DataFrame,
+    *,
+    input_path: Path,
+    output_dir: Path,
+    recovery_rate: float,
+    rate_distributions: str,
+    default_distribution: str | None,
+    draws: int,
+    seed: int | None,
+    workers: int,
+) -> pd.DataFrame:
+    if draws <= 0:
+        raise SystemExit("--draws must be greater than 0.")
+    if workers < 1:
+        raise SystemExit("--workers must be greater than or equal to 1.")
+    distributions = parse_category_distributions(rate_distributions)
+    if default_distribution:
+        fallback = parse_category_distributions(f"default={default_distribution}")["default"]
+        categories = frame["product_category"].dropna().astype(str).unique().tolist()
+        distributions = {category: fallback for category in categories} | distributions
+
+    results = simulate_recovery_uncertainty(
+        frame,
+        distributions,
+        default_rate=recovery_rate,
+        draws=draws,
+        seed=seed,
+        workers=workers,
+    )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results_path = output_dir / "scenario_uncertainty.csv"
+    summary_path = output_dir / "scenario_uncertainty_summary.json"
+    results.to_csv(results_path, index=False)
+
+    total = results.iloc[-1]
+    summary = {
+        "pipeline_version": __version__,
+        "generated_at_utc": datetime.now(UTC).isoformat(),
+        "input_dataset": str(input_path),
+        "output_results_csv": str(results_path),
+        "recovery_rate_default": float(recovery_rate),
+        "rate_distributions": {
+            category: [distribution.kind, *distribution.parameters]
+            for category, distribution in distributions.items()
+        },
+        "draws": int(draws),
+        "seed": seed,
+        "total_uplift": {f"p{p}": float(total[f"uplift_p{p}"]) for p in UNCERTAINTY_PERCENTILES},
+        "simulated_nrr": {
+            f"p{p}": float(total[f"simulated_nrr_p{p}"]) for p in UNCERTAINTY_PERCENTILES
+        },
+    }
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    print("Scenario uncertainty generated successfully.")
+    print(f"- Results: {results_path}")
+    print(f"- Summary: {summary_path}")
+    print(results.to_string(index=False))
+    return results
+
+
+def run_grid(
+    frame: pd.DataFrame,
+    *,
+    input_path: Path,
+    output_dir: Path,
+    recovery_rate: float,
+    scenarios_file: Path,
+) -> pd.DataFrame:
+    scenarios = load_scenarios(scenarios_file)
+    results = simulate_scenario_grid(frame, scenarios, default_rate=recovery_rate)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results_path = output_dir / "scenario_grid_results.csv"
+    summary_path = output_dir / "scenario_grid_summary.json"
+    results.to_csv(results_path, index=False)
+
+    best = results.loc[results["total_uplift"].idxmax()]
+    summary = {
+        "pipeline_version": __version__,
+        "generated_at_utc": datetime.now(UTC).isoformat(),
+        "input_dataset": str(input_path),
+        "scenarios_file": str(scenarios_file),
+        "output_results_csv": str(results_path),
+        "recovery_rate_default": float(recovery_rate),
+        "scenarios_count": int(len(results)),
+        "best_scenario": str(best["scenario"]),
+        "best_total_uplift": float(best["total_uplift"]),
+    }
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    print("Scenario grid generated successfully.")
+    print(f"- Results:   {results_path}")
+    print(f"- Summary:   {summary_path}")
+    print(f"- Scenarios: {len(results)}")
+    return results
+
+
+def run(
+    *,
+    input_path: Path,
+    output_dir: Path,
+    recovery_rate: float,
+    category_rates: str,
+    use_cube: bool = False,
+    scenarios_file: Path | None = None,
+    monte_carlo: bool = False,
+    rate_distributions: str = "",
+    default_distribution: str | None = None,
+    draws: int = 100_000,
+    seed: int | None = None,
+    workers: int = 1,
+    optimize_budget: float | None = None,
+    optimize_by: str = "category",
+    max_rate: float = 0.3,
+    category_caps: str = "",
+    category_effort: str = "",
+) -> None:
     if not input_path.exists():
         raise SystemExit(f"Input file not found: {input_path}")
     if recovery_rate < 0 or recovery_rate > 1:
         raise SystemExit("--recovery-rate must be between 0.0 and 1.0.")
+    if sum([scenarios_file is not None, monte_carlo, optimize_budget is not None]) > 1:
+        raise SystemExit(
+            "Choose only one of --scenarios-file, --monte-carlo and --optimize-budget."
+        )
 
-    frame = pd.read_csv(input_path, parse_dates=["order_date"])
+    if use_cube:
+        frame = load_sales_cube(input_path)
+    else:
+        columns = SCENARIO_INPUT_COLUMNS
+        if optimize_budget is not None:
+            columns = list(dict.fromkeys([*columns, *OPTIMIZATION_GRAINS[optimize_by]]))
+        frame = load_processed_dataset(input_path, columns=columns)
+    if scenarios_file is not None:
+        run_grid(
+            frame,
+            input_path=input_path,
+            output_dir=output_dir,
+            recovery_rate=recovery_rate,
+            scenarios_file=scenarios_file,
+        )
+        return
+    if optimize_budget is not None:
+        run_optimization(
+            frame,
+            input_path=input_path,
+            output_dir=output_dir,
+            budget=optimize_budget,
+            optimize_by=optimize_by,
+            max_rate=max_rate,
+            category_caps=category_caps,
+            category_effort=category_effort,
+        )
+        return
+    if monte_carlo:
+        run_monte_carlo(
+            frame,
+            input_path=input_path,
+            output_dir=output_dir,
+            recovery_rate=recovery_rate,
+            rate_distributions=rate_distributions,
+            default_distribution=default_distribution,
+            draws=draws,
+            seed=seed,
+            workers=workers,
+        )
+        return
     categories = sorted(frame["product_category"].dropna().astype(str).unique().tolist())
     overrides = parse_category_rates(category_rates)
     recovery_rates = build_recovery_rates(categories, recovery_rate, overrides)
@@ -115,9 +470,25 @@ def run(*, input_path: Path, output_dir: Path, recovery_rate: float, category_ra
 
 def main() -> None:
     args = build_parser().parse_args()
+    input_path = args.input
+    if args.cube and input_path == PROCESSED_STORE_PATH:
+        input_path = SALES_CUBE_PATH
     run(
-        input_path=args.input,
+        input_path=input_path,
         output_dir=args.output_dir,
         recovery_rate=args.recovery_rate,
         category_rates=args.category_rates,
+        use_cube=args.cube,
+        scenarios_file=args.scenarios_file,
+        monte_carlo=args.monte_carlo,
+        rate_distributions=args.rate_distributions,
+        default_distribution=args.default_distribution,
+        draws=args.draws,
+        seed=args.seed,
+        workers=args.workers,
+        optimize_budget=args.optimize_budget,
+        optimize_by=args.optimize_by,
+        max_rate=args.max_rate,
+        category_caps=args.category_caps,
+        category_effort=args.category_effort,
     )
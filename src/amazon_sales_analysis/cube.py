@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from .aggregation import CUBE_MEASURES
+from .config import PROCESSED_DATA_DIR
+from .sales_analysis import prepare_sales_frame, sales_aggregator
+
+SALES_CUBE_PATH = PROCESSED_DATA_DIR / "sales_cube.parquet"
+CUBE_DIMENSIONS = [
+    "order_date",
+    "product_category",
+    "product_id",
+    "customer_region",
+    "payment_method",
+]
+# ``month_start`` is derived from ``order_date``, so it rolls up without widening the grain.
+CUBE_KEYS = [*CUBE_DIMENSIONS, "month_start"]
+
+
+def build_sales_cube(df: pd.DataFrame) -> pd.DataFrame:
+    prepared = prepare_sales_frame(df)
+    aggregator = sales_aggregator(prepared)
+    dimensions = [column for column in CUBE_DIMENSIONS if column in prepared.columns]
+    measures = {
+        measure: spec for measure, spec in CUBE_MEASURES.items() if aggregator.has_column(spec[0])
+    }
+    # Missing regions or payment methods stay as their own cells so cube totals match the rows.
+    cube = aggregator.aggregate(dimensions, dropna=False, **measures)
+    cube.insert(1, "month_start", cube["order_date"].dt.to_period("M").dt.to_timestamp())
+    return cube
+
+
+def merge_sales_cubes(current: pd.DataFrame, batch: pd.DataFrame) -> pd.DataFrame:
+    if current.empty:
+        return batch.reset_index(drop=True)
+    keys = [column for column in CUBE_KEYS if column in batch.columns]
+    return (
+        pd.concat([current, batch], ignore_index=True)
+        .groupby(keys, as_index=False, dropna=False)
+        .sum()
+    )
+
+
+def write_sales_cube(cube: pd.DataFrame, path: Path | None = None) -> Path:
+    target = path or SALES_CUBE_PATH
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(f"{target.name}.partial")
+    cube.to_parquet(partial, index=False)
+    partial.replace(target)
+    return target
+
+
+def load_sales_cube(path: Path | None = None) -> pd.DataFrame:
+    source = path or SALES_CUBE_PATH
+    if not source.exists():
+        raise FileNotFoundError(f"Cubo de vendas nao encontrado: {source}")
+    return pd.read_parquet(source)
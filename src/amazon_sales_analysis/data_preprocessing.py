@@ -1,3 +1,6 @@
+import shutil
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
 from pathlib import Path
 from typing import cast
 
@@ -5,11 +8,30 @@ import pandas as pd
 
 from .config import PROCESSED_DATA_DIR, RAW_DATA_DIR
 from .contracts import RAW_REQUIRED_COLUMNS
+from .processed_store import (
+    PROCESSED_STORE_PATH,
+    append_processed_partition,
+    publish_processed_store,
+    staging_store_path,
+)
 from .validation import sales_schema
 
 RAW_SUBDIR = "amazon_sales"
 RAW_FILENAME = "amazon_sales_dataset.csv"
 PROCESSED_FILENAME = "amazon_sales_clean.csv"
+DEFAULT_CHUNK_SIZE = 250_000
+# Coerced columns, boolean masks and the cleaned copy coexist while a chunk is processed.
+CHUNK_MEMORY_OVERHEAD = 4
+CHUNK_SAMPLE_ROWS = 1_000
+
+
+@dataclass(frozen=True)
+class StreamingCleanResult:
+    output_path: Path
+    csv_output_path: Path | None
+    raw_row_count: int
+    clean_row_count: int
+    chunk_count: int
 
 
 def read_sales_dataset(path: Path) -> pd.DataFrame:
@@ -23,11 +45,47 @@ def read_sales_dataset(path: Path) -> pd.DataFrame:
         raise ValueError(f"Falha ao ler arquivo de vendas em {path}: {exc}") from exc
 
 
-def load_raw_sales_data(raw_subdir: str = RAW_SUBDIR, filename: str = RAW_FILENAME) -> pd.DataFrame:
+def iter_sales_dataset_chunks(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    if chunksize <= 0:
+        raise ValueError("chunksize deve ser maior que zero.")
+    try:
+        with pd.read_csv(path, chunksize=chunksize) as reader:
+            yield from reader
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"Arquivo de vendas nao encontrado: {path}") from exc
+    except pd.errors.EmptyDataError as exc:
+        raise ValueError(f"Arquivo de vendas vazio ou invalido: {path}") from exc
+    except pd.errors.ParserError as exc:
+        raise ValueError(f"Falha ao ler arquivo de vendas em {path}: {exc}") from exc
+
+
+def read_sales_dataset_sample(path: Path, nrows: int = CHUNK_SAMPLE_ROWS) -> pd.DataFrame:
+    try:
+        return pd.read_csv(path, nrows=nrows)
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"Arquivo de vendas nao encontrado: {path}") from exc
+    except pd.errors.EmptyDataError as exc:
+        raise ValueError(f"Arquivo de vendas vazio ou invalido: {path}") from exc
+
+
+def estimate_chunk_size(path: Path, memory_budget_mb: float) -> int:
+    if memory_budget_mb <= 0:
+        raise ValueError("memory_budget_mb deve ser maior que zero.")
+    sample = read_sales_dataset_sample(path)
+    bytes_per_row = float(sample.memory_usage(deep=True).sum()) / max(len(sample), 1)
+    budget_bytes = memory_budget_mb * 1024 * 1024
+    return max(1, int(budget_bytes / (bytes_per_row * CHUNK_MEMORY_OVERHEAD)))
+
+
+def raw_sales_data_path(raw_subdir: str = RAW_SUBDIR, filename: str = RAW_FILENAME) -> Path:
     source_path = RAW_DATA_DIR / raw_subdir / filename
     if not source_path.exists():
         raise FileNotFoundError(f"Arquivo bruto nao encontrado: {source_path}")
-    return read_sales_dataset(source_path)
+    return source_path
+
+
+def load_raw_sales_data(raw_subdir: str = RAW_SUBDIR, filename: str = RAW_FILENAME) -> pd.DataFrame:
+    return read_sales_dataset(raw_sales_data_path(raw_subdir, filename))
 
 
 def clean_sales_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -63,6 +121,62 @@ def clean_sales_data(df: pd.DataFrame) -> pd.DataFrame:
     return cleaned.reset_index(drop=True)
 
 
+def stream_clean_sales_data(
+    source_path: Path,
+    output_path: Path | None = None,
+    *,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+    csv_output_path: Path | None = None,
+    validate_raw_chunk: Callable[[pd.DataFrame], object] | None = None,
+    validate_clean_chunk: Callable[[pd.DataFrame], object] | None = None,
+) -> StreamingCleanResult:
+    target = output_path or PROCESSED_STORE_PATH
+    staging = staging_store_path(target)
+    shutil.rmtree(staging, ignore_errors=True)
+    partial_csv = (
+        csv_output_path.with_name(f"{csv_output_path.name}.partial") if csv_output_path else None
+    )
+
+    raw_rows = clean_rows = chunk_count = 0
+    try:
+        for chunk in iter_sales_dataset_chunks(source_path, chunksize):
+            if validate_raw_chunk is not None:
+                validate_raw_chunk(chunk)
+            cleaned = clean_sales_data(chunk)
+            if validate_clean_chunk is not None and not cleaned.empty:
+                validate_clean_chunk(cleaned)
+            append_processed_partition(cleaned, staging, part=chunk_count)
+            if partial_csv is not None:
+                partial_csv.parent.mkdir(parents=True, exist_ok=True)
+                cleaned.to_csv(
+                    partial_csv,
+                    mode="a" if chunk_count else "w",
+                    header=not chunk_count,
+                    index=False,
+                )
+            raw_rows += len(chunk)
+            clean_rows += len(cleaned)
+            chunk_count += 1
+        if not chunk_count:
+            raise ValueError(f"Arquivo de vendas vazio ou invalido: {source_path}")
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        if partial_csv is not None:
+            partial_csv.unlink(missing_ok=True)
+        raise
+
+    publish_processed_store(staging, target)
+    if partial_csv is not None and csv_output_path is not None:
+        partial_csv.replace(csv_output_path)
+    return StreamingCleanResult(
+        output_path=target,
+        csv_output_path=csv_output_path,
+        raw_row_count=raw_rows,
+        clean_row_count=clean_rows,
+        chunk_count=chunk_count,
+    )
+
+
 def validate_raw_sales_data(df: pd.DataFrame) -> pd.DataFrame:
     try:
         validated = sales_schema.validate(df, lazy=True)
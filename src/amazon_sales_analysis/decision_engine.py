@@ -1,12 +1,12 @@
 import pandas as pd
 
-from .sales_analysis import analyze_category_performance, analyze_growth_trends, prepare_sales_frame
+from .report_graph import LazyExecutiveReport, lazy_executive_report
 
 
-def build_actionable_recommendations(df: pd.DataFrame) -> pd.DataFrame:
-    prepared = prepare_sales_frame(df)
-    categories = analyze_category_performance(prepared)
-    growth = analyze_growth_trends(prepared)
+def build_actionable_recommendations(df: pd.DataFrame | LazyExecutiveReport) -> pd.DataFrame:
+    report = lazy_executive_report(df)
+    categories = report.category_performance
+    growth = report.growth_trends
 
     recommendations: list[dict[str, str | float]] = []
 
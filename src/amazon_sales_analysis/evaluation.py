@@ -4,10 +4,11 @@ from .sales_analysis import compute_kpi_summary, prepare_sales_frame
 
 
 def calculate_business_impact(df: pd.DataFrame, recovery_rate: float = 0.05) -> dict[str, float]:
-    summary = compute_kpi_summary(prepare_sales_frame(df))
+    prepared = prepare_sales_frame(df)
+    summary = compute_kpi_summary(prepared)
     lookup = dict(zip(summary["metric"], summary["value"], strict=False))
     total_revenue = float(lookup.get("total_revenue", 0.0))
-    gross_revenue = float(prepare_sales_frame(df)["gross_revenue"].sum()) if not df.empty else 0.0
+    gross_revenue = float(prepared["gross_revenue"].sum()) if not prepared.empty else 0.0
     discount_leakage = float(lookup.get("discount_leakage", 0.0))
 
     return {
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import json
+import shutil
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pandas as pd
+
+from .anomaly_detection import aggregate_daily_discounts, score_daily_discounts
+from .config import PROCESSED_DATA_DIR
+from .cube import build_sales_cube, merge_sales_cubes
+from .processed_store import publish_processed_store
+from .sales_analysis import (
+    aggregate_category_sales,
+    aggregate_kpi_totals,
+    aggregate_monthly_sales,
+    finalize_category_performance,
+    finalize_growth_trends,
+    finalize_kpi_summary,
+    prepare_sales_frame,
+)
+
+INCREMENTAL_STATE_DIR = PROCESSED_DATA_DIR / "incremental_state"
+WATERMARK_FILENAME = "watermark.json"
+STATE_TABLES = ("category", "monthly", "daily_discounts", "cube")
+STATE_KEYS = {
+    "category": ["product_category"],
+    "monthly": ["month_start"],
+    "daily_discounts": ["product_category", "order_date"],
+}
+
+
+def _empty_tables() -> dict[str, pd.DataFrame]:
+    return {name: pd.DataFrame() for name in STATE_TABLES}
+
+
+@dataclass(frozen=True)
+class IncrementalState:
+    """Watermark plus the additive aggregates behind KPIs, categories, trends and spikes.
+
+    Order counts are folded additively, which assumes every ``order_id`` arrives in a single
+    batch (new orders are never split across the watermark).
+    """
+
+    watermark_date: pd.Timestamp | None = None
+    watermark_order_id: float | None = None
+    raw_row_count: int = 0
+    clean_row_count: int = 0
+    kpi_totals: dict[str, float] = field(default_factory=dict)
+    tables: dict[str, pd.DataFrame] = field(default_factory=_empty_tables)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.watermark_date is None
+
+    @property
+    def partition_prefix(self) -> str:
+        # Deterministic per watermark, so a re-run after a crash overwrites its own files.
+        if self.watermark_date is None:
+            return "initial"
+        return f"after-{self.watermark_date:%Y%m%d%H%M%S}-{int(self.watermark_order_id or 0)}"
+
+    def select_new_rows(self, raw_chunk: pd.DataFrame) -> pd.DataFrame:
+        if self.watermark_date is None:
+            return raw_chunk
+        order_dates = pd.to_datetime(raw_chunk["order_date"], errors="coerce")
+        order_ids = pd.to_numeric(raw_chunk["order_id"], errors="coerce")
+        is_newer = (order_dates > self.watermark_date) | (
+            (order_dates == self.watermark_date) & (order_ids > (self.watermark_order_id or 0))
+        )
+        return raw_chunk[is_newer.fillna(False)]
+
+    def fold(self, cleaned: pd.DataFrame, *, raw_row_count: int | None = None) -> IncrementalState:
+        raw_rows = len(cleaned) if raw_row_count is None else int(raw_row_count)
+        if cleaned.empty:
+            return replace(self, raw_row_count=self.raw_row_count + raw_rows)
+
+        prepared = prepare_sales_frame(cleaned)
+        batch_totals = aggregate_kpi_totals(prepared)
+        kpi_totals = {
+            key: float(self.kpi_totals.get(key, 0.0)) + value for key, value in batch_totals.items()
+        }
+        batch_tables = {
+            "category": aggregate_category_sales(prepared),
+            "monthly": aggregate_monthly_sales(prepared),
+            "daily_discounts": aggregate_daily_discounts(prepared),
+        }
+        tables = {
+            name: _merge_additive(self.tables.get(name), batch_tables[name], STATE_KEYS[name])
+            for name in batch_tables
+        }
+        tables["cube"] = merge_sales_cubes(
+            self.tables.get("cube", pd.DataFrame()), build_sales_cube(prepared)
+        )
+
+        latest = prepared.sort_values(["order_date", "order_id"]).iloc[-1]
+        watermark = (pd.Timestamp(latest["order_date"]), float(latest["order_id"]))
+        if self.watermark_date is not None:
+            watermark = max(watermark, (self.watermark_date, float(self.watermark_order_id or 0)))
+        watermark_date, watermark_order_id = watermark
+
+        return IncrementalState(
+            watermark_date=watermark_date,
+            watermark_order_id=watermark_order_id,
+            raw_row_count=self.raw_row_count + raw_rows,
+            clean_row_count=self.clean_row_count + len(cleaned),
+            kpi_totals=kpi_totals,
+            tables=tables,
+        )
+
+    def kpi_summary(self) -> pd.DataFrame:
+        return finalize_kpi_summary(self.kpi_totals)
+
+    def category_performance(self) -> pd.DataFrame:
+        return finalize_category_performance(
+            self.tables["category"], float(self.kpi_totals.get("total_revenue", 0.0))
+        )
+
+    def growth_trends(self) -> pd.DataFrame:
+        return finalize_growth_trends(self.tables["monthly"])
+
+    def discount_spikes(
+        self, *, z_threshold: float = 2.5, min_observations: int = 5
+    ) -> pd.DataFrame:
+        return score_daily_discounts(
+            self.tables["daily_discounts"],
+            z_threshold=z_threshold,
+            min_observations=min_observations,
+        )
+
+
+def _merge_additive(
+    current: pd.DataFrame | None, batch: pd.DataFrame, keys: list[str]
+) -> pd.DataFrame:
+    if current is None or current.empty:
+        return batch.reset_index(drop=True)
+    return pd.concat([current, batch], ignore_index=True).groupby(keys, as_index=False).sum()
+
+
+def build_incremental_state(
+    cleaned: pd.DataFrame, *, raw_row_count: int | None = None
+) -> IncrementalState:
+    return IncrementalState().fold(cleaned, raw_row_count=raw_row_count)
+
+
+def save_incremental_state(state: IncrementalState, state_dir: Path | None = None) -> Path:
+    target = state_dir or INCREMENTAL_STATE_DIR
+    staging = target.with_name(f"{target.name}.staging")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    for name in STATE_TABLES:
+        state.tables[name].to_parquet(staging / f"{name}.parquet", index=False)
+    payload = {
+        "watermark_order_date": (
+            state.watermark_date.isoformat() if state.watermark_date is not None else None
+        ),
+        "watermark_order_id": state.watermark_order_id,
+        "raw_row_count": state.raw_row_count,
+        "clean_row_count": state.clean_row_count,
+        "kpi_totals": state.kpi_totals,
+        "updated_at_utc": datetime.now(UTC).isoformat(),
+    }
+    (staging / WATERMARK_FILENAME).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return publish_processed_store(staging, target)
+
+
+def load_incremental_state(state_dir: Path | None = None) -> IncrementalState:
+    source = state_dir or INCREMENTAL_STATE_DIR
+    watermark_path = source / WATERMARK_FILENAME
+    if not watermark_path.exists():
+        return IncrementalState()
+
+    payload = json.loads(watermark_path.read_text(encoding="utf-8"))
+    watermark_date = payload.get("watermark_order_date")
+    return IncrementalState(
+        watermark_date=pd.Timestamp(watermark_date) if watermark_date else None,
+        watermark_order_id=payload.get("watermark_order_id"),
+        raw_row_count=int(payload.get("raw_row_count", 0)),
+        clean_row_count=int(payload.get("clean_row_count", 0)),
+        kpi_totals={key: float(value) for key, value in payload.get("kpi_totals", {}).items()},
+        tables={name: pd.read_parquet(source / f"{name}.parquet") for name in STATE_TABLES},
+    )
@@ -7,17 +7,23 @@ from .sales_analysis import (
     analyze_growth_trends,
     analyze_product_contribution,
     prepare_sales_frame,
+    sales_aggregator,
 )
 
 
-def generate_executive_insights(df: pd.DataFrame) -> pd.DataFrame:
+def generate_executive_insights(
+    df: pd.DataFrame, *, distinct_error: float | None = None
+) -> pd.DataFrame:
     prepared = prepare_sales_frame(df)
-    category = analyze_category_performance(prepared)
-    products = analyze_product_contribution(prepared, top_n=3)
-    growth = analyze_growth_trends(prepared)
+    aggregator = sales_aggregator(prepared, distinct_error=distinct_error)
+    category = analyze_category_performance(aggregator)
+    products = analyze_product_contribution(aggregator, top_n=3)
+    growth = analyze_growth_trends(aggregator)
 
-    total_revenue = float(prepared["total_revenue"].sum()) if not prepared.empty else 0.0
-    avg_ticket = total_revenue / float(prepared["order_id"].nunique()) if not prepared.empty else 0.0
+    total_revenue = aggregator.total("total_revenue") if not prepared.empty else 0.0
+    avg_ticket = (
+        total_revenue / aggregator.distinct_total("order_id") if not prepared.empty else 0.0
+    )
 
     insights: list[dict[str, str | float]] = [
         {
@@ -7,23 +7,27 @@ from pathlib import Path
 import pandas as pd
 
 from .config import METRICS_DIR
-from .insights import generate_executive_insights
-from .sales_analysis import build_executive_report, prepare_sales_frame
+from .report_graph import LazyExecutiveReport
+from .sales_analysis import prepare_sales_frame
 
 PRODUCT_METRICS_VERSION = "2.0.0"
 
 
 def collect_product_metrics(
-    df_raw: pd.DataFrame,
+    df_raw: pd.DataFrame | None,
     df_clean: pd.DataFrame,
     df_featured: pd.DataFrame,
     *,
     contract_version: str,
     pipeline_version: str = "unknown",
+    raw_row_count: int | None = None,
 ) -> dict[str, float | int | str | list[dict[str, str]]]:
+    # Streaming runs never hold the raw frame, so they report the row count they observed.
+    if raw_row_count is None:
+        raw_row_count = len(df_raw) if df_raw is not None else 0
     prepared = prepare_sales_frame(df_featured)
-    insights = generate_executive_insights(prepared)
-    report = build_executive_report(prepared, insights)
+    report = LazyExecutiveReport(prepared)
+    insights = report.insights
     kpi_lookup = dict(zip(report.kpi_summary["metric"], report.kpi_summary["value"], strict=False))
 
     min_date = prepared["order_date"].min()
@@ -36,10 +40,12 @@ def collect_product_metrics(
         "contract_version": contract_version,
         "pipeline_version": pipeline_version,
         "generated_at_utc": datetime.now(UTC).isoformat(),
-        "raw_row_count": int(len(df_raw)),
+        "raw_row_count": int(raw_row_count),
         "clean_row_count": int(len(df_clean)),
-        "rows_dropped": int(len(df_raw) - len(df_clean)),
-        "row_retention_rate": (float(len(df_clean)) / float(len(df_raw))) if len(df_raw) else 0.0,
+        "rows_dropped": int(raw_row_count - len(df_clean)),
+        "row_retention_rate": (
+            (float(len(df_clean)) / float(raw_row_count)) if raw_row_count else 0.0
+        ),
         "total_revenue": float(kpi_lookup.get("total_revenue", 0.0)),
         "gross_revenue": float(prepared["gross_revenue"].sum()) if not prepared.empty else 0.0,
         "discount_leakage": float(kpi_lookup.get("discount_leakage", 0.0)),
@@ -1,10 +1,19 @@
 ﻿import pandas as pd
 
+from .aggregation import SalesAggregator
+from .sales_analysis import sales_aggregator
 
-def rank_discount_opportunities(df: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
+
+def rank_discount_opportunities(
+    df: pd.DataFrame | SalesAggregator, top_n: int = 10
+) -> pd.DataFrame:
     grouped = (
-        df.groupby("product_category", as_index=False)
-        .agg(total_revenue=("total_revenue", "sum"), discount_value=("discount_value", "sum"))
+        sales_aggregator(df)
+        .aggregate(
+            ["product_category"],
+            total_revenue=("total_revenue", "sum"),
+            discount_value=("discount_value", "sum"),
+        )
         .sort_values("discount_value", ascending=False)
         .head(top_n)
     )
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import math
+import os
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from .business_metrics import build_kpi_catalog
+from .partial_aggregates import ExactDistinctCounter, SalesPartial, combine_partials
+from .sales_analysis import (
+    PREPARED_FRAME_ATTR,
+    PRODUCT_KEYS,
+    ExecutiveReport,
+    build_executive_report,
+    finalize_performance_distribution,
+    prepare_sales_frame,
+    sales_aggregator,
+)
+from .sketches import HyperLogLogCounter, top_k_indices
+
+SHARD_STRATEGIES = ("order", "month")
+PRODUCT_SUM_COLUMNS = ["revenue", "units", "orders"]
+ORDER_SUM_COLUMNS = ["order_revenue", "units", "discount_sum", "discount_count"]
+
+
+def _merge_frames(frames: Sequence[pd.DataFrame], keys: list[str]) -> pd.DataFrame:
+    present = [frame for frame in frames if not frame.empty]
+    if len(present) <= 1:
+        return present[0].reset_index(drop=True) if present else pd.DataFrame()
+    return pd.concat(present, ignore_index=True).groupby(keys, as_index=False).sum()
+
+
+@dataclass(frozen=True)
+class ReportPartial:
+    """Mergeable per-shard inputs of every :class:`ExecutiveReport` section.
+
+    KPI, category and monthly figures live in a :class:`SalesPartial`; product and order
+    tables are plain sums keyed by product and by order. Product order counts are summed
+    across shards, which is exact while each order lives in a single shard.
+    """
+
+    sales: SalesPartial = field(default_factory=SalesPartial)
+    products: pd.DataFrame = field(default_factory=pd.DataFrame)
+    orders: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, *, distinct_error: float | None = None) -> ReportPartial:
+        if df.empty:
+            return cls()
+        prepared = prepare_sales_frame(df)
+        counter = (
+            ExactDistinctCounter.from_values
+            if distinct_error is None
+            else HyperLogLogCounter.factory(distinct_error)
+        )
+        aggregator = sales_aggregator(prepared, distinct_error=distinct_error)
+        return cls(
+            sales=SalesPartial.from_frame(prepared, counter=counter),
+            products=aggregator.aggregate(
+                PRODUCT_KEYS,
+                revenue=("total_revenue", "sum"),
+                units=("quantity_sold", "sum"),
+                orders=("order_id", "nunique"),
+            ),
+            orders=aggregator.aggregate(
+                ["order_id"],
+                order_revenue=("total_revenue", "sum"),
+                units=("quantity_sold", "sum"),
+                discount_sum=("discount_percent", "sum"),
+                discount_count=("discount_percent", "count"),
+            ),
+        )
+
+    def merge(self, other: ReportPartial) -> ReportPartial:
+        return combine_report_partials([self, other])
+
+    def report(self, insights: pd.DataFrame, *, top_n: int = 10) -> ExecutiveReport:
+        total_revenue = float(self.sales.totals.get("total_revenue", 0.0))
+        return ExecutiveReport(
+            kpi_summary=self.sales.kpi_summary(),
+            category_performance=self.sales.category_performance(),
+            product_contribution=self._product_contribution(total_revenue, top_n),
+            growth_trends=self.sales.growth_trends(),
+            performance_distribution=self._performance_distribution(),
+            insights=insights,
+            kpi_catalog=build_kpi_catalog(),
+        )
+
+    def _product_contribution(self, total_revenue: float, top_n: int) -> pd.DataFrame:
+        if self.products.empty:
+            return pd.DataFrame(columns=[*PRODUCT_KEYS, *PRODUCT_SUM_COLUMNS, "revenue_share"])
+        leaders = top_k_indices(self.products["revenue"].to_numpy(dtype=float), top_n)
+        grouped = self.products.iloc[leaders][[*PRODUCT_KEYS, *PRODUCT_SUM_COLUMNS]].copy()
+        grouped["revenue_share"] = grouped["revenue"] / total_revenue if total_revenue else 0.0
+        grouped["rank"] = range(1, len(grouped) + 1)
+        return grouped
+
+    def _performance_distribution(self) -> pd.DataFrame:
+        if self.orders.empty:
+            return finalize_performance_distribution(self.orders)
+        counts = self.orders["discount_count"]
+        order_perf = pd.DataFrame(
+            {
+                "order_id": self.orders["order_id"],
+                "order_revenue": self.orders["order_revenue"],
+                "units": self.orders["units"],
+                "avg_discount": self.orders["discount_sum"] / counts.where(counts > 0),
+            }
+        )
+        return finalize_performance_distribution(order_perf)
+
+
+def combine_report_partials(partials: Iterable[ReportPartial]) -> ReportPartial:
+    partials = list(partials)
+    return ReportPartial(
+        sales=combine_partials(item.sales for item in partials),
+        products=_merge_frames([item.products for item in partials], PRODUCT_KEYS),
+        orders=_merge_frames([item.orders for item in partials], ["order_id"]),
+    )
+
+
+def _shard_codes(
+    prepared: pd.DataFrame, shard_by: str, shard_rows: int | None, workers: int
+) -> np.ndarray:
+    if shard_by == "order":
+        shards = max(workers, math.ceil(len(prepared) / shard_rows) if shard_rows else 1)
+        hashes = pd.util.hash_array(prepared["order_id"].to_numpy())
+        codes: np.ndarray = (hashes % np.uint64(shards)).astype(np.int64)
+        return codes
+
+    months, _ = pd.factorize(prepared["month_start"], sort=True, use_na_sentinel=False)
+    if not shard_rows:
+        return np.asarray(months, dtype=np.int64)
+    # Consecutive months are packed together until a shard reaches ``shard_rows``.
+    month_sizes = np.bincount(months)
+    month_shard = np.zeros(len(month_sizes), dtype=np.int64)
+    shard, filled = 0, 0
+    for month, size in enumerate(month_sizes):
+        if filled and filled + size > shard_rows:
+            shard, filled = shard + 1, 0
+        month_shard[month] = shard
+        filled += size
+    packed: np.ndarray = month_shard[months]
+    return packed
+
+
+def shard_sales_frame(
+    df: pd.DataFrame,
+    *,
+    shard_by: str = "order",
+    shard_rows: int | None = None,
+    workers: int = 1,
+) -> list[pd.DataFrame]:
+    """Split the prepared frame so that every order lands in exactly one shard.
+
+    ``order`` hashes ``order_id`` into ``max(workers, rows / shard_rows)`` shards; ``month``
+    keeps one month per shard, or packs consecutive months up to ``shard_rows``.
+    """
+    if shard_by not in SHARD_STRATEGIES:
+        raise ValueError(f"Estrategia de particionamento nao suportada: {shard_by}")
+    if shard_rows is not None and shard_rows <= 0:
+        raise ValueError("O tamanho do shard deve ser maior que zero.")
+
+    prepared = prepare_sales_frame(df)
+    if prepared.empty:
+        return []
+    codes = _shard_codes(prepared, shard_by, shard_rows, workers)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    shards = []
+    for rows in np.split(order, bounds):
+        shard = prepared.take(rows)
+        # Rows of a prepared frame stay prepared, so workers do not rebuild the features.
+        shard.attrs[PREPARED_FRAME_ATTR] = len(shard)
+        shards.append(shard)
+    return shards
+
+
+def build_parallel_executive_report(
+    df: pd.DataFrame,
+    insights: pd.DataFrame,
+    *,
+    workers: int | None = None,
+    shard_by: str = "order",
+    shard_rows: int | None = None,
+    distinct_error: float | None = None,
+) -> ExecutiveReport:
+    """Build the :class:`ExecutiveReport` from per-shard partials computed in a process pool."""
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("O numero de workers deve ser maior que zero.")
+
+    shards = shard_sales_frame(df, shard_by=shard_by, shard_rows=shard_rows, workers=workers)
+    if not shards:
+        return build_executive_report(df, insights, distinct_error=distinct_error)
+
+    build_partial = partial(ReportPartial.from_frame, distinct_error=distinct_error)
+    if workers == 1 or len(shards) == 1:
+        partials = [build_partial(shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            partials = list(executor.map(build_partial, shards))
+    return combine_report_partials(partials).report(insights)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from functools import reduce
+from typing import Protocol, Self
+
+import numpy as np
+import pandas as pd
+
+from .sales_analysis import (
+    aggregate_category_sales,
+    aggregate_kpi_totals,
+    aggregate_monthly_sales,
+    finalize_category_performance,
+    finalize_growth_trends,
+    finalize_kpi_summary,
+    prepare_sales_frame,
+    sales_aggregator,
+)
+
+CATEGORY_SUM_COLUMNS = ["revenue", "units", "revenue_count", "discount_value"]
+MONTHLY_SUM_COLUMNS = ["revenue", "units"]
+
+
+class DistinctCounter(Protocol):
+    def merge(self, other: Self) -> Self: ...
+
+    def estimate(self) -> float: ...
+
+
+@dataclass(frozen=True)
+class ExactDistinctCounter:
+    values: np.ndarray = field(default_factory=lambda: np.array([], dtype=np.int64))
+
+    @classmethod
+    def from_values(cls, values: pd.Series) -> ExactDistinctCounter:
+        return cls(np.unique(values.dropna().to_numpy()))
+
+    def merge(self, other: ExactDistinctCounter) -> ExactDistinctCounter:
+        return ExactDistinctCounter(np.union1d(self.values, other.values))
+
+    def estimate(self) -> float:
+        return float(len(self.values))
+
+
+CounterFactory = Callable[[pd.Series], DistinctCounter]
+
+
+def _merge_counters(
+    left: dict[object, DistinctCounter], right: dict[object, DistinctCounter]
+) -> dict[object, DistinctCounter]:
+    merged = dict(left)
+    for key, counter in right.items():
+        merged[key] = merged[key].merge(counter) if key in merged else counter
+    return merged
+
+
+def _merge_sums(left: pd.DataFrame, right: pd.DataFrame, key: str) -> pd.DataFrame:
+    return pd.concat([left, right], ignore_index=True).groupby(key, as_index=False).sum()
+
+
+def _with_orders(
+    sums: pd.DataFrame, counters: dict[object, DistinctCounter], key: str
+) -> pd.DataFrame:
+    sums = sums.reset_index(drop=True)
+    orders = [counters[value].estimate() for value in sums[key]]
+    return sums.assign(orders=np.rint(orders).astype(np.int64))
+
+
+def _min_date(left: pd.Timestamp | None, right: pd.Timestamp | None) -> pd.Timestamp | None:
+    return min((value for value in (left, right) if value is not None), default=None)
+
+
+def _max_date(left: pd.Timestamp | None, right: pd.Timestamp | None) -> pd.Timestamp | None:
+    return max((value for value in (left, right) if value is not None), default=None)
+
+
+@dataclass(frozen=True)
+class SalesPartial:
+    """Mergeable partial aggregate behind the KPI summary, category and monthly tables.
+
+    Build one per chunk, file or partition with :meth:`from_frame` and combine them in any
+    order with :meth:`merge`. Order counts go through a :class:`DistinctCounter`, so orders
+    split across partials are not double counted.
+    """
+
+    totals: dict[str, float] = field(default_factory=dict)
+    row_count: int = 0
+    min_order_date: pd.Timestamp | None = None
+    max_order_date: pd.Timestamp | None = None
+    orders: DistinctCounter = field(default_factory=ExactDistinctCounter)
+    category_sums: pd.DataFrame = field(default_factory=pd.DataFrame)
+    category_orders: dict[object, DistinctCounter] = field(default_factory=dict)
+    monthly_sums: pd.DataFrame = field(default_factory=pd.DataFrame)
+    month_orders: dict[object, DistinctCounter] = field(default_factory=dict)
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame, *, counter: CounterFactory = ExactDistinctCounter.from_values
+    ) -> SalesPartial:
+        if df.empty:
+            return cls(orders=counter(pd.Series(dtype="int64")))
+
+        prepared = prepare_sales_frame(df)
+        aggregator = sales_aggregator(prepared)
+        totals = aggregate_kpi_totals(aggregator)
+        del totals["total_orders"]
+        category_orders: dict[object, DistinctCounter] = {
+            category: counter(order_ids)
+            for category, order_ids in prepared.groupby("product_category")["order_id"]
+        }
+        month_orders: dict[object, DistinctCounter] = {
+            month: counter(order_ids)
+            for month, order_ids in prepared.groupby("month_start")["order_id"]
+        }
+        order_dates = prepared["order_date"].dropna()
+        return cls(
+            totals=totals,
+            row_count=len(prepared),
+            min_order_date=order_dates.min() if not order_dates.empty else None,
+            max_order_date=order_dates.max() if not order_dates.empty else None,
+            orders=counter(prepared["order_id"]),
+            category_sums=aggregate_category_sales(aggregator)[
+                ["product_category", *CATEGORY_SUM_COLUMNS]
+            ],
+            category_orders=category_orders,
+            monthly_sums=aggregate_monthly_sales(aggregator)[["month_start", *MONTHLY_SUM_COLUMNS]],
+            month_orders=month_orders,
+        )
+
+    def merge(self, other: SalesPartial) -> SalesPartial:
+        if self.row_count == 0:
+            return other
+        if other.row_count == 0:
+            return self
+        return SalesPartial(
+            totals={
+                key: self.totals.get(key, 0.0) + other.totals.get(key, 0.0)
+                for key in self.totals.keys() | other.totals.keys()
+            },
+            row_count=self.row_count + other.row_count,
+            min_order_date=_min_date(self.min_order_date, other.min_order_date),
+            max_order_date=_max_date(self.max_order_date, other.max_order_date),
+            orders=self.orders.merge(other.orders),
+            category_sums=_merge_sums(self.category_sums, other.category_sums, "product_category"),
+            category_orders=_merge_counters(self.category_orders, other.category_orders),
+            monthly_sums=_merge_sums(self.monthly_sums, other.monthly_sums, "month_start"),
+            month_orders=_merge_counters(self.month_orders, other.month_orders),
+        )
+
+    def kpi_totals(self) -> dict[str, float]:
+        return {**self.totals, "total_orders": self.orders.estimate()}
+
+    def kpi_summary(self) -> pd.DataFrame:
+        return finalize_kpi_summary(self.kpi_totals())
+
+    def category_performance(self) -> pd.DataFrame:
+        return finalize_category_performance(
+            _with_orders(self.category_sums, self.category_orders, "product_category"),
+            float(self.totals.get("total_revenue", 0.0)),
+        )
+
+    def growth_trends(self) -> pd.DataFrame:
+        return finalize_growth_trends(
+            _with_orders(self.monthly_sums, self.month_orders, "month_start")
+        )
+
+
+def combine_partials(partials: Iterable[SalesPartial]) -> SalesPartial:
+    return reduce(SalesPartial.merge, partials, SalesPartial())
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import hashlib
+import shutil
+from collections.abc import Sequence
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from .config import PROCESSED_DATA_DIR
+
+PROCESSED_STORE_DIRNAME = "amazon_sales_clean.parquet"
+PROCESSED_STORE_PATH = PROCESSED_DATA_DIR / PROCESSED_STORE_DIRNAME
+PARTITION_COLUMNS = ["month_start", "product_category"]
+# Leading underscore keeps the manifest out of the parquet dataset scan.
+STORE_VERSION_FILENAME = "_dataset_version"
+
+
+def is_processed_store(path: Path) -> bool:
+    return path.is_dir() or path.suffix == ".parquet"
+
+
+def staging_store_path(target: Path) -> Path:
+    return target.with_name(f"{target.name}.staging")
+
+
+def _partitioned(df: pd.DataFrame) -> pd.DataFrame:
+    order_dates = pd.to_datetime(df["order_date"], errors="coerce")
+    return df.assign(
+        order_date=order_dates,
+        month_start=order_dates.dt.to_period("M").dt.to_timestamp().dt.strftime("%Y-%m-%d"),
+        product_category=df["product_category"].astype(str),
+    )
+
+
+def append_processed_partition(df: pd.DataFrame, store_path: Path, *, part: int | str) -> None:
+    if df.empty:
+        return
+    store_path.mkdir(parents=True, exist_ok=True)
+    _partitioned(df).to_parquet(
+        store_path,
+        index=False,
+        partition_cols=PARTITION_COLUMNS,
+        basename_template=f"part-{part}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+
+
+def publish_processed_store(staging: Path, target: Path) -> Path:
+    # Swap directories so readers never observe a half-written store.
+    staging.mkdir(parents=True, exist_ok=True)
+    write_store_version(staging)
+    if target.exists():
+        previous = target.with_name(f"{target.name}.previous")
+        shutil.rmtree(previous, ignore_errors=True)
+        target.replace(previous)
+        staging.replace(target)
+        shutil.rmtree(previous, ignore_errors=True)
+    else:
+        staging.replace(target)
+    return target
+
+
+def write_processed_store(df: pd.DataFrame, target: Path | None = None) -> Path:
+    target = target or PROCESSED_STORE_PATH
+    staging = staging_store_path(target)
+    shutil.rmtree(staging, ignore_errors=True)
+    append_processed_partition(df, staging, part=0)
+    return publish_processed_store(staging, target)
+
+
+def read_processed_store(
+    path: Path,
+    *,
+    columns: Sequence[str] | None = None,
+    filters: ds.Expression | None = None,
+) -> pd.DataFrame:
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    selected = None
+    if columns is not None:
+        selected = [column for column in columns if column in dataset.schema.names]
+    frame = dataset.to_table(columns=selected, filter=filters).to_pandas()
+    if "month_start" in frame.columns:
+        frame["month_start"] = pd.to_datetime(frame["month_start"].astype(str))
+    if "product_category" in frame.columns:
+        frame["product_category"] = frame["product_category"].astype(str)
+    return frame
+
+
+def since_filter(since: pd.Timestamp) -> ds.Expression:
+    # ``month_start`` partitions are ISO strings, so older months are pruned without reading them.
+    month = since.to_period("M").to_timestamp().strftime("%Y-%m-%d")
+    return (ds.field("month_start") >= month) & (ds.field("order_date") >= since.to_pydatetime())
+
+
+def load_processed_dataset(
+    path: Path,
+    *,
+    columns: Sequence[str] | None = None,
+    since: pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    if is_processed_store(path):
+        filters = since_filter(since) if since is not None else None
+        return read_processed_store(path, columns=columns, filters=filters)
+    if columns is None:
+        frame = pd.read_csv(path, parse_dates=["order_date"])
+    else:
+        wanted = set(columns)
+        frame = pd.read_csv(
+            path, usecols=lambda column: column in wanted, parse_dates=["order_date"]
+        )
+    if since is not None:
+        frame = frame[pd.to_datetime(frame["order_date"], errors="coerce") >= since]
+    return frame
+
+
+def dataset_fingerprint(path: Path) -> str:
+    root = path if path.is_dir() else path.parent
+    files = sorted(path.rglob("*.parquet")) if path.is_dir() else [path]
+    digest = hashlib.sha1(str(path.resolve()).encode("utf-8"))
+    for item in files:
+        stat = item.stat()
+        digest.update(f"{item.relative_to(root)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+def write_store_version(path: Path) -> str:
+    # Readers compare this manifest instead of listing and stat-ing every part file.
+    version = dataset_fingerprint(path)
+    manifest = path / STORE_VERSION_FILENAME
+    staged = manifest.with_name(f"{manifest.name}.tmp")
+    staged.write_text(version, encoding="utf-8")
+    staged.replace(manifest)
+    return version
+
+
+def dataset_version(path: Path) -> str:
+    if path.is_dir():
+        try:
+            return (path / STORE_VERSION_FILENAME).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            pass
+    return dataset_fingerprint(path)
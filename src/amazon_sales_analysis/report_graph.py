@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, fields
+from typing import Any
+
+import pandas as pd
+
+from .aggregation import SalesAggregator
+from .business_metrics import build_kpi_catalog
+from .insights import generate_executive_insights
+from .sales_analysis import (
+    ExecutiveReport,
+    aggregate_category_sales,
+    aggregate_kpi_totals,
+    aggregate_monthly_sales,
+    aggregate_order_performance,
+    analyze_product_contribution,
+    finalize_category_performance,
+    finalize_growth_trends,
+    finalize_kpi_summary,
+    finalize_performance_distribution,
+    prepare_sales_frame,
+    sales_aggregator,
+)
+
+
+@dataclass(frozen=True)
+class ReportNode:
+    dependencies: tuple[str, ...]
+    compute: Callable[..., Any]
+
+
+def _total_revenue(aggregator: SalesAggregator) -> float:
+    return aggregator.total("total_revenue") if not aggregator.frame.empty else 0.0
+
+
+REPORT_GRAPH: Mapping[str, ReportNode] = {
+    "prepared": ReportNode(("source",), prepare_sales_frame),
+    "aggregator": ReportNode(
+        ("prepared", "distinct_error"),
+        lambda prepared, distinct_error: sales_aggregator(prepared, distinct_error=distinct_error),
+    ),
+    "total_revenue": ReportNode(("aggregator",), _total_revenue),
+    "kpi_totals": ReportNode(("aggregator",), aggregate_kpi_totals),
+    "category_sales": ReportNode(("aggregator",), aggregate_category_sales),
+    "monthly_sales": ReportNode(("aggregator",), aggregate_monthly_sales),
+    "order_performance": ReportNode(("aggregator",), aggregate_order_performance),
+    "kpi_summary": ReportNode(("kpi_totals",), finalize_kpi_summary),
+    "category_performance": ReportNode(
+        ("category_sales", "total_revenue"), finalize_category_performance
+    ),
+    "product_contribution": ReportNode(("aggregator",), analyze_product_contribution),
+    "growth_trends": ReportNode(("monthly_sales",), finalize_growth_trends),
+    "performance_distribution": ReportNode(
+        ("order_performance",), finalize_performance_distribution
+    ),
+    "insights": ReportNode(
+        ("prepared", "distinct_error"),
+        lambda prepared, distinct_error: generate_executive_insights(
+            prepared, distinct_error=distinct_error
+        ),
+    ),
+    "kpi_catalog": ReportNode((), build_kpi_catalog),
+}
+
+
+class _Section:
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: LazyExecutiveReport, owner: type | None = None) -> pd.DataFrame:
+        section: pd.DataFrame = instance.section(self.name)
+        return section
+
+
+class LazyExecutiveReport:
+    """Executive report whose sections are computed on first access.
+
+    Each section is a node of :data:`REPORT_GRAPH`; intermediates such as the prepared frame,
+    the aggregator and the category aggregates are memoized, so reading one section only runs
+    the nodes it depends on. :meth:`materialize` returns the eager :class:`ExecutiveReport`.
+    """
+
+    kpi_summary = _Section()
+    category_performance = _Section()
+    product_contribution = _Section()
+    growth_trends = _Section()
+    performance_distribution = _Section()
+    insights = _Section()
+    kpi_catalog = _Section()
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        insights: pd.DataFrame | None = None,
+        *,
+        distinct_error: float | None = None,
+        graph: Mapping[str, ReportNode] = REPORT_GRAPH,
+    ) -> None:
+        self._graph = graph
+        self._values: dict[str, Any] = {"source": df, "distinct_error": distinct_error}
+        if insights is not None:
+            self._values["insights"] = insights
+        self._inputs = frozenset(self._values)
+
+    def section(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+        node = self._graph.get(name)
+        if node is None:
+            raise KeyError(f"Secao de relatorio desconhecida: {name}")
+        value = node.compute(*(self.section(dependency) for dependency in node.dependencies))
+        self._values[name] = value
+        return value
+
+    @property
+    def computed(self) -> frozenset[str]:
+        return frozenset(self._values) - self._inputs
+
+    def materialize(self) -> ExecutiveReport:
+        return ExecutiveReport(
+            **{field.name: self.section(field.name) for field in fields(ExecutiveReport)}
+        )
+
+
+def lazy_executive_report(
+    df: pd.DataFrame | LazyExecutiveReport, *, distinct_error: float | None = None
+) -> LazyExecutiveReport:
+    if isinstance(df, LazyExecutiveReport):
+        return df
+    return LazyExecutiveReport(df, distinct_error=distinct_error)
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 
+from .aggregation import SalesAggregator, cached_aggregator, is_sales_cube, read_only_frame
 from .business_metrics import build_kpi_catalog
 from .feature_engineering import build_features
+from .sketches import DEFAULT_KLL_K, KllSketch, SpaceSavingSketch
 
 
 @dataclass(frozen=True)
@@ -19,10 +23,40 @@ class ExecutiveReport:
     kpi_catalog: pd.DataFrame
 
 
+PREPARED_FRAME_ATTR = "amazon_sales_analysis.prepared_rows"
+PRODUCT_KEYS = ["product_id", "product_category"]
+DEFAULT_PRODUCT_SKETCH_CAPACITY = 1_000
+PREPARED_COLUMNS = frozenset(
+    {
+        "order_date",
+        "order_id",
+        "product_id",
+        "product_category",
+        "month_start",
+        "gross_revenue",
+        "discount_value",
+        "order_revenue_share",
+    }
+)
+
+
+def is_prepared_sales_frame(df: pd.DataFrame) -> bool:
+    # pandas propagates ``attrs`` through filters and column selections, so the marker is
+    # only trusted while the row count and derived columns still match the prepared frame.
+    return df.attrs.get(PREPARED_FRAME_ATTR) == len(df) and PREPARED_COLUMNS.issubset(df.columns)
+
+
 def prepare_sales_frame(df: pd.DataFrame) -> pd.DataFrame:
-    base = df.copy()
-    if "order_date" not in base.columns:
-        base["order_date"] = pd.Timestamp("1970-01-01")
+    """Derive the report columns once and return an immutable prepared frame.
+
+    Reductions over prepared frames are cached per frame object, so the frame's columns are
+    read-only. Derive changes with ``assign`` or ``copy`` and pass the new frame instead of
+    writing in place; replacing a column on the prepared frame itself leaves stale results.
+    """
+    if is_prepared_sales_frame(df) or is_sales_cube(df):
+        return df
+
+    base = df if "order_date" in df.columns else df.assign(order_date=pd.Timestamp("1970-01-01"))
     frame = build_features(base)
     if "order_id" not in frame.columns:
         frame["order_id"] = range(1, len(frame) + 1)
@@ -32,18 +66,47 @@ def prepare_sales_frame(df: pd.DataFrame) -> pd.DataFrame:
         frame["product_category"] = "Unknown"
     frame["order_date"] = pd.to_datetime(frame["order_date"], errors="coerce")
     frame["month_start"] = frame["order_date"].dt.to_period("M").dt.to_timestamp()
-    frame["order_revenue_share"] = frame["total_revenue"] / frame["total_revenue"].sum()
-    return frame.fillna({"order_revenue_share": 0.0})
+    total_revenue = frame["total_revenue"].sum()
+    frame["order_revenue_share"] = (frame["total_revenue"] / total_revenue).fillna(0.0)
+    frame.attrs[PREPARED_FRAME_ATTR] = len(frame)
+    return read_only_frame(frame)
+
 
+def sales_aggregator(
+    df: pd.DataFrame | SalesAggregator, *, distinct_error: float | None = None
+) -> SalesAggregator:
+    if isinstance(df, SalesAggregator):
+        return df
+    if distinct_error is not None:
+        return SalesAggregator(df, distinct_error=distinct_error)
+    # Prepared frames and cubes are treated as read-only, so their factorized keys can be shared.
+    if is_prepared_sales_frame(df) or is_sales_cube(df):
+        return cached_aggregator(df)
+    return SalesAggregator(df)
 
-def compute_kpi_summary(df: pd.DataFrame) -> pd.DataFrame:
-    total_revenue = float(df["total_revenue"].sum()) if not df.empty else 0.0
-    total_orders = float(df["order_id"].nunique()) if "order_id" in df else 0.0
-    gross_revenue = float(df["gross_revenue"].sum()) if "gross_revenue" in df else 0.0
-    total_units = float(df["quantity_sold"].sum()) if "quantity_sold" in df else 0.0
+
+def aggregate_kpi_totals(df: pd.DataFrame | SalesAggregator) -> dict[str, float]:
+    aggregator = sales_aggregator(df)
+    has = aggregator.has_column
+    return {
+        "total_revenue": aggregator.total("total_revenue") if not aggregator.frame.empty else 0.0,
+        "total_orders": aggregator.distinct_total("order_id") if has("order_id") else 0.0,
+        "gross_revenue": aggregator.total("gross_revenue") if has("gross_revenue") else 0.0,
+        "total_units": aggregator.total("quantity_sold") if has("quantity_sold") else 0.0,
+        "rating_sum": aggregator.total("rating") if has("rating") else 0.0,
+        "rating_count": aggregator.count_total("rating") if has("rating") else 0.0,
+    }
+
+
+def finalize_kpi_summary(totals: Mapping[str, float]) -> pd.DataFrame:
+    total_revenue = float(totals.get("total_revenue", 0.0))
+    total_orders = float(totals.get("total_orders", 0.0))
+    gross_revenue = float(totals.get("gross_revenue", 0.0))
+    total_units = float(totals.get("total_units", 0.0))
+    rating_count = float(totals.get("rating_count", 0.0))
     avg_ticket = total_revenue / total_orders if total_orders else 0.0
     discount_leakage = gross_revenue - total_revenue
-    rating = float(df["rating"].mean()) if "rating" in df and not df.empty else 0.0
+    rating = float(totals.get("rating_sum", 0.0)) / rating_count if rating_count else 0.0
     return pd.DataFrame(
         [
             {"metric": "total_revenue", "value": total_revenue, "unit": "currency"},
@@ -61,90 +124,216 @@ def compute_kpi_summary(df: pd.DataFrame) -> pd.DataFrame:
     )
 
 
-def analyze_category_performance(df: pd.DataFrame) -> pd.DataFrame:
-    total_revenue = float(df["total_revenue"].sum()) if not df.empty else 0.0
-    grouped = (
-        df.groupby("product_category", as_index=False)
-        .agg(
-            revenue=("total_revenue", "sum"),
-            orders=("order_id", "nunique"),
-            units=("quantity_sold", "sum"),
-            avg_order_value=("total_revenue", "mean"),
-            discount_value=("discount_value", "sum"),
-        )
-        .sort_values("revenue", ascending=False)
+def compute_kpi_summary(df: pd.DataFrame | SalesAggregator) -> pd.DataFrame:
+    return finalize_kpi_summary(aggregate_kpi_totals(df))
+
+
+def aggregate_category_sales(df: pd.DataFrame | SalesAggregator) -> pd.DataFrame:
+    return sales_aggregator(df).aggregate(
+        ["product_category"],
+        revenue=("total_revenue", "sum"),
+        orders=("order_id", "nunique"),
+        units=("quantity_sold", "sum"),
+        revenue_count=("total_revenue", "count"),
+        discount_value=("discount_value", "sum"),
     )
+
+
+def finalize_category_performance(aggregated: pd.DataFrame, total_revenue: float) -> pd.DataFrame:
+    grouped = pd.DataFrame(
+        {
+            "product_category": aggregated["product_category"],
+            "revenue": aggregated["revenue"],
+            "orders": aggregated["orders"],
+            "units": aggregated["units"],
+            "avg_order_value": aggregated["revenue"]
+            / aggregated["revenue_count"].where(aggregated["revenue_count"] > 0),
+            "discount_value": aggregated["discount_value"],
+        }
+    ).sort_values("revenue", ascending=False)
     grouped["revenue_share"] = grouped["revenue"] / total_revenue if total_revenue else 0.0
     grouped["discount_pressure"] = grouped["discount_value"] / grouped["revenue"].replace(0, pd.NA)
     return grouped.fillna({"discount_pressure": 0.0}).reset_index(drop=True)
 
 
-def analyze_product_contribution(df: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
-    total_revenue = float(df["total_revenue"].sum()) if not df.empty else 0.0
-    grouped = (
-        df.groupby(["product_id", "product_category"], as_index=False)
-        .agg(
-            revenue=("total_revenue", "sum"),
-            units=("quantity_sold", "sum"),
-            orders=("order_id", "nunique"),
-        )
-        .sort_values("revenue", ascending=False)
-        .head(top_n)
+def analyze_category_performance(df: pd.DataFrame | SalesAggregator) -> pd.DataFrame:
+    aggregator = sales_aggregator(df)
+    total_revenue = aggregator.total("total_revenue") if not aggregator.frame.empty else 0.0
+    return finalize_category_performance(aggregate_category_sales(aggregator), total_revenue)
+
+
+def analyze_product_contribution(
+    df: pd.DataFrame | SalesAggregator, top_n: int = 10
+) -> pd.DataFrame:
+    aggregator = sales_aggregator(df)
+    total_revenue = aggregator.total("total_revenue") if not aggregator.frame.empty else 0.0
+    # Partial selection of the leaders instead of sorting every product group.
+    grouped = aggregator.aggregate_groups(
+        PRODUCT_KEYS,
+        aggregator.top_groups(PRODUCT_KEYS, "total_revenue", top_n),
+        revenue=("total_revenue", "sum"),
+        units=("quantity_sold", "sum"),
+        orders=("order_id", "nunique"),
     )
     grouped["revenue_share"] = grouped["revenue"] / total_revenue if total_revenue else 0.0
     grouped["rank"] = range(1, len(grouped) + 1)
     return grouped
 
 
-def analyze_growth_trends(df: pd.DataFrame) -> pd.DataFrame:
-    monthly = (
-        df.groupby("month_start", as_index=False)
-        .agg(
-            revenue=("total_revenue", "sum"),
-            orders=("order_id", "nunique"),
-            units=("quantity_sold", "sum"),
-        )
-        .sort_values("month_start")
+def sketch_product_revenue(
+    chunks: Iterable[pd.DataFrame], *, capacity: int = DEFAULT_PRODUCT_SKETCH_CAPACITY
+) -> SpaceSavingSketch:
+    sketch = SpaceSavingSketch.empty(PRODUCT_KEYS, capacity)
+    for chunk in chunks:
+        sketch = sketch.update(chunk, "total_revenue")
+    return sketch
+
+
+def finalize_product_contribution(sketch: SpaceSavingSketch, top_n: int = 10) -> pd.DataFrame:
+    top = sketch.top(top_n)
+    total_revenue = sketch.total_weight
+    return pd.DataFrame(
+        {
+            "product_id": top["product_id"],
+            "product_category": top["product_category"],
+            "revenue": top["weight"],
+            "revenue_lower_bound": top["lower_bound"],
+            "revenue_share": top["weight"] / total_revenue if total_revenue else 0.0,
+            "revenue_share_error": top["error"] / total_revenue if total_revenue else 0.0,
+            "guaranteed_top": top["guaranteed"],
+            "rank": range(1, len(top) + 1),
+        }
+    )
+
+
+def aggregate_monthly_sales(df: pd.DataFrame | SalesAggregator) -> pd.DataFrame:
+    return sales_aggregator(df).aggregate(
+        ["month_start"],
+        revenue=("total_revenue", "sum"),
+        orders=("order_id", "nunique"),
+        units=("quantity_sold", "sum"),
     )
+
+
+def finalize_growth_trends(aggregated: pd.DataFrame) -> pd.DataFrame:
+    monthly = aggregated[["month_start", "revenue", "orders", "units"]].sort_values("month_start")
     monthly["avg_order_value"] = monthly["revenue"] / monthly["orders"].replace(0, pd.NA)
     monthly["revenue_growth_rate"] = monthly["revenue"].pct_change().fillna(0.0)
     monthly["momentum"] = monthly["revenue_growth_rate"].apply(classify_growth_momentum)
     return monthly.fillna({"avg_order_value": 0.0})
 
 
-def analyze_performance_distribution(df: pd.DataFrame) -> pd.DataFrame:
-    order_perf = (
-        df.groupby("order_id", as_index=False)
-        .agg(
-            order_revenue=("total_revenue", "sum"),
-            units=("quantity_sold", "sum"),
-            avg_discount=("discount_percent", "mean"),
-        )
-        .sort_values("order_revenue", ascending=False)
+def analyze_growth_trends(df: pd.DataFrame | SalesAggregator) -> pd.DataFrame:
+    return finalize_growth_trends(aggregate_monthly_sales(df))
+
+
+PERFORMANCE_BAND_LABELS = ["Low", "Mid-Low", "Mid-High", "High"]
+DISTRIBUTION_COLUMNS = ["performance_band", "orders", "revenue", "avg_order_value", "avg_discount"]
+
+
+def performance_band_labels(bands: int) -> list[str]:
+    if bands < 1:
+        raise ValueError("O numero de faixas de performance deve ser maior que zero.")
+    if bands == len(PERFORMANCE_BAND_LABELS):
+        return list(PERFORMANCE_BAND_LABELS)
+    return [f"Q{band}" for band in range(1, bands + 1)]
+
+
+def aggregate_order_performance(df: pd.DataFrame | SalesAggregator) -> pd.DataFrame:
+    return sales_aggregator(df).aggregate(
+        ["order_id"],
+        order_revenue=("total_revenue", "sum"),
+        units=("quantity_sold", "sum"),
+        avg_discount=("discount_percent", "mean"),
     )
-    if order_perf.empty:
+
+
+def sketch_order_revenue(chunks: Iterable[pd.DataFrame], *, k: int = DEFAULT_KLL_K) -> KllSketch:
+    """One bounded-memory pass over order revenue, assuming orders are not split across chunks."""
+    sketch = KllSketch(k=k)
+    for chunk in chunks:
+        sketch = sketch.update(chunk.groupby("order_id")["total_revenue"].sum().to_numpy())
+    return sketch
+
+
+def performance_band_edges(source: np.ndarray | KllSketch, bands: int = 4) -> np.ndarray:
+    fractions = np.arange(1, bands) / bands
+    if isinstance(source, KllSketch):
+        return source.quantiles(fractions)
+    edges: np.ndarray = np.quantile(np.asarray(source, dtype=float), fractions)
+    return edges
+
+
+def _summarize_bands(order_perf: pd.DataFrame, band_codes: np.ndarray, bands: int) -> pd.DataFrame:
+    revenue = order_perf["order_revenue"].to_numpy(dtype=float)
+    discount = order_perf["avg_discount"].to_numpy(dtype=float)
+    has_discount = ~np.isnan(discount)
+    orders = np.bincount(band_codes, minlength=bands)
+    band_revenue = np.bincount(band_codes, weights=revenue, minlength=bands)
+    discount_sum = np.bincount(
+        band_codes[has_discount], weights=discount[has_discount], minlength=bands
+    )
+    discount_count = np.bincount(band_codes[has_discount], minlength=bands)
+    with np.errstate(divide="ignore", invalid="ignore"):
         return pd.DataFrame(
-            columns=["performance_band", "orders", "revenue", "avg_order_value", "avg_discount"]
+            {
+                "performance_band": pd.Categorical(
+                    performance_band_labels(bands), categories=performance_band_labels(bands)
+                ),
+                "orders": orders,
+                "revenue": band_revenue,
+                "avg_order_value": np.where(orders > 0, band_revenue / orders, np.nan),
+                "avg_discount": np.where(discount_count > 0, discount_sum / discount_count, np.nan),
+            }
         )
 
-    quantiles = min(4, len(order_perf))
-    labels = ["Low", "Mid-Low", "Mid-High", "High"][-quantiles:]
-    order_perf["performance_band"] = pd.qcut(
-        order_perf["order_revenue"].rank(method="first"),
-        q=quantiles,
-        labels=labels,
+
+def analyze_performance_distribution(
+    df: pd.DataFrame | SalesAggregator,
+    *,
+    bands: int = 4,
+    quantile_sketch_k: int | None = None,
+) -> pd.DataFrame:
+    """Order revenue split into ``bands`` equal-count performance bands.
+
+    With ``quantile_sketch_k`` the band edges come from a KLL sketch and orders are banded
+    with a binary search, so no order-level sort is needed; bands are then equal-count up to
+    the sketch's rank error.
+    """
+    return finalize_performance_distribution(
+        aggregate_order_performance(df), bands=bands, quantile_sketch_k=quantile_sketch_k
     )
-    distribution = (
-        order_perf.groupby("performance_band", as_index=False, observed=False)
-        .agg(
+
+
+def finalize_performance_distribution(
+    order_perf: pd.DataFrame, *, bands: int = 4, quantile_sketch_k: int | None = None
+) -> pd.DataFrame:
+    labels = performance_band_labels(bands)
+    if order_perf.empty:
+        return pd.DataFrame(columns=DISTRIBUTION_COLUMNS)
+
+    if quantile_sketch_k is not None:
+        sketch = KllSketch(k=quantile_sketch_k).update(order_perf["order_revenue"].to_numpy())
+        edges = performance_band_edges(sketch, bands)
+        band_codes = np.searchsorted(edges, order_perf["order_revenue"].to_numpy(), side="right")
+        distribution = _summarize_bands(order_perf, band_codes, bands)
+    else:
+        order_perf = order_perf.sort_values("order_revenue", ascending=False)
+        quantiles = min(bands, len(order_perf))
+        order_perf["performance_band"] = pd.qcut(
+            order_perf["order_revenue"].rank(method="first"),
+            q=quantiles,
+            labels=labels[-quantiles:],
+        )
+        distribution = order_perf.groupby("performance_band", as_index=False, observed=False).agg(
             orders=("order_id", "count"),
             revenue=("order_revenue", "sum"),
             avg_order_value=("order_revenue", "mean"),
             avg_discount=("avg_discount", "mean"),
         )
-        .sort_values("avg_order_value", ascending=False)
-    )
-    total_revenue = float(order_perf["order_revenue"].sum()) if not order_perf.empty else 0.0
+
+    distribution = distribution.sort_values("avg_order_value", ascending=False)
+    total_revenue = float(order_perf["order_revenue"].sum())
     distribution["revenue_share"] = (
         distribution["revenue"] / total_revenue if total_revenue else 0.0
     )
@@ -159,14 +348,17 @@ def classify_growth_momentum(value: float) -> str:
     return "Stable"
 
 
-def build_executive_report(df: pd.DataFrame, insights: pd.DataFrame) -> ExecutiveReport:
+def build_executive_report(
+    df: pd.DataFrame, insights: pd.DataFrame, *, distinct_error: float | None = None
+) -> ExecutiveReport:
     prepared = prepare_sales_frame(df)
+    aggregator = sales_aggregator(prepared, distinct_error=distinct_error)
     return ExecutiveReport(
-        kpi_summary=compute_kpi_summary(prepared),
-        category_performance=analyze_category_performance(prepared),
-        product_contribution=analyze_product_contribution(prepared),
-        growth_trends=analyze_growth_trends(prepared),
-        performance_distribution=analyze_performance_distribution(prepared),
+        kpi_summary=compute_kpi_summary(aggregator),
+        category_performance=analyze_category_performance(aggregator),
+        product_contribution=analyze_product_contribution(aggregator),
+        growth_trends=analyze_growth_trends(aggregator),
+        performance_distribution=analyze_performance_distribution(aggregator),
         insights=insights,
         kpi_catalog=build_kpi_catalog(),
     )
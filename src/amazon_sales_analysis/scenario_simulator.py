@@ -1,9 +1,36 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
+import math
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
 
+import numpy as np
 import pandas as pd
 
+from .sales_analysis import sales_aggregator
+
+SCENARIO_GRID_COLUMNS = [
+    "scenario",
+    "baseline_revenue",
+    "gross_revenue",
+    "baseline_nrr",
+    "simulated_revenue",
+    "simulated_nrr",
+    "total_uplift",
+]
+RATE_DISTRIBUTIONS = {"beta": 2, "triangular": 3}
+UNCERTAINTY_PERCENTILES = (5, 50, 95)
+UNCERTAINTY_COLUMNS = [
+    "product_category",
+    "discount_leakage",
+    *(f"uplift_p{p}" for p in UNCERTAINTY_PERCENTILES),
+    *(f"simulated_nrr_p{p}" for p in UNCERTAINTY_PERCENTILES),
+]
+MONTE_CARLO_SHARD_DRAWS = 50_000
+
 
 def _normalize_recovery_rate(value: float) -> float:
     if value < 0:
@@ -13,19 +40,19 @@ def _normalize_recovery_rate(value: float) -> float:
     return value
 
 
-def simulate_leakage_recovery(
-    df: pd.DataFrame,
-    recovery_rates: Mapping[str, float],
-) -> dict[str, float | pd.DataFrame]:
-    frame = df.copy()
+def aggregate_category_leakage(
+    df: pd.DataFrame, dimensions: Sequence[str] = ("product_category",)
+) -> pd.DataFrame:
+    frame = df
     if "gross_revenue" not in frame.columns:
-        frame["gross_revenue"] = frame["price"] * frame["quantity_sold"]
+        frame = frame.assign(gross_revenue=frame["price"] * frame["quantity_sold"])
     if "discount_value" not in frame.columns:
-        frame["discount_value"] = frame["gross_revenue"] - frame["total_revenue"]
+        frame = frame.assign(discount_value=frame["gross_revenue"] - frame["total_revenue"])
 
-    category_summary = (
-        frame.groupby("product_category", as_index=False)
-        .agg(
+    return (
+        sales_aggregator(frame)
+        .aggregate(
+            list(dimensions),
             gross_revenue=("gross_revenue", "sum"),
             total_revenue=("total_revenue", "sum"),
             discount_leakage=("discount_value", "sum"),
@@ -33,6 +60,75 @@ def simulate_leakage_recovery(
         .sort_values("discount_leakage", ascending=False)
     )
 
+
+@dataclass(frozen=True)
+class LeakageBase:
+    """Per-category gross revenue, net revenue and leakage, precomputed for fast what-ifs.
+
+    :meth:`simulate` only touches these vectors, so a scenario costs microseconds instead of a
+    scan of the orders; its totals match :func:`simulate_leakage_recovery`.
+    """
+
+    categories: tuple[str, ...]
+    gross_revenue: tuple[float, ...]
+    total_revenue: tuple[float, ...]
+    discount_leakage: tuple[float, ...]
+
+    @classmethod
+    def from_leakage(cls, leakage: pd.DataFrame) -> LeakageBase:
+        return cls(
+            categories=tuple(leakage["product_category"].astype(str)),
+            gross_revenue=tuple(leakage["gross_revenue"].astype(float)),
+            total_revenue=tuple(leakage["total_revenue"].astype(float)),
+            discount_leakage=tuple(leakage["discount_leakage"].astype(float)),
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> LeakageBase:
+        return cls.from_leakage(aggregate_category_leakage(df))
+
+    def simulate(
+        self, recovery_rates: Mapping[str, float], *, default_rate: float = 0.0
+    ) -> dict[str, Any]:
+        baseline_revenue = math.fsum(self.total_revenue)
+        gross_revenue = math.fsum(self.gross_revenue)
+        rates = [
+            _normalize_recovery_rate(float(recovery_rates.get(category, default_rate)))
+            for category in self.categories
+        ]
+        uplifts = [
+            rate * leakage for rate, leakage in zip(rates, self.discount_leakage, strict=True)
+        ]
+        breakdown = [
+            {
+                "product_category": category,
+                "discount_leakage": leakage,
+                "recovery_rate": rate,
+                "expected_uplift": uplift,
+            }
+            for category, leakage, rate, uplift in zip(
+                self.categories, self.discount_leakage, rates, uplifts, strict=True
+            )
+        ]
+        total_uplift = math.fsum(uplifts)
+        simulated_revenue = baseline_revenue + total_uplift
+        return {
+            "baseline_revenue": baseline_revenue,
+            "gross_revenue": gross_revenue,
+            "baseline_nrr": (baseline_revenue / gross_revenue) if gross_revenue else 0.0,
+            "simulated_revenue": simulated_revenue,
+            "simulated_nrr": (simulated_revenue / gross_revenue) if gross_revenue else 0.0,
+            "total_uplift": total_uplift,
+            "category_breakdown": breakdown,
+        }
+
+
+def simulate_leakage_recovery(
+    df: pd.DataFrame,
+    recovery_rates: Mapping[str, float],
+) -> dict[str, float | pd.DataFrame]:
+    category_summary = aggregate_category_leakage(df)
+
     category_summary["recovery_rate"] = category_summary["product_category"].map(
         lambda category: _normalize_recovery_rate(float(recovery_rates.get(str(category), 0.0)))
     )
@@ -57,3 +153,282 @@ def simulate_leakage_recovery(
         "total_uplift": total_uplift,
         "category_breakdown": category_summary.reset_index(drop=True),
     }
+
+
+def scenario_rate_matrix(
+    scenarios: pd.DataFrame | Mapping[str, Mapping[str, float]],
+    categories: list[str],
+    *,
+    default_rate: float = 0.0,
+) -> pd.DataFrame:
+    """Scenario x category recovery rates aligned to ``categories``, clipped to [0, 1].
+
+    Categories a scenario leaves out (or leaves blank) get ``default_rate``; categories that are
+    not in ``categories`` are ignored, as in :func:`simulate_leakage_recovery`.
+    """
+    rates = (
+        scenarios
+        if isinstance(scenarios, pd.DataFrame)
+        else pd.DataFrame.from_dict(dict(scenarios), orient="index").reindex(list(scenarios))
+    )
+    if rates.index.has_duplicates:
+        raise ValueError("Os nomes dos cenarios devem ser unicos.")
+    return (
+        rates.rename(columns=str)
+        .reindex(columns=categories)
+        .astype(float)
+        .fillna(default_rate)
+        .clip(0.0, 1.0)
+    )
+
+
+def evaluate_scenario_grid(
+    leakage: pd.DataFrame,
+    scenarios: pd.DataFrame | Mapping[str, Mapping[str, float]],
+    *,
+    default_rate: float = 0.0,
+) -> pd.DataFrame:
+    """Evaluate every scenario against a category leakage table in one matrix product.
+
+    ``leakage`` comes from :func:`aggregate_category_leakage`; the uplift of all scenarios is
+    ``rates @ discount_leakage``, so the orders are never regrouped per scenario.
+    """
+    categories = leakage["product_category"].astype(str).tolist()
+    rates = scenario_rate_matrix(scenarios, categories, default_rate=default_rate)
+    uplift = rates.to_numpy() @ leakage["discount_leakage"].to_numpy(dtype=float)
+
+    baseline_revenue = float(leakage["total_revenue"].sum())
+    gross_revenue = float(leakage["gross_revenue"].sum())
+    simulated_revenue = baseline_revenue + uplift
+    return pd.DataFrame(
+        {
+            "scenario": rates.index.astype(str),
+            "baseline_revenue": baseline_revenue,
+            "gross_revenue": gross_revenue,
+            "baseline_nrr": (baseline_revenue / gross_revenue) if gross_revenue else 0.0,
+            "simulated_revenue": simulated_revenue,
+            "simulated_nrr": (
+                simulated_revenue / gross_revenue if gross_revenue else np.zeros(len(uplift))
+            ),
+            "total_uplift": uplift,
+        },
+        columns=SCENARIO_GRID_COLUMNS,
+    )
+
+
+def simulate_scenario_grid(
+    df: pd.DataFrame,
+    scenarios: pd.DataFrame | Mapping[str, Mapping[str, float]],
+    *,
+    default_rate: float = 0.0,
+) -> pd.DataFrame:
+    return evaluate_scenario_grid(
+        aggregate_category_leakage(df), scenarios, default_rate=default_rate
+    )
+
+
+@dataclass(frozen=True)
+class RateDistribution:
+    """Distribution of a category recovery rate: ``beta(a, b)`` or ``triangular(low, mode, high)``."""
+
+    kind: str
+    parameters: tuple[float, ...]
+
+    def __post_init__(self) -> None:
+        arity = RATE_DISTRIBUTIONS.get(self.kind)
+        if arity is None:
+            raise ValueError(f"Distribuicao de taxa nao suportada: {self.kind}")
+        if len(self.parameters) != arity:
+            raise ValueError(f"A distribuicao {self.kind} espera {arity} parametros.")
+        if self.kind == "beta" and min(self.parameters) <= 0:
+            raise ValueError("Os parametros da distribuicao beta devem ser maiores que zero.")
+        if self.kind == "triangular":
+            low, mode, high = self.parameters
+            if not 0 <= low <= mode <= high <= 1 or low == high:
+                raise ValueError("A distribuicao triangular exige 0 <= min <= moda <= max <= 1.")
+
+    @classmethod
+    def parse(cls, spec: str) -> RateDistribution:
+        """Parse ``beta:2:18`` or ``triangular:0.02:0.05:0.1``."""
+        kind, *values = spec.strip().split(":")
+        try:
+            parameters = tuple(float(value) for value in values)
+        except ValueError as exc:
+            raise ValueError(f"Parametros invalidos na distribuicao: {spec}") from exc
+        return cls(kind.strip().lower(), parameters)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.kind == "beta":
+            alpha, beta = self.parameters
+            return rng.beta(alpha, beta, size=size)
+        low, mode, high = self.parameters
+        return rng.triangular(low, mode, high, size=size)
+
+
+def _sample_recovery_rates(
+    seed: np.random.SeedSequence,
+    size: int,
+    *,
+    distributions: tuple[RateDistribution | None, ...],
+    default_rate: float,
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    rates = np.full((size, len(distributions)), _normalize_recovery_rate(default_rate))
+    for column, distribution in enumerate(distributions):
+        if distribution is not None:
+            rates[:, column] = distribution.sample(rng, size)
+    return rates
+
+
+def evaluate_recovery_uncertainty(
+    leakage: pd.DataFrame,
+    distributions: Mapping[str, RateDistribution],
+    *,
+    default_rate: float = 0.0,
+    draws: int = 100_000,
+    seed: int | None = None,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """Monte Carlo percentiles of uplift and simulated NRR per category and in total.
+
+    Recovery rates are drawn per category from ``distributions`` (categories without one keep
+    ``default_rate``) in shards of :data:`MONTE_CARLO_SHARD_DRAWS`. Each shard has its own
+    child of ``SeedSequence(seed)``, so a seed gives the same percentiles for any ``workers``.
+    """
+    if draws <= 0:
+        raise ValueError("O numero de simulacoes deve ser maior que zero.")
+    if workers < 1:
+        raise ValueError("O numero de workers deve ser maior que zero.")
+
+    categories = leakage["product_category"].astype(str).tolist()
+    shards = math.ceil(draws / MONTE_CARLO_SHARD_DRAWS)
+    sizes = [MONTE_CARLO_SHARD_DRAWS] * (shards - 1) + [
+        draws - MONTE_CARLO_SHARD_DRAWS * (shards - 1)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    sample = partial(
+        _sample_recovery_rates,
+        distributions=tuple(distributions.get(category) for category in categories),
+        default_rate=default_rate,
+    )
+    if workers == 1 or shards == 1:
+        chunks = [sample(child, size) for child, size in zip(seeds, sizes, strict=True)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, shards)) as executor:
+            chunks = list(executor.map(sample, seeds, sizes))
+
+    discount_leakage = leakage["discount_leakage"].to_numpy(dtype=float)
+    uplift = np.concatenate(chunks) * discount_leakage
+    uplift = np.column_stack([uplift, uplift.sum(axis=1)])
+    total_revenue = np.append(
+        leakage["total_revenue"].to_numpy(dtype=float), leakage["total_revenue"].sum()
+    )
+    gross_revenue = np.append(
+        leakage["gross_revenue"].to_numpy(dtype=float), leakage["gross_revenue"].sum()
+    )
+
+    uplift_percentiles = np.percentile(uplift, UNCERTAINTY_PERCENTILES, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nrr_percentiles = np.where(
+            gross_revenue > 0, (total_revenue + uplift_percentiles) / gross_revenue, 0.0
+        )
+    return pd.DataFrame(
+        {
+            "product_category": [*categories, "total"],
+            "discount_leakage": np.append(discount_leakage, discount_leakage.sum()),
+            **{
+                f"uplift_p{p}": uplift_percentiles[row]
+                for row, p in enumerate(UNCERTAINTY_PERCENTILES)
+            },
+            **{
+                f"simulated_nrr_p{p}": nrr_percentiles[row]
+                for row, p in enumerate(UNCERTAINTY_PERCENTILES)
+            },
+        },
+        columns=UNCERTAINTY_COLUMNS,
+    )
+
+
+def simulate_recovery_uncertainty(
+    df: pd.DataFrame,
+    distributions: Mapping[str, RateDistribution],
+    *,
+    default_rate: float = 0.0,
+    draws: int = 100_000,
+    seed: int | None = None,
+    workers: int = 1,
+) -> pd.DataFrame:
+    return evaluate_recovery_uncertainty(
+        aggregate_category_leakage(df),
+        distributions,
+        default_rate=default_rate,
+        draws=draws,
+        seed=seed,
+        workers=workers,
+    )
+
+
+def optimize_recovery_allocation(
+    leakage: pd.DataFrame,
+    *,
+    budget: float,
+    max_rate: float = 0.3,
+    category_caps: Mapping[str, float] | None = None,
+    category_effort: Mapping[str, float] | None = None,
+) -> dict[str, float | pd.DataFrame]:
+    """Recovery rates per leakage cell that maximize uplift within an effort budget.
+
+    Each cell may recover up to its cap (``category_caps`` or ``max_rate``) and a rate ``r``
+    costs ``r * effort_per_rate`` (``category_effort``, default 1.0), both keyed by
+    ``product_category``. Uplift and effort are linear, so this LP is a fractional knapsack:
+    cells are funded to their cap in order of leakage per unit of effort and the first one
+    that does not fit gets the remaining budget. ``leakage`` may hold any grain from
+    :func:`aggregate_category_leakage`, e.g. category x region cells.
+    """
+    if budget < 0:
+        raise ValueError("O orcamento de esforco nao pode ser negativo.")
+    categories = leakage["product_category"].astype(str)
+    caps = categories.map(lambda category: (category_caps or {}).get(category, max_rate))
+    effort = categories.map(lambda category: (category_effort or {}).get(category, 1.0))
+    cap = np.clip(caps.to_numpy(dtype=float), 0.0, 1.0)
+    effort_per_rate = effort.to_numpy(dtype=float)
+    if (effort_per_rate < 0).any():
+        raise ValueError("O esforco por taxa nao pode ser negativo.")
+    discount_leakage = np.clip(leakage["discount_leakage"].to_numpy(dtype=float), 0.0, None)
+    # Cells without leakage have nothing to recover and must not consume budget.
+    cap = np.where(discount_leakage > 0, cap, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value_per_effort = np.where(effort_per_rate > 0, discount_leakage / effort_per_rate, np.inf)
+    order = np.argsort(-value_per_effort, kind="stable")
+    full_cost = (cap * effort_per_rate)[order]
+    spent_before = np.concatenate([[0.0], np.cumsum(full_cost)[:-1]])
+    remaining = np.clip(budget - spent_before, 0.0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        affordable = np.where(full_cost > remaining, remaining / effort_per_rate[order], cap[order])
+    rate = np.empty_like(cap)
+    rate[order] = affordable
+
+    allocation = leakage.drop(columns=["discount_leakage"]).assign(
+        discount_leakage=discount_leakage,
+        max_recovery_rate=cap,
+        effort_per_rate=effort_per_rate,
+        recovery_rate=rate,
+        effort=rate * effort_per_rate,
+        expected_uplift=rate * discount_leakage,
+    )
+    allocation = allocation.sort_values("expected_uplift", ascending=False).reset_index(drop=True)
+    baseline_revenue = float(leakage["total_revenue"].sum())
+    gross_revenue = float(leakage["gross_revenue"].sum())
+    total_uplift = float(allocation["expected_uplift"].sum())
+    return {
+        "budget": float(budget),
+        "effort_used": float(allocation["effort"].sum()),
+        "baseline_revenue": baseline_revenue,
+        "simulated_revenue": baseline_revenue + total_uplift,
+        "simulated_nrr": (
+            (baseline_revenue + total_uplift) / gross_revenue if gross_revenue else 0.0
+        ),
+        "total_uplift": total_uplift,
+        "allocation": allocation,
+    }
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, replace
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DISTINCT_ERROR = 0.01
+HLL_MIN_PRECISION = 4
+HLL_MAX_PRECISION = 18
+HLL_MIN_RELATIVE_ERROR = 1.04 / 2 ** (HLL_MAX_PRECISION / 2)
+
+
+def hll_precision(relative_error: float) -> int:
+    if not 0 < relative_error < 1:
+        raise ValueError("O erro relativo do HyperLogLog deve estar entre 0 e 1.")
+    if relative_error < HLL_MIN_RELATIVE_ERROR:
+        raise ValueError(
+            f"O erro relativo do HyperLogLog deve ser de pelo menos {HLL_MIN_RELATIVE_ERROR:.5f} "
+            f"(precisao maxima {HLL_MAX_PRECISION})."
+        )
+    precision = math.ceil(math.log2((1.04 / relative_error) ** 2))
+    return min(max(precision, HLL_MIN_PRECISION), HLL_MAX_PRECISION)
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    # Numeric ids are hashed as float64 so int and float chunks of the same ids agree.
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        values = values.astype("float64")
+    hashes: np.ndarray = pd.util.hash_pandas_object(values, index=False).to_numpy(np.uint64)
+    return hashes
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    remaining = values.copy()
+    length = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        wide = remaining >= np.uint64(1 << shift)
+        length[wide] += shift
+        remaining[wide] >>= np.uint64(shift)
+    return length + (remaining > 0)
+
+
+def _register_updates(hashes: np.ndarray, precision: int) -> tuple[np.ndarray, np.ndarray]:
+    suffix_bits = 64 - precision
+    index = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+    suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+    rank = suffix_bits - _bit_length(suffix) + 1
+    return index, rank.astype(np.uint8)
+
+
+def _alpha(registers: int) -> float:
+    return {16: 0.673, 32: 0.697, 64: 0.709}.get(registers, 0.7213 / (1 + 1.079 / registers))
+
+
+def _hll_estimate(
+    harmonic_sum: np.ndarray, zero_registers: np.ndarray, registers: int
+) -> np.ndarray:
+    raw = _alpha(registers) * registers**2 / harmonic_sum
+    with np.errstate(divide="ignore"):
+        linear = registers * np.log(registers / np.maximum(zero_registers, 1))
+    use_linear = (raw <= 2.5 * registers) & (zero_registers > 0)
+    return np.where(use_linear, linear, raw)
+
+
+@dataclass(frozen=True)
+class HyperLogLogCounter:
+    """HyperLogLog distinct counter with ``2**precision`` one-byte registers.
+
+    The standard error of :meth:`estimate` is about ``1.04 / sqrt(2**precision)``; counters
+    with the same precision merge losslessly with an element-wise register maximum.
+    """
+
+    registers: np.ndarray
+
+    @classmethod
+    def empty(cls, relative_error: float = DEFAULT_DISTINCT_ERROR) -> HyperLogLogCounter:
+        return cls(np.zeros(1 << hll_precision(relative_error), dtype=np.uint8))
+
+    @classmethod
+    def from_values(
+        cls, values: pd.Series, *, relative_error: float = DEFAULT_DISTINCT_ERROR
+    ) -> HyperLogLogCounter:
+        counter = cls.empty(relative_error)
+        present = values.dropna()
+        if not present.empty:
+            index, rank = _register_updates(hash_values(present), counter.precision)
+            np.maximum.at(counter.registers, index, rank)
+        return counter
+
+    @classmethod
+    def factory(
+        cls, relative_error: float = DEFAULT_DISTINCT_ERROR
+    ) -> Callable[[pd.Series], HyperLogLogCounter]:
+        hll_precision(relative_error)
+        return partial(cls.from_values, relative_error=relative_error)
+
+    @property
+    def precision(self) -> int:
+        return int(len(self.registers)).bit_length() - 1
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def merge(self, other: HyperLogLogCounter) -> HyperLogLogCounter:
+        if len(self.registers) != len(other.registers):
+            raise ValueError("Sketches HyperLogLog com precisoes diferentes nao podem ser unidos.")
+        return HyperLogLogCounter(np.maximum(self.registers, other.registers))
+
+    def estimate(self) -> float:
+        registers = len(self.registers)
+        harmonic_sum = np.ldexp(1.0, -self.registers.astype(np.int64)).sum()
+        zero_registers = np.count_nonzero(self.registers == 0)
+        return float(
+            _hll_estimate(np.array([harmonic_sum]), np.array([zero_registers]), registers)[0]
+        )
+
+
+def grouped_distinct_estimate(
+    group_codes: np.ndarray,
+    values: pd.Series,
+    size: int,
+    *,
+    relative_error: float = DEFAULT_DISTINCT_ERROR,
+) -> np.ndarray:
+    """Approximate distinct count of ``values`` per group code (``-1`` codes are ignored)."""
+    precision = hll_precision(relative_error)
+    registers = 1 << precision
+    mask = (group_codes >= 0) & values.notna().to_numpy()
+    if not mask.any():
+        return np.zeros(size, dtype=float)
+
+    index, rank = _register_updates(hash_values(values[mask]), precision)
+    # Only registers that were hit are materialized, so memory stays proportional to the rows.
+    cells = pd.Series(rank).groupby(group_codes[mask] * registers + index).max()
+    cell_groups = cells.index.to_numpy() // registers
+    harmonic_hit = np.bincount(
+        cell_groups, weights=np.ldexp(1.0, -cells.to_numpy().astype(np.int64)), minlength=size
+    )
+    hit = np.bincount(cell_groups, minlength=size)
+    zero_registers = registers - hit
+    return _hll_estimate(harmonic_hit + zero_registers, zero_registers, registers)
+
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest values, descending, ties broken by position.
+
+    Uses ``np.argpartition`` so only the selected candidates are sorted.
+    """
+    if k <= 0 or len(values) == 0:
+        return np.array([], dtype=np.int64)
+    if k < len(values):
+        threshold = values[np.argpartition(-values, k - 1)[:k]].min()
+        candidates = np.flatnonzero(values >= threshold)
+    else:
+        candidates = np.arange(len(values))
+    order = np.lexsort((candidates, -values[candidates]))
+    selected: np.ndarray = candidates[order][:k]
+    return selected
+
+
+def _truncate_counters(
+    counters: pd.DataFrame, capacity: int, floor: float
+) -> tuple[pd.DataFrame, float]:
+    if len(counters) <= capacity:
+        return counters.reset_index(drop=True), floor
+    weights = counters["weight"].to_numpy(dtype=float)
+    kept = top_k_indices(weights, capacity)
+    dropped = np.ones(len(counters), dtype=bool)
+    dropped[kept] = False
+    return counters.iloc[kept].reset_index(drop=True), max(floor, float(weights[dropped].max()))
+
+
+@dataclass(frozen=True)
+class SpaceSavingSketch:
+    """Weighted Space-Saving heavy-hitter sketch over the ``keys`` columns.
+
+    At most ``capacity`` items are tracked. Each tracked ``weight`` is an upper bound on the
+    true weight and ``weight - error`` a lower bound; untracked items weigh at most ``floor``.
+    Sketches built per chunk or partition merge into one with the same guarantees.
+    """
+
+    keys: tuple[str, ...]
+    capacity: int
+    counters: pd.DataFrame
+    floor: float = 0.0
+    total_weight: float = 0.0
+
+    @classmethod
+    def empty(cls, keys: Sequence[str], capacity: int) -> SpaceSavingSketch:
+        if capacity <= 0:
+            raise ValueError("A capacidade do sketch Space-Saving deve ser maior que zero.")
+        counters = pd.DataFrame(columns=[*keys, "weight", "error"])
+        return cls(keys=tuple(keys), capacity=capacity, counters=counters)
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame, keys: Sequence[str], weight: str, capacity: int
+    ) -> SpaceSavingSketch:
+        sketch = cls.empty(keys, capacity)
+        if df.empty:
+            return sketch
+        sums = df.groupby(list(keys), as_index=False, sort=False)[weight].sum()
+        sums = sums.rename(columns={weight: "weight"}).assign(error=0.0)
+        counters, floor = _truncate_counters(sums, capacity, 0.0)
+        return replace(sketch, counters=counters, floor=floor, total_weight=float(df[weight].sum()))
+
+    def update(self, df: pd.DataFrame, weight: str) -> SpaceSavingSketch:
+        return self.merge(SpaceSavingSketch.from_frame(df, self.keys, weight, self.capacity))
+
+    def merge(self, other: SpaceSavingSketch) -> SpaceSavingSketch:
+        if self.keys != other.keys:
+            raise ValueError("Sketches Space-Saving com chaves diferentes nao podem ser unidos.")
+        if other.counters.empty and other.floor == 0:
+            return replace(self, total_weight=self.total_weight + other.total_weight)
+        if self.counters.empty and self.floor == 0:
+            counters, floor = _truncate_counters(other.counters, self.capacity, other.floor)
+            return replace(
+                self,
+                counters=counters,
+                floor=floor,
+                total_weight=self.total_weight + other.total_weight,
+            )
+
+        keys = list(self.keys)
+        combined = self.counters.merge(
+            other.counters, on=keys, how="outer", suffixes=("_left", "_right")
+        )
+        counters = combined[keys].assign(
+            weight=combined["weight_left"].astype(float).fillna(self.floor)
+            + combined["weight_right"].astype(float).fillna(other.floor),
+            error=combined["error_left"].astype(float).fillna(self.floor)
+            + combined["error_right"].astype(float).fillna(other.floor),
+        )
+        counters, floor = _truncate_counters(counters, self.capacity, self.floor + other.floor)
+        return replace(
+            self,
+            counters=counters,
+            floor=floor,
+            total_weight=self.total_weight + other.total_weight,
+        )
+
+    def top(self, k: int) -> pd.DataFrame:
+        weights = self.counters["weight"].to_numpy(dtype=float)
+        indices = top_k_indices(weights, k)
+        selected = self.counters.iloc[indices].reset_index(drop=True)
+        lower_bound = selected["weight"].astype(float) - selected["error"].astype(float)
+        # The next candidate's upper bound decides whether a tracked item is surely in the top k.
+        remaining = np.delete(weights, indices)
+        challenger = max(self.floor, float(remaining.max()) if len(remaining) else 0.0)
+        return selected.assign(
+            weight=selected["weight"].astype(float),
+            error=selected["error"].astype(float),
+            lower_bound=lower_bound,
+            guaranteed=lower_bound >= challenger,
+        )
+
+
+DEFAULT_KLL_K = 200
+KLL_CAPACITY_DECAY = 2 / 3
+
+
+def _kll_capacity(k: int, level: int, height: int) -> int:
+    return max(2, math.ceil(k * KLL_CAPACITY_DECAY ** (height - 1 - level)))
+
+
+@dataclass(frozen=True)
+class KllSketch:
+    """KLL quantile sketch: ``levels[h]`` holds retained values that each stand for ``2**h``.
+
+    Memory stays around ``3 * k`` values whatever the stream length, and sketches built on
+    separate chunks or partitions merge into one. Compactions pick the kept half with a
+    seeded coin, so results are reproducible for a given ``seed``.
+    """
+
+    k: int = DEFAULT_KLL_K
+    levels: tuple[np.ndarray, ...] = ()
+    count: int = 0
+    seed: int = 0
+
+    @property
+    def normalized_rank_error(self) -> float:
+        # Empirical two-sided rank error of KLL sketches (Apache DataSketches constants).
+        return float(2.446 / self.k**0.9433)
+
+    def update(self, values: np.ndarray | pd.Series) -> KllSketch:
+        array = np.asarray(values, dtype=float)
+        array = array[~np.isnan(array)]
+        sketch = self
+        # Feeding about k values at a time keeps level 0 and every sort bounded by the capacity
+        # instead of sorting the whole input at once.
+        for start in range(0, array.size, self.k):
+            chunk = array[start : start + self.k]
+            levels = list(sketch.levels) or [np.array([], dtype=float)]
+            levels[0] = np.concatenate([levels[0], chunk])
+            sketch = sketch._compress(levels, sketch.count + int(chunk.size))
+        return sketch
+
+    def merge(self, other: KllSketch) -> KllSketch:
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return replace(other, k=self.k, seed=self.seed)._compress(
+                list(other.levels), other.count
+            )
+        height = max(len(self.levels), len(other.levels))
+        levels = [
+            np.concatenate(
+                [
+                    self.levels[h] if h < len(self.levels) else np.array([], dtype=float),
+                    other.levels[h] if h < len(other.levels) else np.array([], dtype=float),
+                ]
+            )
+            for h in range(height)
+        ]
+        return self._compress(levels, self.count + other.count)
+
+    def _compress(self, levels: list[np.ndarray], count: int) -> KllSketch:
+        rng = np.random.default_rng((self.seed, count))
+        level = 0
+        while level < len(levels):
+            if len(levels[level]) <= _kll_capacity(self.k, level, len(levels)):
+                level += 1
+                continue
+            items = np.sort(levels[level])
+            keep_one = len(items) % 2 == 1
+            if level + 1 == len(levels):
+                levels.append(np.array([], dtype=float))
+            paired = items[1:] if keep_one else items
+            promoted = paired[int(rng.integers(2)) :: 2]
+            levels[level] = items[:1] if keep_one else np.array([], dtype=float)
+            levels[level + 1] = np.concatenate([levels[level + 1], promoted])
+            # A compaction can overflow the next level and shrink lower capacities; rescan.
+            level = 0
+        return replace(self, levels=tuple(levels), count=count)
+
+    def _weighted_items(self) -> tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self.levels) if self.levels else np.array([], dtype=float)
+        weights = np.concatenate(
+            [np.full(len(values), 2**h, dtype=float) for h, values in enumerate(self.levels)]
+            or [np.array([], dtype=float)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, fractions: Sequence[float] | np.ndarray) -> np.ndarray:
+        if self.count == 0:
+            raise ValueError("O sketch de quantis esta vazio.")
+        items, weights = self._weighted_items()
+        cumulative = np.cumsum(weights)
+        targets = np.clip(np.asarray(fractions, dtype=float), 0.0, 1.0) * cumulative[-1]
+        positions = np.searchsorted(cumulative, targets, side="left")
+        selected: np.ndarray = items[np.minimum(positions, len(items) - 1)]
+        return selected
+
+    @property
+    def retained(self) -> int:
+        return sum(len(values) for values in self.levels)
@@ -2,13 +2,33 @@ import pandas as pd
 
 from .data_preprocessing import audit_data_quality
 from .insights import generate_executive_insights
-from .sales_analysis import build_executive_report, prepare_sales_frame
+from .parallel_report import build_parallel_executive_report
+from .report_graph import LazyExecutiveReport
+from .sales_analysis import ExecutiveReport, prepare_sales_frame
 
 
-def build_executive_tables(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+def build_executive_tables(
+    df: pd.DataFrame,
+    *,
+    report: ExecutiveReport | LazyExecutiveReport | None = None,
+    distinct_error: float | None = None,
+    workers: int | None = None,
+    shard_by: str = "order",
+    shard_rows: int | None = None,
+) -> dict[str, pd.DataFrame]:
     prepared = prepare_sales_frame(df)
-    insights = generate_executive_insights(prepared)
-    report = build_executive_report(prepared, insights)
+    # A report the caller already built is reused instead of computing the tables again.
+    if report is None and workers is None:
+        report = LazyExecutiveReport(prepared, distinct_error=distinct_error)
+    elif report is None:
+        report = build_parallel_executive_report(
+            prepared,
+            generate_executive_insights(prepared, distinct_error=distinct_error),
+            workers=workers,
+            shard_by=shard_by,
+            shard_rows=shard_rows,
+            distinct_error=distinct_error,
+        )
 
     monthly_trend = report.growth_trends.rename(columns={"month_start": "month_end"})
 
@@ -74,7 +74,8 @@ def performance_distribution_chart(df: pd.DataFrame) -> None:
 
 
 def build_storytelling_visuals(df: pd.DataFrame) -> None:
-    sales_trend_over_time(df)
-    top_categories_by_sales(df)
-    product_contribution_chart(df)
-    performance_distribution_chart(df)
+    prepared = prepare_sales_frame(df)
+    sales_trend_over_time(prepared)
+    top_categories_by_sales(prepared)
+    product_contribution_chart(prepared)
+    performance_distribution_chart(prepared)
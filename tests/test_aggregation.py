@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from amazon_sales_analysis.aggregation import SalesAggregator
+from amazon_sales_analysis.sales_analysis import prepare_sales_frame, sales_aggregator
+
+
+def _fixture_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "order_id": [1, 1, 2, 3, 4, 5],
+            "product_id": [10, 11, 10, 12, 10, 11],
+            "product_category": ["Home", "Home", "Beauty", None, "Beauty", "Home"],
+            "quantity_sold": [2, 1, 3, 4, 1, 2],
+            "total_revenue": [180.0, 96.0, np.nan, 200.0, 50.0, 70.0],
+        }
+    )
+
+
+def test_sales_aggregator_matches_pandas_groupby():
+    df = _fixture_df()
+    named = {
+        "revenue": ("total_revenue", "sum"),
+        "revenue_count": ("total_revenue", "count"),
+        "avg_revenue": ("total_revenue", "mean"),
+        "units": ("quantity_sold", "sum"),
+        "orders": ("order_id", "nunique"),
+    }
+
+    for keys in (["product_category"], ["product_id", "product_category"]):
+        result = SalesAggregator(df).aggregate(keys, **named)
+        expected = df.groupby(keys, as_index=False).agg(**named)
+        pd.testing.assert_frame_equal(result, expected)
+
+
+def test_prepared_frames_share_one_cached_aggregator():
+    raw = pd.DataFrame(
+        {
+            "order_id": [1, 2],
+            "order_date": ["2024-01-15", "2024-02-10"],
+            "product_id": [10, 11],
+            "product_category": ["Home", "Beauty"],
+            "price": [100.0, 120.0],
+            "discount_percent": [10, 20],
+            "quantity_sold": [2, 1],
+            "total_revenue": [180.0, 96.0],
+        }
+    )
+    prepared = prepare_sales_frame(raw)
+
+    assert sales_aggregator(prepared) is sales_aggregator(prepared)
+    assert sales_aggregator(raw) is not sales_aggregator(raw)
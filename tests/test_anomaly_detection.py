@@ -1,6 +1,16 @@
 import pandas as pd
+import pytest
 
-from amazon_sales_analysis.anomaly_detection import detect_discount_spikes
+from amazon_sales_analysis.anomaly_detection import (
+    SLICE_ALERT_COLUMNS,
+    SpikeBaseline,
+    StreamingSpikeDetector,
+    detect_discount_spikes,
+    detect_multidimensional_spikes,
+    load_spike_detector,
+    save_spike_detector,
+    sweep_discount_spike_thresholds,
+)
 
 
 def _fixture_df() -> pd.DataFrame:
@@ -35,3 +45,139 @@ def test_detect_discount_spikes_flags_large_spike() -> None:
     assert not alerts.empty
     assert "severity" in alerts.columns
     assert float(alerts["z_score"].max()) >= 2.0
+
+
+def test_streaming_detector_alerts_on_arrival_and_resumes_from_checkpoint(tmp_path) -> None:
+    orders = _fixture_df()
+    days = [day for _, day in orders.groupby("order_date")]
+
+    detector = StreamingSpikeDetector(z_threshold=2.0, min_observations=5)
+    quiet = [detector.update(day) for day in days[:4]]
+    checkpoint = save_spike_detector(detector, tmp_path / "detector.json")
+    resumed = load_spike_detector(checkpoint)
+    quiet += [resumed.update(day) for day in days[4:7]]
+    alerts = resumed.update(days[7])
+
+    assert all(batch.empty for batch in quiet)
+    assert alerts.columns.tolist() == detect_discount_spikes(orders).columns.tolist()
+    assert alerts["order_date"].tolist() == [pd.Timestamp("2024-01-08")]
+    assert alerts["severity"].tolist() == ["critical"]
+    assert alerts["baseline_mean"].iloc[0] == pytest.approx(10.142857)
+    assert alerts["estimated_leakage_usd"].iloc[0] == pytest.approx(200.0 * (45 - 10.142857) / 100)
+    assert resumed.update(days[7]).empty
+    assert resumed.flush().empty
+    assert resumed.baselines["Electronics"].count == 8
+
+
+def test_multidimensional_detection_finds_spikes_diluted_at_category_level() -> None:
+    records: list[dict[str, object]] = []
+    dates = pd.date_range("2024-01-01", periods=10, freq="D")
+    regions = ["North", "South", "East", "West"]
+    for day_index, day in enumerate(dates):
+        for region_index, region in enumerate(regions):
+            discount = 10.0 + (day_index + region_index) % 3
+            if day_index == 9:
+                # North spikes while the other regions run light, so the category mean is flat.
+                discount = 40.0 if region == "North" else 2.0
+            records.append(
+                {
+                    "order_date": day,
+                    "product_category": "Electronics",
+                    "customer_region": region,
+                    "payment_method": "Card",
+                    "product_id": 100 + region_index,
+                    "discount_percent": discount,
+                    "price": 100.0,
+                    "quantity_sold": 1,
+                }
+            )
+    orders = pd.DataFrame(records)
+    orders.loc[len(orders)] = {**records[0], "product_id": 999, "order_date": dates[9]}
+
+    alerts = detect_multidimensional_spikes(orders, z_threshold=2.5, min_observations=5)
+    by_dimension = alerts.groupby("dimension")["slice"].agg(list).to_dict()
+
+    assert list(alerts.columns) == SLICE_ALERT_COLUMNS
+    assert "category" not in by_dimension
+    assert "category_payment" not in by_dimension
+    assert by_dimension["category_region"] == ["Electronics / North"]
+    assert by_dimension["product"] == ["Electronics / 100"]
+    assert "Electronics / 999" not in alerts["slice"].tolist()
+
+    category_only = detect_multidimensional_spikes(
+        orders, dimensions={"category": ["product_category"]}, z_threshold=1.0
+    )
+    expected = detect_discount_spikes(orders, z_threshold=1.0)
+    pd.testing.assert_frame_equal(
+        category_only[expected.columns].reset_index(drop=True),
+        expected.reset_index(drop=True),
+    )
+
+
+def test_multidimensional_category_slice_ignores_missing_other_dimensions() -> None:
+    orders = _fixture_df()
+    orders.loc[[1, 7], "customer_region"] = None
+    orders.loc[[2, 7], "payment_method"] = None
+
+    alerts = detect_multidimensional_spikes(orders, z_threshold=1.0, min_observations=5)
+    category = alerts[alerts["dimension"] == "category"]
+    expected = detect_discount_spikes(orders, z_threshold=1.0, min_observations=5)
+
+    pd.testing.assert_frame_equal(
+        category[expected.columns].reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_dtype=False,
+    )
+    assert category["gross_revenue"].tolist() == [200.0]
+
+
+def test_threshold_sweep_matches_detection_at_every_grid_point() -> None:
+    orders = _fixture_df()
+    z_thresholds = [1.0, 2.0, 3.5, 6.0]
+
+    sweep = sweep_discount_spike_thresholds(
+        orders, z_thresholds=z_thresholds, min_observations=[3, 5]
+    )
+
+    assert len(sweep) == 8
+    for row in sweep.itertuples(index=False):
+        alerts = detect_discount_spikes(
+            orders, z_threshold=row.z_threshold, min_observations=row.min_observations
+        )
+        severities = alerts["severity"].value_counts()
+        assert row.alerts_count == len(alerts)
+        assert row.estimated_leakage_usd == pytest.approx(alerts["estimated_leakage_usd"].sum())
+        assert row.critical == severities.get("critical", 0)
+    counts = sweep.groupby("min_observations")["alerts_count"]
+    assert counts.apply(lambda series: series.is_monotonic_decreasing).all()
+
+
+def test_trailing_baselines_forget_old_promotions_and_match_streaming(tmp_path) -> None:
+    discounts = [60, 65, 10, 11, 9, 10, 12, 10, 11, 9, 10, 11, 10, 24]
+    dates = pd.date_range("2024-01-01", periods=len(discounts), freq="D")
+    orders = pd.concat(
+        [
+            _fixture_df().iloc[[0]].assign(order_date=day, discount_percent=float(discount))
+            for day, discount in zip(dates, discounts, strict=True)
+        ],
+        ignore_index=True,
+    )
+
+    assert detect_discount_spikes(orders, z_threshold=3.0).empty
+    for baseline in (SpikeBaseline("rolling", window=7), SpikeBaseline("ewm", halflife=1.0)):
+        alerts = detect_discount_spikes(orders, z_threshold=3.0, baseline=baseline)
+        assert alerts["order_date"].tolist() == [dates[-1]]
+
+        detector = StreamingSpikeDetector(z_threshold=3.0, baseline=baseline)
+        detector.update(orders.iloc[:8])
+        save_spike_detector(detector, tmp_path / "state.json")
+        restored = load_spike_detector(tmp_path / "state.json")
+        streamed = pd.concat([restored.update(orders.iloc[8:]), restored.flush()])
+
+        assert streamed["order_date"].tolist() == [dates[-1]]
+        assert streamed["z_score"].iloc[0] == pytest.approx(alerts["z_score"].iloc[0])
+        assert streamed["baseline_mean"].iloc[0] == pytest.approx(alerts["baseline_mean"].iloc[0])
+        with pytest.raises(ValueError):
+            load_spike_detector(tmp_path / "state.json", baseline=SpikeBaseline())
+    with pytest.raises(ValueError):
+        SpikeBaseline("median")
@@ -1,7 +1,13 @@
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 import pytest
 from fastapi.testclient import TestClient
 
+from amazon_sales_analysis.aggregation import read_only_frame
 from app import api
 
 
@@ -10,12 +16,12 @@ def restore_api_paths():
     original_dataset_path = api.DATASET_PATH
     original_alerts_path = api.ALERTS_PATH
     original_detector = api.detect_discount_spikes
-    api._read_processed_data.cache_clear()
+    api.clear_dataset_caches()
     yield
     api.DATASET_PATH = original_dataset_path
     api.ALERTS_PATH = original_alerts_path
     api.detect_discount_spikes = original_detector
-    api._read_processed_data.cache_clear()
+    api.clear_dataset_caches()
 
 
 def test_revenue_metrics_v1_endpoint(tmp_path) -> None:
@@ -118,3 +124,254 @@ def test_discount_spikes_falls_back_to_runtime_detection(tmp_path, monkeypatch)
     payload = response.json()
     assert len(payload) == 1
     assert payload[0]["product_category"] == "Beauty"
+
+
+def test_simulate_scenario_evaluates_rates_against_cached_leakage(tmp_path) -> None:
+    dataset_path = tmp_path / "amazon_sales_clean.csv"
+    pd.DataFrame(
+        {
+            "order_id": [1, 2, 3],
+            "order_date": ["2024-01-01", "2024-01-02", "2024-01-03"],
+            "product_category": ["Beauty", "Electronics", "Electronics"],
+            "price": [100.0, 200.0, 50.0],
+            "quantity_sold": [1, 1, 2],
+            "total_revenue": [90.0, 160.0, 90.0],
+        }
+    ).to_csv(dataset_path, index=False)
+
+    api.DATASET_PATH = dataset_path
+    client = TestClient(api.app)
+    first = client.post("/scenarios/simulate", json={"recovery_rates": {"Beauty": 0.5}})
+    second = client.post(
+        "/scenarios/simulate",
+        json={"recovery_rates": {"Electronics": 0.25, "Toys": 0.1}, "default_rate": 0.1},
+    )
+    invalid = client.post("/scenarios/simulate", json={"recovery_rates": {"Beauty": 1.5}})
+
+    assert first.status_code == 200
+    assert first.json()["total_uplift"] == 5.0
+    assert first.json()["simulated_revenue"] == 345.0
+    payload = second.json()
+    assert payload["total_uplift"] == 13.5
+    assert payload["unknown_categories"] == ["Toys"]
+    assert api._read_leakage_base.misses == 1
+    assert invalid.status_code == 422
+
+
+def test_dashboard_payloads_are_computed_once_per_dataset_version(tmp_path, monkeypatch) -> None:
+    dataset_path = tmp_path / "amazon_sales_clean.csv"
+    frame = pd.DataFrame(
+        {
+            "order_id": [1, 2],
+            "order_date": ["2024-01-01", "2024-01-02"],
+            "product_category": ["Beauty", "Electronics"],
+            "price": [100.0, 200.0],
+            "quantity_sold": [1, 1],
+            "total_revenue": [90.0, 160.0],
+        }
+    )
+    frame.to_csv(dataset_path, index=False)
+    rankings = []
+
+    def counting_rank(df: pd.DataFrame) -> pd.DataFrame:
+        rankings.append(len(df))
+        return pd.DataFrame({"product_category": ["Beauty"], "discount_value": [10.0]})
+
+    api.DATASET_PATH = dataset_path
+    monkeypatch.setattr(api, "rank_discount_opportunities", counting_rank)
+    client = TestClient(api.app)
+
+    for _ in range(3):
+        assert client.get("/metrics/opportunities").status_code == 200
+        assert client.get("/metrics/summary").json()["total_revenue"] == 250.0
+    frame.assign(total_revenue=[95.0, 1650.0]).to_csv(dataset_path, index=False)
+    stale = client.get("/metrics/summary").json()
+    api.refresher.join()
+    refreshed = client.get("/metrics/summary").json()
+    client.get("/metrics/opportunities")
+
+    assert stale["total_revenue"] == 250.0
+    assert refreshed["total_revenue"] == 1745.0
+    assert rankings == [2, 2]
+    assert api._metrics_summary_payload.misses == 2
+
+
+def test_concurrent_requests_share_the_cached_frame(tmp_path, monkeypatch) -> None:
+    dataset_path = tmp_path / "amazon_sales_clean.csv"
+    rows = 40_000
+    rng = np.random.default_rng(5)
+    pd.DataFrame(
+        {
+            "order_id": np.arange(rows),
+            "order_date": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows) % 90, "D"),
+            "product_category": rng.choice(["Beauty", "Books", "Home"], rows),
+            "price": rng.uniform(10, 200, rows).round(2),
+            "discount_percent": rng.integers(0, 40, rows),
+            "quantity_sold": rng.integers(1, 5, rows),
+            "total_revenue": rng.uniform(10, 500, rows).round(2),
+        }
+    ).to_csv(dataset_path, index=False)
+    alerts = pd.DataFrame({"order_date": ["2024-01-05"], "product_category": ["Beauty"]})
+
+    def fake_detect_discount_spikes(frame: pd.DataFrame) -> pd.DataFrame:
+        frame["price"] = 0.0
+        return alerts
+
+    api.DATASET_PATH = dataset_path
+    api.ALERTS_PATH = tmp_path / "missing_alerts.csv"
+    monkeypatch.setattr(api, "detect_discount_spikes", fake_detect_discount_spikes)
+    client = TestClient(api.app)
+    assert client.get("/alerts/discount-spikes").status_code == 200
+    version = api.refresher.version()
+    cached = api._read_processed_data(*version)
+    frame_bytes = int(cached.memory_usage(deep=True).sum())
+
+    tracemalloc.start()
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(
+                executor.map(lambda _: client.get("/alerts/discount-spikes"), range(16))
+            )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert all(response.status_code == 200 for response in responses)
+    assert responses[-1].json()[0]["order_date"] == "2024-01-05"
+    # Only the mutated column may be materialized per request, never whole frame copies.
+    assert peak < frame_bytes / 2
+    assert float(cached["price"].min()) > 0
+    assert alerts["order_date"].iloc[0] == "2024-01-05"
+    shared = api._load_processed_data(version)
+    assert np.shares_memory(shared["quantity_sold"].to_numpy(), cached["quantity_sold"].to_numpy())
+
+
+def test_cached_frame_rejects_in_place_writes() -> None:
+    frame = pd.DataFrame({"price": [10.0, 20.0], "product_category": ["Beauty", "Home"]})
+    frozen = read_only_frame(frame)
+
+    with pytest.raises(ValueError, match="read-only"):
+        frozen.loc[0, "price"] = 0.0
+    shared = frozen.copy(deep=False)
+    shared.loc[0, "price"] = 0.0
+    shared["extra"] = 1
+
+    assert frozen["price"].tolist() == [10.0, 20.0]
+    assert list(frozen.columns) == ["price", "product_category"]
+    assert np.shares_memory(frozen["price"].to_numpy(), frame["price"].to_numpy())
+
+
+def test_changed_dataset_is_rebuilt_once_while_previous_version_is_served(
+    tmp_path, monkeypatch
+) -> None:
+    dataset_path = tmp_path / "amazon_sales_clean.csv"
+    frame = pd.DataFrame(
+        {
+            "order_id": [1, 2],
+            "order_date": ["2024-01-01", "2024-01-02"],
+            "product_category": ["Beauty", "Electronics"],
+            "price": [100.0, 200.0],
+            "quantity_sold": [1, 1],
+            "total_revenue": [90.0, 160.0],
+        }
+    )
+    frame.to_csv(dataset_path, index=False)
+    loads = []
+    release = threading.Event()
+    original_load = api.load_processed_dataset
+
+    def gated_load(path):
+        loads.append(path)
+        if len(loads) > 1:
+            release.wait(timeout=10)
+        return original_load(path)
+
+    api.DATASET_PATH = dataset_path
+    monkeypatch.setattr(api, "load_processed_dataset", gated_load)
+    client = TestClient(api.app)
+    first = client.get("/metrics/summary")
+    old_version = first.headers[api.DATA_VERSION_HEADER]
+
+    frame.assign(total_revenue=[95.0, 1650.0]).to_csv(dataset_path, index=False)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda _: client.get("/metrics/summary"), range(12)))
+    release.set()
+    api.refresher.join(timeout=10)
+    misses = [cache.misses for cache in api.DATASET_CACHES]
+    refreshed = client.get("/metrics/summary")
+    client.get("/metrics/opportunities")
+
+    assert {response.headers[api.DATA_VERSION_HEADER] for response in responses} == {old_version}
+    assert {response.json()["total_revenue"] for response in responses} == {250.0}
+    assert len(loads) == 2
+    assert refreshed.json()["total_revenue"] == 1745.0
+    assert refreshed.headers[api.DATA_VERSION_HEADER] != old_version
+    assert [cache.misses for cache in api.DATASET_CACHES] == misses
+    # The superseded version is released as soon as the new one is swapped in.
+    assert [len(cache) for cache in api.DATASET_CACHES] == [1] * len(api.DATASET_CACHES)
+
+
+def test_lifespan_preloads_data_before_readiness(tmp_path) -> None:
+    dataset_path = tmp_path / "amazon_sales_clean.csv"
+    pd.DataFrame(
+        {
+            "order_id": [1, 2],
+            "order_date": ["2024-01-01", "2024-01-02"],
+            "product_category": ["Beauty", "Electronics"],
+            "price": [100.0, 200.0],
+            "discount_percent": [10.0, 20.0],
+            "quantity_sold": [1, 1],
+            "total_revenue": [90.0, 160.0],
+        }
+    ).to_csv(dataset_path, index=False)
+
+    api.DATASET_PATH = tmp_path / "missing.csv"
+    with TestClient(api.app) as client:
+        api.warmup.join(timeout=10)
+        assert client.get("/health").json() == {"status": "ok", "data": "failed"}
+        assert client.get("/health/ready").status_code == 503
+
+    api.DATASET_PATH = dataset_path
+    with TestClient(api.app) as client:
+        api.warmup.join(timeout=10)
+        ready = client.get("/health/ready")
+        summary_misses = api._metrics_summary_payload.misses
+        summary = client.get("/metrics/summary")
+
+        assert client.get("/health").json()["data"] == "warm"
+        assert ready.status_code == 200
+        assert ready.json()["data_version"] == summary.headers[api.DATA_VERSION_HEADER]
+        assert summary_misses == 1
+        assert api._metrics_summary_payload.misses == 1
+        assert len(api._opportunities_payload) == 1
+
+
+def test_readiness_probe_retries_a_failed_warmup(tmp_path, monkeypatch) -> None:
+    dataset_path = tmp_path / "amazon_sales_clean.csv"
+    api.DATASET_PATH = dataset_path
+    with TestClient(api.app) as client:
+        api.warmup.join(timeout=10)
+        assert client.get("/health").json()["data"] == "failed"
+
+        pd.DataFrame(
+            {
+                "order_id": [1, 2],
+                "order_date": ["2024-01-01", "2024-01-02"],
+                "product_category": ["Beauty", "Electronics"],
+                "price": [100.0, 200.0],
+                "discount_percent": [10.0, 20.0],
+                "quantity_sold": [1, 1],
+                "total_revenue": [90.0, 160.0],
+            }
+        ).to_csv(dataset_path, index=False)
+        # Within the back-off window the probe does not restart the warm-up.
+        assert client.get("/health/ready").status_code == 503
+        assert client.get("/health").json()["data"] == "failed"
+
+        monkeypatch.setattr(api.warmup, "retry_interval", 0.0)
+        assert client.get("/health/ready").status_code == 503
+        api.warmup.join(timeout=10)
+        ready = client.get("/health/ready")
+
+    assert ready.status_code == 200
+    assert client.get("/health").json()["data"] == "warm"
@@ -0,0 +1,101 @@
+import pandas as pd
+import pytest
+
+from amazon_sales_analysis.cube import (
+    build_sales_cube,
+    load_sales_cube,
+    merge_sales_cubes,
+    write_sales_cube,
+)
+from amazon_sales_analysis.modeling import rank_discount_opportunities
+from amazon_sales_analysis.sales_analysis import (
+    analyze_category_performance,
+    analyze_growth_trends,
+    analyze_performance_distribution,
+    analyze_product_contribution,
+    compute_kpi_summary,
+    prepare_sales_frame,
+)
+from amazon_sales_analysis.scenario_simulator import simulate_leakage_recovery
+
+
+def _fixture_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "order_id": [1, 2, 3, 4, 5, 6],
+            "order_date": [
+                "2024-01-15",
+                "2024-01-15",
+                "2024-02-18",
+                "2024-03-03",
+                "2024-03-03",
+                "2024-03-20",
+            ],
+            "product_id": [10, 10, 10, 12, 12, 11],
+            "product_category": [
+                "Electronics",
+                "Electronics",
+                "Electronics",
+                "Beauty",
+                "Beauty",
+                "Home",
+            ],
+            "price": [100.0, 100.0, 80.0, 50.0, 50.0, 120.0],
+            "discount_percent": [10, 20, 5, 0, 30, 15],
+            "quantity_sold": [2, 1, 3, 4, 1, 2],
+            "customer_region": ["North", "North", "North", "East", "East", "South"],
+            "payment_method": ["Card", "Card", "Pix", "Cash", "Cash", "Card"],
+            "rating": [4.8, 4.1, 4.6, 4.9, 3.5, 4.0],
+            "review_count": [50, 20, 15, 12, 9, 30],
+            "discounted_price": [90.0, 80.0, 76.0, 50.0, 35.0, 102.0],
+            "total_revenue": [180.0, 80.0, 228.0, 200.0, 35.0, 204.0],
+        }
+    )
+
+
+def test_cube_answers_match_row_level_reports(tmp_path):
+    prepared = prepare_sales_frame(_fixture_df())
+    cube_path = write_sales_cube(build_sales_cube(prepared), tmp_path / "sales_cube.parquet")
+    cube = load_sales_cube(cube_path)
+
+    assert len(cube) == 4
+    pd.testing.assert_frame_equal(compute_kpi_summary(cube), compute_kpi_summary(prepared))
+    pd.testing.assert_frame_equal(
+        analyze_category_performance(cube), analyze_category_performance(prepared)
+    )
+    pd.testing.assert_frame_equal(
+        analyze_product_contribution(cube), analyze_product_contribution(prepared)
+    )
+    pd.testing.assert_frame_equal(analyze_growth_trends(cube), analyze_growth_trends(prepared))
+    pd.testing.assert_frame_equal(
+        rank_discount_opportunities(cube), rank_discount_opportunities(prepared)
+    )
+    rates = {"Electronics": 0.2, "Beauty": 0.5}
+    pd.testing.assert_frame_equal(
+        simulate_leakage_recovery(cube, rates)["category_breakdown"],
+        simulate_leakage_recovery(prepared, rates)["category_breakdown"],
+    )
+
+
+def test_cube_keeps_rows_with_missing_dimensions(tmp_path):
+    df = _fixture_df()
+    df.loc[[0, 3], "customer_region"] = None
+    df.loc[[1, 3, 5], "payment_method"] = None
+    prepared = prepare_sales_frame(df)
+    cube_path = write_sales_cube(
+        merge_sales_cubes(build_sales_cube(prepared.iloc[:3]), build_sales_cube(prepared.iloc[3:])),
+        tmp_path / "sales_cube.parquet",
+    )
+    cube = load_sales_cube(cube_path)
+
+    pd.testing.assert_frame_equal(compute_kpi_summary(cube), compute_kpi_summary(prepared))
+    pd.testing.assert_frame_equal(
+        analyze_category_performance(cube), analyze_category_performance(prepared)
+    )
+
+
+def test_cube_rejects_order_level_reports():
+    cube = build_sales_cube(_fixture_df())
+
+    with pytest.raises(ValueError, match="Dimensao indisponivel no cubo"):
+        analyze_performance_distribution(cube)
@@ -3,9 +3,12 @@ import pytest
 
 from amazon_sales_analysis.data_preprocessing import (
     clean_sales_data,
+    estimate_chunk_size,
     read_sales_dataset,
+    stream_clean_sales_data,
     validate_raw_sales_data,
 )
+from amazon_sales_analysis.processed_store import load_processed_dataset
 
 
 def _base_df() -> pd.DataFrame:
@@ -61,3 +64,40 @@ def test_read_sales_dataset_raises_clear_error_for_missing_file(tmp_path) -> Non
 
     with pytest.raises(FileNotFoundError, match="Arquivo de vendas nao encontrado"):
         read_sales_dataset(missing_path)
+
+
+def test_stream_clean_sales_data_matches_in_memory_cleaning(tmp_path) -> None:
+    raw = pd.concat([_base_df()] * 5, ignore_index=True)
+    raw["order_id"] = range(1, len(raw) + 1)
+    raw.loc[1, "quantity_sold"] = 0
+    raw.loc[3, "discount_percent"] = 150
+    raw_path = tmp_path / "raw.csv"
+    raw.to_csv(raw_path, index=False)
+
+    result = stream_clean_sales_data(
+        raw_path,
+        tmp_path / "clean.parquet",
+        chunksize=2,
+        csv_output_path=tmp_path / "clean.csv",
+    )
+
+    expected = clean_sales_data(read_sales_dataset(raw_path))
+    streamed = load_processed_dataset(result.output_path).sort_values("order_id")
+    exported = read_sales_dataset(tmp_path / "clean.csv")
+    assert result.chunk_count == 3
+    assert result.raw_row_count == 5
+    assert result.clean_row_count == len(expected) == 4
+    assert streamed["total_revenue"].tolist() == expected["total_revenue"].tolist()
+    assert exported["total_revenue"].tolist() == expected["total_revenue"].tolist()
+    assert not (tmp_path / "clean.csv.partial").exists()
+    assert not (tmp_path / "clean.parquet.staging").exists()
+
+
+def test_estimate_chunk_size_scales_with_memory_budget(tmp_path) -> None:
+    raw_path = tmp_path / "raw.csv"
+    pd.concat([_base_df()] * 100, ignore_index=True).to_csv(raw_path, index=False)
+
+    small = estimate_chunk_size(raw_path, memory_budget_mb=1)
+    large = estimate_chunk_size(raw_path, memory_budget_mb=64)
+
+    assert 0 < small < large
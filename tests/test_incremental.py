@@ -0,0 +1,113 @@
+import logging
+
+import pandas as pd
+
+from amazon_sales_analysis import anomaly_detection, cube, incremental
+from amazon_sales_analysis.cli import pipeline as pipeline_cli
+from amazon_sales_analysis.incremental import (
+    build_incremental_state,
+    load_incremental_state,
+    save_incremental_state,
+)
+from amazon_sales_analysis.sales_analysis import (
+    analyze_category_performance,
+    analyze_growth_trends,
+    compute_kpi_summary,
+    prepare_sales_frame,
+)
+
+
+def _fixture_df() -> pd.DataFrame:
+    dates = pd.date_range("2024-01-01", periods=12, freq="5D")
+    return pd.DataFrame(
+        {
+            "order_id": range(1, 13),
+            "order_date": dates.strftime("%Y-%m-%d"),
+            "product_id": [10, 11, 12, 10, 11, 12, 10, 11, 12, 10, 11, 12],
+            "product_category": ["Electronics", "Home", "Beauty"] * 4,
+            "price": [100.0, 120.0, 80.0, 50.0, 90.0, 30.0, 100.0, 120.0, 80.0, 50.0, 90.0, 30.0],
+            "discount_percent": [
+                10.0,
+                20.0,
+                5.0,
+                0.0,
+                15.0,
+                40.0,
+                10.0,
+                25.0,
+                5.0,
+                0.0,
+                15.0,
+                60.0,
+            ],
+            "quantity_sold": [2, 1, 3, 4, 1, 2, 2, 1, 3, 4, 1, 2],
+            "customer_region": ["North", "South", "East", "West"] * 3,
+            "payment_method": ["Card", "Pix", "Cash"] * 4,
+            "rating": [4.8, 4.1, 4.6, 4.9, 3.9, 4.2, 4.8, 4.1, 4.6, 4.9, 3.9, 4.2],
+            "review_count": [50, 20, 15, 12, 8, 30, 50, 20, 15, 12, 8, 30],
+            "discounted_price": [0.0] * 12,
+            "total_revenue": [0.0] * 12,
+        }
+    )
+
+
+def _clean(frame: pd.DataFrame) -> pd.DataFrame:
+    cleaned = frame.copy()
+    cleaned["order_date"] = pd.to_datetime(cleaned["order_date"])
+    cleaned["discounted_price"] = cleaned["price"] * (1 - cleaned["discount_percent"] / 100)
+    cleaned["total_revenue"] = cleaned["discounted_price"] * cleaned["quantity_sold"]
+    return cleaned
+
+
+def test_incremental_state_matches_full_recompute(tmp_path) -> None:
+    full = _clean(_fixture_df())
+    state = build_incremental_state(full.iloc[:7])
+    save_incremental_state(state, tmp_path / "state")
+    restored = load_incremental_state(tmp_path / "state")
+
+    fresh = restored.select_new_rows(_fixture_df())
+    state = restored.fold(_clean(fresh))
+
+    prepared = prepare_sales_frame(full)
+    assert len(fresh) == 5
+    assert state.watermark_order_id == 12
+    pd.testing.assert_frame_equal(state.kpi_summary(), compute_kpi_summary(prepared))
+    pd.testing.assert_frame_equal(
+        state.category_performance(), analyze_category_performance(prepared)
+    )
+    pd.testing.assert_frame_equal(
+        state.growth_trends().reset_index(drop=True),
+        analyze_growth_trends(prepared).reset_index(drop=True),
+    )
+    pd.testing.assert_frame_equal(
+        state.discount_spikes(z_threshold=1.0, min_observations=2).reset_index(drop=True),
+        anomaly_detection.detect_discount_spikes(
+            prepared, z_threshold=1.0, min_observations=2
+        ).reset_index(drop=True),
+    )
+
+
+def test_pipeline_incremental_run_only_appends_new_orders(tmp_path, monkeypatch) -> None:
+    raw_path = tmp_path / "raw.csv"
+    store_path = tmp_path / "processed" / "amazon_sales_clean.parquet"
+    tables_dir = tmp_path / "tables"
+    monkeypatch.setattr(pipeline_cli, "raw_sales_data_path", lambda: raw_path)
+    monkeypatch.setattr(pipeline_cli, "PROCESSED_STORE_PATH", store_path)
+    monkeypatch.setattr(pipeline_cli, "TABLES_DIR", tables_dir)
+    monkeypatch.setattr(anomaly_detection, "TABLES_DIR", tables_dir)
+    monkeypatch.setattr(incremental, "INCREMENTAL_STATE_DIR", tmp_path / "state")
+    monkeypatch.setattr(cube, "SALES_CUBE_PATH", tmp_path / "processed" / "sales_cube.parquet")
+    logger = logging.getLogger("test-incremental")
+
+    _fixture_df().iloc[:8].to_csv(raw_path, index=False)
+    pipeline_cli.run_incremental(logger, chunk_size=3)
+    _fixture_df().to_csv(raw_path, index=False)
+    pipeline_cli.run_incremental(logger, chunk_size=3)
+
+    store = pd.read_parquet(store_path)
+    kpis = pd.read_csv(tables_dir / "kpi_summary.csv")
+    expected = compute_kpi_summary(prepare_sales_frame(_clean(_fixture_df())))
+    assert sorted(store["order_id"].tolist()) == list(range(1, 13))
+    assert load_incremental_state().clean_row_count == 12
+    pd.testing.assert_series_equal(kpis["value"], expected["value"])
+    pd.testing.assert_frame_equal(compute_kpi_summary(cube.load_sales_cube()), expected)
@@ -12,6 +12,7 @@ from amazon_sales_analysis.cli import pipeline as pipeline_cli
 from amazon_sales_analysis.cli import scenario as scenario_cli
 from amazon_sales_analysis.data_ingestion import download_amazon_sales_dataset
 from amazon_sales_analysis.logging_config import configure_logging
+from amazon_sales_analysis.processed_store import load_processed_dataset
 
 
 def test_download_dataset_copies_files_from_kagglehub(tmp_path, monkeypatch) -> None:
@@ -83,6 +84,37 @@ def test_scenario_cli_rejects_invalid_override_format() -> None:
         scenario_cli.parse_category_rates("Beauty:0.1")
 
 
+def test_scenario_cli_parses_rate_distributions() -> None:
+    distributions = scenario_cli.parse_category_distributions(
+        "Beauty=beta:2:18, Books=triangular:0:0.05:0.1"
+    )
+
+    assert distributions["Beauty"].parameters == (2.0, 18.0)
+    assert distributions["Books"].kind == "triangular"
+    with pytest.raises(ValueError, match="Books"):
+        scenario_cli.parse_category_distributions("Books=normal:0.05:0.01")
+
+
+def test_scenario_cli_modes_are_mutually_exclusive(tmp_path) -> None:
+    parser = scenario_cli.build_parser()
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--monte-carlo", "--optimize-budget", "0.5"])
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--scenarios-file", "grid.csv", "--monte-carlo"])
+
+    input_path = tmp_path / "clean.csv"
+    input_path.write_text("order_id\n1\n", encoding="utf-8")
+    with pytest.raises(SystemExit, match="Choose only one"):
+        scenario_cli.run(
+            input_path=input_path,
+            output_dir=tmp_path,
+            recovery_rate=0.05,
+            category_rates="",
+            monte_carlo=True,
+            optimize_budget=0.5,
+        )
+
+
 def test_scenario_cli_run_generates_artifacts(tmp_path) -> None:
     input_path = tmp_path / "clean.csv"
     output_dir = tmp_path / "reports"
@@ -116,6 +148,38 @@ def test_scenario_cli_run_generates_artifacts(tmp_path) -> None:
     assert (output_dir / "scenario_simulation_summary.json").exists()
 
 
+def test_scenario_cli_evaluates_scenarios_file(tmp_path) -> None:
+    input_path = tmp_path / "clean.csv"
+    scenarios_path = tmp_path / "scenarios.json"
+    output_dir = tmp_path / "reports"
+    pd.DataFrame(
+        {
+            "order_date": ["2024-01-01", "2024-01-02"],
+            "product_category": ["Beauty", "Books"],
+            "price": [100.0, 200.0],
+            "quantity_sold": [1, 1],
+            "total_revenue": [90.0, 160.0],
+        }
+    ).to_csv(input_path, index=False)
+    scenarios_path.write_text(
+        json.dumps({"flat": {}, "beauty_push": {"Beauty": 0.5, "Books": 0.1}}), encoding="utf-8"
+    )
+
+    scenario_cli.run(
+        input_path=input_path,
+        output_dir=output_dir,
+        recovery_rate=0.05,
+        category_rates="",
+        scenarios_file=scenarios_path,
+    )
+
+    results = pd.read_csv(output_dir / "scenario_grid_results.csv")
+    summary = json.loads((output_dir / "scenario_grid_summary.json").read_text(encoding="utf-8"))
+    assert results["scenario"].tolist() == ["flat", "beauty_push"]
+    assert results["total_uplift"].tolist() == pytest.approx([2.5, 9.0])
+    assert summary["best_scenario"] == "beauty_push"
+
+
 def test_alerts_cli_run_rejects_invalid_parameters(tmp_path) -> None:
     with pytest.raises(SystemExit):
         alerts_cli.run(
@@ -154,7 +218,7 @@ def test_alerts_cli_run_generates_csv_and_summary(tmp_path, monkeypatch) -> None
     )
     frame.to_csv(input_path, index=False)
 
-    def fake_export_discount_spike_alerts(detected: pd.DataFrame):
+    def fake_export_discount_spike_alerts(detected: pd.DataFrame, output_path):
         exported_csv.parent.mkdir(parents=True, exist_ok=True)
         detected.to_csv(exported_csv, index=False)
         return exported_csv
@@ -176,6 +240,93 @@ def test_alerts_cli_run_generates_csv_and_summary(tmp_path, monkeypatch) -> None
     assert payload["severity_counts"] == {"high": 1}
 
 
+def test_alerts_cli_incremental_run_scores_only_new_days(tmp_path, monkeypatch) -> None:
+    input_path = tmp_path / "clean.csv"
+    summary_output = tmp_path / "metrics" / "alerts_summary.json"
+    history_output = tmp_path / "tables" / "alert_history"
+    dates = pd.date_range("2024-01-01", periods=8, freq="D")
+    frame = pd.DataFrame(
+        {
+            "order_date": dates,
+            "product_category": ["Beauty"] * 8,
+            "discount_percent": [10.0, 11.0, 9.0, 10.0, 10.0, 11.0, 10.0, 45.0],
+            "price": [100.0] * 8,
+            "quantity_sold": [2] * 8,
+        }
+    )
+    alerts_output = tmp_path / "tables" / "discount_spike_alerts.csv"
+
+    def run_alerts() -> dict[str, object]:
+        alerts_cli.run(
+            input_path=input_path,
+            z_threshold=2.0,
+            min_observations=5,
+            summary_output=summary_output,
+            incremental=True,
+            history_output=history_output,
+            alerts_output=alerts_output,
+        )
+        return json.loads(summary_output.read_text(encoding="utf-8"))
+
+    frame.iloc[:7].to_csv(input_path, index=False)
+    first = run_alerts()
+    frame.to_csv(input_path, index=False)
+    second = run_alerts()
+    third = run_alerts()
+
+    assert first["alerts_count"] == 0
+    assert first["last_scored_date"] == "2024-01-07"
+    assert (summary_output.parent / alerts_cli.ALERT_STATE_FILENAME).exists()
+    assert second["resumed_from"] == "2024-01-07"
+    assert second["rows_scored"] == 2
+    assert second["alerts_count"] == 1
+    assert second["severity_counts"] == {"critical": 1}
+    history = load_processed_dataset(history_output)
+    assert history["order_date"].tolist() == [pd.Timestamp("2024-01-08")]
+    assert third["alerts_count"] == 0
+    assert third["alerts_exported"] == 1
+    exported = pd.read_csv(alerts_output)
+    assert exported["order_date"].tolist() == ["2024-01-08"]
+    assert exported["severity"].tolist() == ["critical"]
+
+
+def test_alerts_cli_incremental_run_reuses_the_persisted_baseline(tmp_path) -> None:
+    input_path = tmp_path / "clean.csv"
+    summary_output = tmp_path / "metrics" / "alerts_summary.json"
+    pd.DataFrame(
+        {
+            "order_date": pd.date_range("2024-01-01", periods=6, freq="D"),
+            "product_category": ["Beauty"] * 6,
+            "discount_percent": [10.0, 11.0, 9.0, 10.0, 10.0, 11.0],
+            "price": [100.0] * 6,
+            "quantity_sold": [2] * 6,
+        }
+    ).to_csv(input_path, index=False)
+    parser = alerts_cli.build_parser()
+
+    def run_alerts(*flags: str) -> dict[str, object]:
+        alerts_cli.run(
+            input_path=input_path,
+            z_threshold=2.0,
+            min_observations=3,
+            summary_output=summary_output,
+            incremental=True,
+            history_output=tmp_path / "alert_history",
+            alerts_output=tmp_path / "alerts.csv",
+            baseline=alerts_cli.baseline_from_args(parser.parse_args(list(flags))),
+        )
+        return json.loads(summary_output.read_text(encoding="utf-8"))
+
+    run_alerts("--baseline", "rolling", "--baseline-window", "3")
+    resumed = run_alerts()
+
+    assert alerts_cli.baseline_from_args(parser.parse_args([])) is None
+    assert resumed["parameters"]["baseline"]["method"] == "rolling"
+    assert resumed["parameters"]["baseline"]["window"] == 3
+    with pytest.raises(SystemExit, match="Incompatible alert state"):
+        run_alerts("--baseline", "ewm")
+
+
 def test_pipeline_cli_main_orchestrates_pipeline_outputs(tmp_path, monkeypatch) -> None:
     raw_df = pd.DataFrame({"order_id": [1], "price": [100.0]})
     clean_df = pd.DataFrame({"order_id": [1], "price": [100.0]})
@@ -190,7 +341,7 @@ def test_pipeline_cli_main_orchestrates_pipeline_outputs(tmp_path, monkeypatch)
 
     contract_path = tmp_path / "contracts" / "snapshot.json"
     metrics_path = tmp_path / "metrics" / "product_metrics.json"
-    processed_path = tmp_path / "processed" / "amazon_sales_clean.csv"
+    processed_path = tmp_path / "processed" / "amazon_sales_clean.parquet"
     alerts_path = tmp_path / "tables" / "discount_spike_alerts.csv"
     tables_dir = tmp_path / "tables"
     logged_messages: list[str] = []
@@ -210,21 +361,34 @@ def test_pipeline_cli_main_orchestrates_pipeline_outputs(tmp_path, monkeypatch)
     monkeypatch.setattr(pipeline_cli, "export_contract_snapshot", lambda contract_version: contract_path)
     monkeypatch.setattr(pipeline_cli, "clean_sales_data", lambda frame: clean_df)
     monkeypatch.setattr(pipeline_cli, "enforce_clean_quality_gates", lambda frame: None)
-    monkeypatch.setattr(pipeline_cli, "save_processed_data", lambda frame: processed_path)
+    monkeypatch.setattr(pipeline_cli, "write_processed_store", lambda frame: processed_path)
+    monkeypatch.setattr(
+        pipeline_cli,
+        "build_incremental_state",
+        lambda frame, raw_row_count: types.SimpleNamespace(tables={"cube": frame}),
+    )
+    monkeypatch.setattr(pipeline_cli, "save_incremental_state", lambda state: tmp_path / "state")
+    monkeypatch.setattr(pipeline_cli, "write_sales_cube", lambda cube: tmp_path / "cube.parquet")
     monkeypatch.setattr(pipeline_cli, "prepare_sales_frame", lambda frame: featured_df)
-    monkeypatch.setattr(pipeline_cli, "generate_executive_insights", lambda frame: insights)
+    monkeypatch.setattr(
+        pipeline_cli, "generate_executive_insights", lambda frame, distinct_error: insights
+    )
     monkeypatch.setattr(
         pipeline_cli,
         "build_executive_report",
-        lambda frame, report_insights: types.SimpleNamespace(insights=report_insights),
+        lambda frame, report_insights, distinct_error: types.SimpleNamespace(
+            insights=report_insights
+        ),
     )
     monkeypatch.setattr(pipeline_cli, "build_storytelling_visuals", lambda frame: None)
     monkeypatch.setattr(pipeline_cli, "build_actionable_recommendations", lambda frame: recommendations)
-    monkeypatch.setattr(pipeline_cli, "build_executive_tables", lambda frame: organized_tables)
+    monkeypatch.setattr(
+        pipeline_cli, "build_executive_tables", lambda frame, report: organized_tables
+    )
     monkeypatch.setattr(
         pipeline_cli,
         "collect_product_metrics",
-        lambda raw_df, clean_df, featured_df, contract_version, pipeline_version: {
+        lambda raw_df, clean_df, featured_df, contract_version, pipeline_version, raw_row_count: {
             "contract_version": contract_version,
             "pipeline_version": pipeline_version,
         },
@@ -234,10 +398,26 @@ def test_pipeline_cli_main_orchestrates_pipeline_outputs(tmp_path, monkeypatch)
     monkeypatch.setattr(pipeline_cli, "export_discount_spike_alerts", lambda frame: alerts_path)
     monkeypatch.setattr(pipeline_cli, "TABLES_DIR", tables_dir)
 
-    pipeline_cli.main()
+    pipeline_cli.main([])
 
     assert (tables_dir / "actionable_recommendations.csv").exists()
     assert (tables_dir / "executive_insights.csv").exists()
     assert (tables_dir / "category_performance.csv").exists()
     assert (tables_dir / "product_contribution.csv").exists()
     assert any("Pipeline completed successfully" in message for message in logged_messages)
+
+
+def test_pipeline_cli_memory_budget_implies_streaming_chunks(monkeypatch) -> None:
+    monkeypatch.setattr(pipeline_cli, "raw_sales_data_path", lambda: "raw.csv")
+    monkeypatch.setattr(pipeline_cli, "estimate_chunk_size", lambda path, budget: int(budget * 10))
+
+    args = pipeline_cli.build_parser().parse_args(["--memory-budget-mb", "64"])
+
+    assert pipeline_cli._resolve_chunk_size(args) == 640
+    streaming_args = pipeline_cli.build_parser().parse_args(["--streaming", "--chunk-size", "50"])
+    assert pipeline_cli._resolve_chunk_size(streaming_args) == 50
+
+
+def test_pipeline_cli_rejects_csv_export_in_incremental_mode() -> None:
+    with pytest.raises(SystemExit, match="--export-csv"):
+        pipeline_cli.main(["--incremental", "--export-csv"])
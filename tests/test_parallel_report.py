@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from amazon_sales_analysis.parallel_report import (
+    build_parallel_executive_report,
+    shard_sales_frame,
+)
+from amazon_sales_analysis.sales_analysis import build_executive_report, prepare_sales_frame
+
+
+def _fixture_df() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    rows = 600
+    order_ids = rng.integers(1, 250, rows)
+    return pd.DataFrame(
+        {
+            "order_id": order_ids,
+            "order_date": pd.Timestamp("2024-01-01") + pd.to_timedelta(order_ids % 120, unit="D"),
+            "product_id": rng.integers(1, 40, rows),
+            "product_category": rng.choice(["Beauty", "Electronics", "Home"], rows),
+            "price": rng.uniform(10, 200, rows).round(2),
+            "discount_percent": rng.integers(0, 40, rows),
+            "quantity_sold": rng.integers(1, 5, rows),
+            "rating": rng.uniform(3, 5, rows).round(1),
+            "total_revenue": rng.uniform(10, 500, rows).round(2),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    ("workers", "shard_by", "shard_rows"),
+    [(1, "order", None), (2, "order", 100), (2, "month", None), (2, "month", 250)],
+)
+def test_parallel_report_matches_sequential_report(workers, shard_by, shard_rows):
+    df = prepare_sales_frame(_fixture_df())
+    insights = pd.DataFrame({"headline": ["baseline"]})
+
+    expected = build_executive_report(df, insights)
+    report = build_parallel_executive_report(
+        df, insights, workers=workers, shard_by=shard_by, shard_rows=shard_rows
+    )
+
+    for section in (
+        "kpi_summary",
+        "category_performance",
+        "product_contribution",
+        "growth_trends",
+        "performance_distribution",
+        "kpi_catalog",
+    ):
+        pd.testing.assert_frame_equal(getattr(report, section), getattr(expected, section))
+    assert report.insights is insights
+
+
+def test_shards_keep_each_order_in_one_shard():
+    df = prepare_sales_frame(_fixture_df())
+
+    by_order = shard_sales_frame(df, shard_by="order", shard_rows=100)
+    by_month = shard_sales_frame(df, shard_by="month", shard_rows=250)
+
+    for shards in (by_order, by_month):
+        assert sum(len(shard) for shard in shards) == len(df)
+        owners = pd.concat(
+            [shard[["order_id"]].assign(shard=index) for index, shard in enumerate(shards)]
+        )
+        assert owners.groupby("order_id")["shard"].nunique().max() == 1
+    assert len(by_order) == 6
+    assert all(shard["month_start"].nunique() <= 2 for shard in by_month)
+    with pytest.raises(ValueError):
+        shard_sales_frame(df, shard_by="region")
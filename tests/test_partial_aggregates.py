@@ -0,0 +1,72 @@
+import pandas as pd
+
+from amazon_sales_analysis.partial_aggregates import SalesPartial, combine_partials
+from amazon_sales_analysis.sales_analysis import (
+    analyze_category_performance,
+    analyze_growth_trends,
+    compute_kpi_summary,
+    prepare_sales_frame,
+)
+
+
+def _fixture_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "order_id": [1, 1, 2, 3, 3, 4, 5, 6],
+            "order_date": [
+                "2024-01-15",
+                "2024-01-15",
+                "2024-02-10",
+                "2024-02-18",
+                "2024-02-18",
+                "2024-03-03",
+                "2024-03-09",
+                "2024-03-21",
+            ],
+            "product_id": [10, 11, 11, 10, 12, 12, 10, 11],
+            "product_category": [
+                "Electronics",
+                "Home",
+                "Home",
+                "Electronics",
+                "Beauty",
+                "Beauty",
+                "Electronics",
+                "Home",
+            ],
+            "price": [100.0, 120.0, 80.0, 50.0, 40.0, 50.0, 90.0, 60.0],
+            "discount_percent": [10, 20, 5, 0, 30, 0, 15, 25],
+            "quantity_sold": [2, 1, 3, 4, 1, 2, 1, 3],
+            "rating": [4.8, 4.1, 4.6, 4.9, 3.8, 4.2, 4.4, 3.9],
+            "total_revenue": [180.0, 96.0, 228.0, 200.0, 28.0, 100.0, 76.5, 135.0],
+        }
+    )
+
+
+def test_partials_merge_associatively_into_full_tables():
+    frame = _fixture_df()
+    partials = [SalesPartial.from_frame(frame.iloc[i : i + 3]) for i in range(0, 8, 3)]
+    left = partials[0].merge(partials[1]).merge(partials[2])
+    right = partials[0].merge(partials[1].merge(partials[2]))
+
+    prepared = prepare_sales_frame(frame)
+    for merged in (left, right, combine_partials(partials)):
+        assert merged.row_count == 8
+        assert merged.min_order_date == pd.Timestamp("2024-01-15")
+        assert merged.max_order_date == pd.Timestamp("2024-03-21")
+        pd.testing.assert_frame_equal(merged.kpi_summary(), compute_kpi_summary(prepared))
+        pd.testing.assert_frame_equal(
+            merged.category_performance(), analyze_category_performance(prepared)
+        )
+        pd.testing.assert_frame_equal(
+            merged.growth_trends().reset_index(drop=True),
+            analyze_growth_trends(prepared).reset_index(drop=True),
+        )
+
+
+def test_orders_split_across_partials_are_counted_once():
+    frame = _fixture_df()
+    merged = SalesPartial.from_frame(frame.iloc[:1]).merge(SalesPartial.from_frame(frame.iloc[1:2]))
+
+    assert merged.kpi_totals()["total_orders"] == 1.0
+    assert combine_partials([]).kpi_totals()["total_orders"] == 0.0
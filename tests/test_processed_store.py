@@ -0,0 +1,71 @@
+import pandas as pd
+
+from amazon_sales_analysis.processed_store import (
+    STORE_VERSION_FILENAME,
+    append_processed_partition,
+    dataset_fingerprint,
+    dataset_version,
+    load_processed_dataset,
+    write_processed_store,
+    write_store_version,
+)
+
+
+def _fixture_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "order_id": [1, 2, 3],
+            "order_date": pd.to_datetime(["2024-01-15", "2024-02-10", "2024-02-18"]),
+            "product_id": [10, 11, 12],
+            "product_category": ["Electronics", "Home/Kitchen", "Electronics"],
+            "price": [100.0, 120.0, 80.0],
+            "discount_percent": [10.0, 20.0, 5.0],
+            "quantity_sold": [2, 1, 3],
+            "total_revenue": [180.0, 96.0, 228.0],
+        }
+    )
+
+
+def test_processed_store_is_partitioned_by_month_and_category(tmp_path) -> None:
+    store = write_processed_store(_fixture_df(), tmp_path / "clean.parquet")
+
+    partitions = sorted(path.name for path in store.iterdir() if path.is_dir())
+    assert partitions == ["month_start=2024-01-01", "month_start=2024-02-01"]
+
+    frame = load_processed_dataset(store).sort_values("order_id").reset_index(drop=True)
+    assert frame["product_category"].tolist() == ["Electronics", "Home/Kitchen", "Electronics"]
+    assert pd.api.types.is_datetime64_any_dtype(frame["order_date"])
+    assert frame["month_start"].dt.month.tolist() == [1, 2, 2]
+
+
+def test_load_processed_dataset_prunes_columns_for_store_and_csv(tmp_path) -> None:
+    store = write_processed_store(_fixture_df(), tmp_path / "clean.parquet")
+    csv_path = tmp_path / "clean.csv"
+    _fixture_df().to_csv(csv_path, index=False)
+
+    columns = ["order_date", "price", "missing_column"]
+    from_store = load_processed_dataset(store, columns=columns)
+    from_csv = load_processed_dataset(csv_path, columns=columns)
+
+    assert sorted(from_store.columns) == sorted(from_csv.columns) == ["order_date", "price"]
+
+
+def test_dataset_fingerprint_changes_when_store_is_rewritten(tmp_path) -> None:
+    target = tmp_path / "clean.parquet"
+    first = dataset_fingerprint(write_processed_store(_fixture_df(), target))
+    second = dataset_fingerprint(write_processed_store(_fixture_df().head(2), target))
+
+    assert first != second
+    assert not (tmp_path / "clean.parquet.previous").exists()
+
+
+def test_dataset_version_reads_the_manifest_written_on_publish(tmp_path) -> None:
+    store = write_processed_store(_fixture_df(), tmp_path / "clean.parquet")
+    version = dataset_version(store)
+
+    assert version == (store / STORE_VERSION_FILENAME).read_text(encoding="utf-8")
+    assert len(load_processed_dataset(store)) == len(_fixture_df())
+
+    append_processed_partition(_fixture_df().head(1), store, part="late")
+    assert dataset_version(store) == version
+    assert write_store_version(store) == dataset_version(store) != version
@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from amazon_sales_analysis.decision_engine import build_actionable_recommendations
+from amazon_sales_analysis.insights import generate_executive_insights
+from amazon_sales_analysis.report_graph import LazyExecutiveReport
+from amazon_sales_analysis.sales_analysis import build_executive_report, prepare_sales_frame
+
+
+def _fixture_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "order_id": [1, 2, 3, 4, 5, 6],
+            "order_date": [
+                "2024-01-05",
+                "2024-01-20",
+                "2024-02-11",
+                "2024-02-25",
+                "2024-03-02",
+                "2024-03-30",
+            ],
+            "product_id": [10, 11, 10, 12, 11, 12],
+            "product_category": ["Home", "Beauty", "Home", "Electronics", "Beauty", "Home"],
+            "price": [100.0, 120.0, 80.0, 300.0, 60.0, 90.0],
+            "discount_percent": [10, 20, 5, 15, 0, 25],
+            "quantity_sold": [2, 1, 3, 1, 4, 2],
+            "rating": [4.5, 4.1, 4.8, 3.9, 4.2, 4.0],
+            "total_revenue": [180.0, 96.0, 228.0, 255.0, 240.0, 135.0],
+        }
+    )
+
+
+def test_lazy_report_only_computes_requested_sections():
+    report = LazyExecutiveReport(_fixture_df())
+
+    categories = report.category_performance
+
+    assert report.computed == {
+        "prepared",
+        "aggregator",
+        "category_sales",
+        "total_revenue",
+        "category_performance",
+    }
+    assert report.category_performance is categories
+    with pytest.raises(KeyError):
+        report.section("margin_bridge")
+
+
+def test_lazy_report_materializes_the_eager_report():
+    prepared = prepare_sales_frame(_fixture_df())
+    insights = generate_executive_insights(prepared)
+
+    eager = build_executive_report(prepared, insights)
+    lazy = LazyExecutiveReport(prepared, insights).materialize()
+
+    for section in (
+        "kpi_summary",
+        "category_performance",
+        "product_contribution",
+        "growth_trends",
+        "performance_distribution",
+        "kpi_catalog",
+        "insights",
+    ):
+        pd.testing.assert_frame_equal(getattr(lazy, section), getattr(eager, section))
+
+
+def test_recommendations_read_only_categories_and_growth():
+    report = LazyExecutiveReport(_fixture_df())
+
+    recommendations = build_actionable_recommendations(report)
+
+    assert not recommendations.empty
+    assert "product_contribution" not in report.computed
+    assert "performance_distribution" not in report.computed
+    assert "kpi_totals" not in report.computed
@@ -1,4 +1,5 @@
 import pandas as pd
+import pytest
 
 from amazon_sales_analysis.insights import generate_executive_insights
 from amazon_sales_analysis.sales_analysis import (
@@ -6,6 +7,8 @@ from amazon_sales_analysis.sales_analysis import (
     analyze_growth_trends,
     analyze_product_contribution,
     build_executive_report,
+    compute_kpi_summary,
+    is_prepared_sales_frame,
     prepare_sales_frame,
 )
 
@@ -51,3 +54,54 @@ def test_executive_report_contains_storytelling_assets() -> None:
     assert not report.insights.empty
     assert not report.kpi_catalog.empty
     assert not report.performance_distribution.empty
+
+
+def test_executive_report_accepts_unprepared_frames() -> None:
+    raw = _fixture_df()
+    report = build_executive_report(raw, generate_executive_insights(raw))
+
+    pd.testing.assert_frame_equal(
+        report.kpi_summary,
+        build_executive_report(prepare_sales_frame(raw), report.insights).kpi_summary,
+    )
+
+
+def test_product_contribution_top_n_matches_full_sort() -> None:
+    prepared = prepare_sales_frame(_fixture_df())
+    ranked = analyze_product_contribution(prepared, top_n=2)
+
+    assert ranked["product_id"].tolist() == [10, 12]
+    assert ranked["rank"].tolist() == [1, 2]
+    assert ranked["orders"].tolist() == [2, 1]
+    assert len(analyze_product_contribution(prepared, top_n=50)) == 3
+
+
+def test_prepare_sales_frame_passes_prepared_frames_through() -> None:
+    prepared = prepare_sales_frame(_fixture_df())
+
+    assert is_prepared_sales_frame(prepared)
+    assert prepare_sales_frame(prepared) is prepared
+
+
+def test_prepare_sales_frame_recomputes_filtered_subsets() -> None:
+    prepared = prepare_sales_frame(_fixture_df())
+    subset = prepared[prepared["product_category"] == "Electronics"]
+
+    assert not is_prepared_sales_frame(subset)
+    reprepared = prepare_sales_frame(subset)
+    assert reprepared is not subset
+    assert reprepared["order_revenue_share"].sum() == 1.0
+
+
+def test_prepared_frames_are_read_only_so_cached_reductions_stay_valid() -> None:
+    prepared = prepare_sales_frame(_fixture_df())
+    before = compute_kpi_summary(prepared)
+
+    with pytest.raises(ValueError, match="read-only"):
+        prepared.loc[0, "total_revenue"] = 0.0
+    changed = prepared.assign(total_revenue=prepared["total_revenue"] * 2)
+
+    assert is_prepared_sales_frame(changed)
+    pd.testing.assert_frame_equal(compute_kpi_summary(prepared), before)
+    revenue = compute_kpi_summary(changed).set_index("metric")["value"]
+    assert revenue["total_revenue"] == 2 * before.set_index("metric")["value"]["total_revenue"]
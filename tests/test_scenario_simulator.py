@@ -1,7 +1,16 @@
 import pandas as pd
+import pytest
 
 from amazon_sales_analysis.feature_engineering import build_features
-from amazon_sales_analysis.scenario_simulator import simulate_leakage_recovery
+from amazon_sales_analysis.scenario_simulator import (
+    SCENARIO_GRID_COLUMNS,
+    UNCERTAINTY_COLUMNS,
+    RateDistribution,
+    optimize_recovery_allocation,
+    simulate_leakage_recovery,
+    simulate_recovery_uncertainty,
+    simulate_scenario_grid,
+)
 
 
 def _fixture_df() -> pd.DataFrame:
@@ -36,3 +45,84 @@ def test_simulate_leakage_recovery_returns_expected_outputs() -> None:
     assert simulation["total_uplift"] == 10.4
     assert simulation["simulated_revenue"] == 578.4
     assert "category_breakdown" in simulation
+
+
+def test_scenario_grid_matches_single_scenario_simulations() -> None:
+    featured = build_features(_fixture_df())
+    scenarios = {
+        "baseline": {"Electronics": 0.2, "Beauty": 0.1},
+        "electronics_only": {"Electronics": 0.4},
+        "capped": {"Electronics": 1.5, "Beauty": -0.2, "Toys": 0.3},
+    }
+
+    grid = simulate_scenario_grid(featured, scenarios)
+
+    assert list(grid.columns) == SCENARIO_GRID_COLUMNS
+    assert grid["scenario"].tolist() == list(scenarios)
+    for row in grid.itertuples(index=False):
+        single = simulate_leakage_recovery(featured, scenarios[row.scenario])
+        assert row.total_uplift == pytest.approx(single["total_uplift"])
+        assert row.simulated_nrr == pytest.approx(single["simulated_nrr"])
+
+    defaulted = simulate_scenario_grid(featured, {"flat": {}}, default_rate=0.1)
+    assert defaulted["total_uplift"].iloc[0] == pytest.approx(7.2)
+
+
+def test_scenario_grid_leaves_the_callers_frame_untouched() -> None:
+    featured = build_features(_fixture_df())
+    scenarios = pd.DataFrame({"Electronics": [0.2, 0.4], "Beauty": [0.1, None]}, index=["a", "b"])
+    columns = scenarios.columns
+    before = scenarios.copy()
+
+    grid = simulate_scenario_grid(featured, scenarios)
+
+    assert grid["scenario"].tolist() == ["a", "b"]
+    assert scenarios.columns is columns
+    pd.testing.assert_frame_equal(scenarios, before)
+
+
+def test_recovery_uncertainty_percentiles_are_reproducible_across_workers() -> None:
+    featured = build_features(_fixture_df())
+    distributions = {"Electronics": RateDistribution.parse("beta:2:8")}
+
+    sequential = simulate_recovery_uncertainty(
+        featured, distributions, default_rate=0.1, draws=60_000, seed=11
+    )
+    sharded = simulate_recovery_uncertainty(
+        featured, distributions, default_rate=0.1, draws=60_000, seed=11, workers=2
+    )
+
+    pd.testing.assert_frame_equal(sequential, sharded)
+    assert list(sequential.columns) == UNCERTAINTY_COLUMNS
+    rows = sequential.set_index("product_category")
+    assert rows.loc["Beauty", ["uplift_p5", "uplift_p95"]].tolist() == pytest.approx([4.0, 4.0])
+    electronics = rows.loc["Electronics"]
+    assert electronics["uplift_p5"] < electronics["uplift_p50"] < electronics["uplift_p95"]
+    # Median of beta(2, 8) is about 0.1826 of the 32.0 Electronics leakage.
+    assert electronics["uplift_p50"] == pytest.approx(32.0 * 0.1826, rel=0.02)
+    with pytest.raises(ValueError):
+        RateDistribution.parse("triangular:0.2:0.1:0.3")
+
+
+def test_recovery_optimizer_funds_cells_by_leakage_per_unit_of_effort() -> None:
+    leakage = pd.DataFrame(
+        {
+            "product_category": ["A", "B", "C", "D"],
+            "gross_revenue": [1000.0, 2000.0, 500.0, 100.0],
+            "total_revenue": [900.0, 1700.0, 450.0, 100.0],
+            "discount_leakage": [100.0, 300.0, 50.0, 0.0],
+        }
+    )
+
+    optimization = optimize_recovery_allocation(
+        leakage, budget=0.6, category_caps={"A": 0.5, "B": 0.2}, category_effort={"B": 2.0}
+    )
+
+    allocation = optimization["allocation"].set_index("product_category")
+    assert allocation["recovery_rate"].to_dict() == pytest.approx(
+        {"A": 0.2, "B": 0.2, "C": 0.0, "D": 0.0}
+    )
+    assert optimization["total_uplift"] == pytest.approx(80.0)
+    assert optimization["effort_used"] == pytest.approx(0.6)
+    unconstrained = optimize_recovery_allocation(leakage, budget=10.0)
+    assert unconstrained["total_uplift"] == pytest.approx(0.3 * 450.0)
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from amazon_sales_analysis.aggregation import SalesAggregator
+from amazon_sales_analysis.partial_aggregates import SalesPartial
+from amazon_sales_analysis.sales_analysis import (
+    analyze_category_performance,
+    analyze_performance_distribution,
+    finalize_product_contribution,
+    performance_band_edges,
+    prepare_sales_frame,
+    sketch_order_revenue,
+    sketch_product_revenue,
+)
+from amazon_sales_analysis.sketches import (
+    HyperLogLogCounter,
+    KllSketch,
+    hll_precision,
+    top_k_indices,
+)
+
+
+def _fixture_df() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    rows = 30_000
+    return pd.DataFrame(
+        {
+            "order_id": np.arange(1, rows + 1),
+            "order_date": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 90, rows), unit="D"),
+            "product_id": rng.integers(1, 200, rows),
+            "product_category": rng.choice(["Beauty", "Electronics", "Home"], rows),
+            "price": rng.uniform(10, 200, rows).round(2),
+            "discount_percent": rng.integers(0, 40, rows),
+            "quantity_sold": rng.integers(1, 5, rows),
+            "total_revenue": rng.uniform(10, 500, rows).round(2),
+        }
+    )
+
+
+def test_hyperloglog_estimate_stays_within_error_bound_and_merges():
+    ids = pd.Series(np.arange(200_000))
+    left = HyperLogLogCounter.from_values(ids.iloc[:120_000], relative_error=0.01)
+    right = HyperLogLogCounter.from_values(ids.iloc[80_000:].astype(float), relative_error=0.01)
+
+    merged = left.merge(right)
+
+    assert merged.precision == hll_precision(0.01)
+    assert merged.relative_error <= 0.01
+    assert abs(merged.estimate() / 200_000 - 1) < 3 * merged.relative_error
+    with pytest.raises(ValueError, match="precisoes diferentes"):
+        left.merge(HyperLogLogCounter.empty(0.1))
+    assert hll_precision(1.04 / 2**9) == 18
+    with pytest.raises(ValueError, match="pelo menos 0.00203"):
+        hll_precision(0.001)
+
+
+def test_approximate_distinct_mode_is_opt_in_and_bounded():
+    prepared = prepare_sales_frame(_fixture_df())
+    exact = analyze_category_performance(prepared)
+    approximate = analyze_category_performance(SalesAggregator(prepared, distinct_error=0.02))
+
+    pd.testing.assert_frame_equal(exact.drop(columns="orders"), approximate.drop(columns="orders"))
+    relative = approximate["orders"] / exact["orders"] - 1
+    assert (relative.abs() < 3 * 0.02).all()
+
+    partial = SalesPartial.from_frame(prepared, counter=HyperLogLogCounter.factory(0.02))
+    merged = partial.merge(
+        SalesPartial.from_frame(prepared.iloc[:5_000], counter=HyperLogLogCounter.factory(0.02))
+    )
+    assert abs(merged.kpi_totals()["total_orders"] / 30_000 - 1) < 3 * 0.02
+
+
+def test_space_saving_sketch_bounds_streaming_product_revenue():
+    frame = _fixture_df()
+    exact = frame.groupby(["product_id", "product_category"])["total_revenue"].sum()
+    chunks = [frame.iloc[start : start + 4_000] for start in range(0, len(frame), 4_000)]
+
+    sketch = sketch_product_revenue(chunks, capacity=150)
+    top = finalize_product_contribution(sketch, top_n=10)
+
+    assert len(top) == 10
+    assert sketch.total_weight == pytest.approx(frame["total_revenue"].sum())
+    truth = exact.loc[list(zip(top["product_id"], top["product_category"], strict=True))]
+    assert (truth.to_numpy() <= top["revenue"].to_numpy() + 1e-6).all()
+    assert (truth.to_numpy() >= top["revenue_lower_bound"].to_numpy() - 1e-6).all()
+    assert (top["revenue_share_error"] <= sketch.floor / sketch.total_weight + 1e-12).all()
+    guaranteed = top.loc[top["guaranteed_top"], ["product_id", "product_category"]]
+    true_top = set(exact.nlargest(10).index)
+    guaranteed_keys = zip(guaranteed["product_id"], guaranteed["product_category"], strict=True)
+    assert set(guaranteed_keys) <= true_top
+
+
+def test_top_k_indices_matches_full_sort():
+    values = np.array([5.0, 1.0, 9.0, 5.0, 7.0, 9.0])
+
+    assert top_k_indices(values, 3).tolist() == [2, 5, 4]
+    assert top_k_indices(values, 10).tolist() == [2, 5, 4, 0, 3, 1]
+    assert top_k_indices(values, 0).tolist() == []
+
+
+def test_kll_sketch_quantiles_stay_within_rank_error_and_merge():
+    values = np.random.default_rng(11).lognormal(4, 1, 200_000)
+    fractions = np.array([0.01, 0.25, 0.5, 0.75, 0.9, 0.99])
+    left = KllSketch(k=200).update(values[:120_000])
+    right = KllSketch(k=200).update(values[120_000:])
+    merged = left.merge(right)
+
+    ranks = np.searchsorted(np.sort(values), merged.quantiles(fractions)) / len(values)
+    assert merged.count == len(values)
+    assert merged.retained < len(values) // 100
+    assert np.abs(ranks - fractions).max() <= 2 * merged.normalized_rank_error
+    with pytest.raises(ValueError):
+        KllSketch().quantiles(fractions)
+
+
+def test_sketched_performance_bands_track_exact_bands():
+    df = prepare_sales_frame(_fixture_df())
+    exact = analyze_performance_distribution(df)
+    approx = analyze_performance_distribution(df, quantile_sketch_k=200)
+
+    assert approx["performance_band"].tolist() == exact["performance_band"].tolist()
+    assert approx["orders"].sum() == exact["orders"].sum()
+    assert np.allclose(approx["orders"], exact["orders"], rtol=0.05)
+    assert np.allclose(approx["revenue_share"], exact["revenue_share"], atol=0.01)
+
+    chunks = [df.iloc[start : start + 5_000] for start in range(0, len(df), 5_000)]
+    edges = performance_band_edges(sketch_order_revenue(chunks), 4)
+    expected = performance_band_edges(df["total_revenue"].to_numpy(), 4)
+    assert np.allclose(edges, expected, rtol=0.05)
+
+
+def test_performance_distribution_supports_deciles_and_percentiles():
+    df = prepare_sales_frame(_fixture_df())
+    deciles = analyze_performance_distribution(df, bands=10)
+    percentiles = analyze_performance_distribution(df, bands=100, quantile_sketch_k=200)
+
+    assert len(deciles) == 10
+    assert deciles["orders"].tolist() == [3_000] * 10
+    assert deciles["performance_band"].iloc[0] == "Q10"
+    assert len(percentiles) == 100
+    assert percentiles["orders"].sum() == len(df)
+    assert percentiles["revenue_share"].sum() == pytest.approx(1.0)
@@ -1,6 +1,8 @@
 import pandas as pd
 
 from amazon_sales_analysis.feature_engineering import build_features
+from amazon_sales_analysis.insights import generate_executive_insights
+from amazon_sales_analysis.sales_analysis import build_executive_report
 from amazon_sales_analysis.table_organization import build_executive_tables
 
 
@@ -42,3 +44,15 @@ def test_build_executive_tables_returns_expected_tables() -> None:
     assert set(tables.keys()) == expected_keys
     assert not tables["kpi_summary"].empty
     assert "month_end" in tables["monthly_trend"].columns
+
+
+def test_build_executive_tables_reuses_a_prebuilt_report() -> None:
+    featured = build_features(_fixture_df())
+    report = build_executive_report(featured, generate_executive_insights(featured))
+
+    tables = build_executive_tables(featured, report=report)
+    expected = build_executive_tables(featured)
+
+    assert tables["kpi_summary"] is report.kpi_summary
+    for name, table in expected.items():
+        pd.testing.assert_frame_equal(tables[name], table)